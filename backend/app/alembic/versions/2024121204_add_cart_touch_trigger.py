@@ -0,0 +1,54 @@
+"""add trigger keeping cart.updated_at in sync with its items
+
+Revision ID: 2024121204
+Revises: 2024121203
+Create Date: 2024-12-12 11:30:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "2024121204"
+down_revision = "2024121203"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Bump cart.updated_at from the database whenever a cart item changes.
+
+    Cart mutations previously re-saved the cart from Python after the item
+    write, costing an extra UPDATE and a second commit per request.
+    """
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION touch_cart_updated_at() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                UPDATE cart SET updated_at = now() WHERE cart_id = OLD.cart_id;
+            ELSE
+                UPDATE cart SET updated_at = now() WHERE cart_id = NEW.cart_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+
+    op.execute(
+        """
+        CREATE TRIGGER trg_cart_touch
+        AFTER INSERT OR UPDATE OR DELETE ON cartitem
+        FOR EACH ROW EXECUTE FUNCTION touch_cart_updated_at();
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop the cart touch trigger and its function."""
+
+    op.execute("DROP TRIGGER IF EXISTS trg_cart_touch ON cartitem")
+    op.execute("DROP FUNCTION IF EXISTS touch_cart_updated_at()")
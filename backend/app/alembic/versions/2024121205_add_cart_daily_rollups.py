@@ -0,0 +1,58 @@
+"""add daily cart and completed-order rollup materialized views
+
+Revision ID: 2024121205
+Revises: 2024121204
+Create Date: 2024-12-12 12:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "2024121205"
+down_revision = "2024121204"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Create daily rollups used by the cart abandonment rate.
+
+    This migration creates:
+    1. mv_cart_daily: carts created per day
+    2. mv_order_daily_completed: completed sales orders per day
+    3. Unique indexes on the day column so both views can be refreshed
+       CONCURRENTLY without blocking readers
+    """
+
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW mv_cart_daily AS
+        SELECT date_trunc('day', created_at)::date AS d, COUNT(*) AS carts
+        FROM cart
+        GROUP BY 1
+        """
+    )
+    op.execute("CREATE UNIQUE INDEX ix_mv_cart_daily_d ON mv_cart_daily (d)")
+
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW mv_order_daily_completed AS
+        SELECT date_trunc('day', order_date)::date AS d, COUNT(*) AS orders
+        FROM salesorder
+        WHERE status = 'COMPLETED'
+        GROUP BY 1
+        """
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX ix_mv_order_daily_completed_d "
+        "ON mv_order_daily_completed (d)"
+    )
+
+
+def downgrade() -> None:
+    """Drop the daily rollup materialized views."""
+
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_order_daily_completed")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_cart_daily")
@@ -0,0 +1,40 @@
+"""add partial index on completed sales order dates
+
+Revision ID: 2024121206
+Revises: 2024121205
+Create Date: 2024-12-12 13:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "2024121206"
+down_revision = "2024121205"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Index completed orders by date for cohort analysis.
+
+    Cohort queries filter completed orders from a month boundary computed
+    server-side (date_trunc('month', now()) - N months), so the bound is a
+    stable range predicate on order_date. Carrying customer_id lets the
+    first-purchase aggregation read from the index alone.
+    """
+
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_salesorder_completed_order_date
+        ON salesorder (order_date, customer_id)
+        WHERE status = 'COMPLETED'
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop the completed sales order date index."""
+
+    op.execute("DROP INDEX IF EXISTS ix_salesorder_completed_order_date")
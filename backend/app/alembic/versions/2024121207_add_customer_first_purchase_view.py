@@ -0,0 +1,50 @@
+"""add customer first purchase materialized view
+
+Revision ID: 2024121207
+Revises: 2024121206
+Create Date: 2024-12-12 14:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "2024121207"
+down_revision = "2024121206"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Precompute each customer's acquisition cohort.
+
+    This migration creates:
+    1. mv_customer_first_purchase: first completed order month per customer
+    2. A unique index on customer_id so the view can be refreshed
+       CONCURRENTLY, plus an index on cohort_month for windowed reads
+    """
+
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW mv_customer_first_purchase AS
+        SELECT customer_id, date_trunc('month', MIN(order_date)) AS cohort_month
+        FROM salesorder
+        WHERE status = 'COMPLETED'
+        GROUP BY customer_id
+        """
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX ix_mv_customer_first_purchase_customer_id "
+        "ON mv_customer_first_purchase (customer_id)"
+    )
+    op.execute(
+        "CREATE INDEX ix_mv_customer_first_purchase_cohort_month "
+        "ON mv_customer_first_purchase (cohort_month)"
+    )
+
+
+def downgrade() -> None:
+    """Drop the customer first purchase materialized view."""
+
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_customer_first_purchase")
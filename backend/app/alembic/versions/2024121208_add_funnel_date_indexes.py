@@ -0,0 +1,48 @@
+"""add indexes for conversion funnel date and product filters
+
+Revision ID: 2024121208
+Revises: 2024121207
+Create Date: 2024-12-12 15:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "2024121208"
+down_revision = "2024121207"
+branch_labels = None
+depends_on = None
+
+FUNNEL_INDEXES = {
+    "ix_salesorder_order_date": "salesorder (order_date) INCLUDE (customer_id, status)",
+    "ix_cart_created_at": "cart (created_at)",
+    "ix_cartitem_product_created_at": "cartitem (product_id, created_at)",
+    "ix_salesitem_product_so": "salesitem (product_id, so_id)",
+}
+
+
+def upgrade() -> None:
+    """
+    Index the columns the conversion funnel filters on.
+
+    Funnel queries scan all orders (any status) and carts in a date window,
+    and product funnels look up cart and order items by product first. The
+    existing primary keys lead with cart_id / so_id, so none of these
+    predicates could use an index before.
+
+    Indexes are built CONCURRENTLY so order and cart writes are not blocked,
+    which requires running outside the migration transaction.
+    """
+
+    with op.get_context().autocommit_block():
+        for name, target in FUNNEL_INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}")
+
+
+def downgrade() -> None:
+    """Drop the conversion funnel indexes."""
+
+    with op.get_context().autocommit_block():
+        for name in FUNNEL_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
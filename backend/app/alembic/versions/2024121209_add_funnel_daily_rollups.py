@@ -0,0 +1,69 @@
+"""add daily customer rollups for the conversion funnel
+
+Revision ID: 2024121209
+Revises: 2024121208
+Create Date: 2024-12-12 16:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "2024121209"
+down_revision = "2024121208"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Create daily rollups used by the basic conversion funnel.
+
+    This migration creates:
+    1. mv_funnel_order_daily: orders and completed orders per customer per day
+    2. mv_funnel_cart_daily: users who created a cart per day
+    3. Unique indexes on (day, customer) so both views can be refreshed
+       CONCURRENTLY without blocking readers
+
+    The rollups keep one row per customer and day rather than per-day
+    totals, so distinct purchasers and cart users stay exact when the
+    funnel sums a window of days.
+    """
+
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW mv_funnel_order_daily AS
+        SELECT
+            date_trunc('day', order_date)::date AS d,
+            customer_id,
+            COUNT(*) AS orders,
+            COUNT(*) FILTER (WHERE status = 'COMPLETED') AS completed_orders
+        FROM salesorder
+        GROUP BY 1, 2
+        """
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX ix_mv_funnel_order_daily_d_customer "
+        "ON mv_funnel_order_daily (d, customer_id)"
+    )
+
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW mv_funnel_cart_daily AS
+        SELECT date_trunc('day', created_at)::date AS d, user_id
+        FROM cart
+        WHERE user_id IS NOT NULL
+        GROUP BY 1, 2
+        """
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX ix_mv_funnel_cart_daily_d_user "
+        "ON mv_funnel_cart_daily (d, user_id)"
+    )
+
+
+def downgrade() -> None:
+    """Drop the conversion funnel daily rollups."""
+
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_funnel_cart_daily")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_funnel_order_daily")
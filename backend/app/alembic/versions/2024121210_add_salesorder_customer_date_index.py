@@ -0,0 +1,46 @@
+"""add customer/order date index on sales orders for RFM scoring
+
+Revision ID: 2024121210
+Revises: 2024121209
+Create Date: 2024-12-12 17:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "2024121210"
+down_revision = "2024121209"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Index sales orders by customer and order date for RFM scoring.
+
+    RFM scoring groups every customer's orders to take the latest order
+    date and count completed orders. Carrying status and so_id lets that
+    aggregation, and the join to salesitem, read orders from the index
+    alone in customer order.
+
+    Built CONCURRENTLY so order writes are not blocked, which requires
+    running outside the migration transaction.
+    """
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_salesorder_customer_order_date
+            ON salesorder (customer_id, order_date DESC) INCLUDE (status, so_id)
+            """
+        )
+
+
+def downgrade() -> None:
+    """Drop the customer/order date index."""
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "DROP INDEX CONCURRENTLY IF EXISTS ix_salesorder_customer_order_date"
+        )
@@ -0,0 +1,48 @@
+"""add_aggregate_snapshot_table
+
+Revision ID: 2024121211
+Revises: 2024121210
+Create Date: 2024-12-12 18:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "2024121211"
+down_revision = "2024121210"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Snapshots let aggregate reconstruction replay only newer events
+    op.create_table(
+        "aggregate_snapshot",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("aggregate_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("aggregate_type", sa.String(length=50), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("state", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_index(
+        "ix_aggregate_snapshot_aggregate_id", "aggregate_snapshot", ["aggregate_id"]
+    )
+
+    # Latest snapshot lookup per aggregate
+    op.create_index(
+        "ix_aggregate_snapshot_latest",
+        "aggregate_snapshot",
+        ["aggregate_id", "aggregate_type", "version"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_aggregate_snapshot_latest", "aggregate_snapshot")
+    op.drop_index("ix_aggregate_snapshot_aggregate_id", "aggregate_snapshot")
+    op.drop_table("aggregate_snapshot")
@@ -0,0 +1,67 @@
+"""add_event_store_sequence
+
+Revision ID: 2024121212
+Revises: 2024121211
+Create Date: 2024-12-12 19:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "2024121212"
+down_revision = "2024121211"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Insertion order for events; existing rows are numbered on creation
+    op.add_column(
+        "event_store",
+        sa.Column("sequence", sa.BigInteger(), sa.Identity(), nullable=False),
+    )
+    op.create_unique_constraint(
+        "uq_event_store_sequence", "event_store", ["sequence"]
+    )
+
+    # Replay of an aggregate after a snapshot's sequence
+    op.create_index(
+        "ix_event_store_aggregate_sequence",
+        "event_store",
+        ["aggregate_id", "aggregate_type", "sequence"],
+    )
+
+    # Snapshots counted events by offset; drop them and key on the sequence
+    op.execute("DELETE FROM aggregate_snapshot")
+    op.drop_index("ix_aggregate_snapshot_latest", "aggregate_snapshot")
+    op.drop_column("aggregate_snapshot", "version")
+    op.add_column(
+        "aggregate_snapshot",
+        sa.Column("sequence", sa.BigInteger(), nullable=False),
+    )
+    op.create_index(
+        "ix_aggregate_snapshot_latest",
+        "aggregate_snapshot",
+        ["aggregate_id", "aggregate_type", "sequence"],
+    )
+
+
+def downgrade():
+    op.execute("DELETE FROM aggregate_snapshot")
+    op.drop_index("ix_aggregate_snapshot_latest", "aggregate_snapshot")
+    op.drop_column("aggregate_snapshot", "sequence")
+    op.add_column(
+        "aggregate_snapshot",
+        sa.Column("version", sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        "ix_aggregate_snapshot_latest",
+        "aggregate_snapshot",
+        ["aggregate_id", "aggregate_type", "version"],
+    )
+
+    op.drop_index("ix_event_store_aggregate_sequence", "event_store")
+    op.drop_constraint("uq_event_store_sequence", "event_store", type_="unique")
+    op.drop_column("event_store", "sequence")
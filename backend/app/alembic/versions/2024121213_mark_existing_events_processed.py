@@ -0,0 +1,26 @@
+"""mark_existing_events_processed
+
+Revision ID: 2024121213
+Revises: 2024121212
+Create Date: 2024-12-12 20:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "2024121213"
+down_revision = "2024121212"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Events stored before the outbox drainer were already dispatched inline;
+    # mark them processed so the drainer does not replay the whole history
+    op.execute("UPDATE event_store SET processed = true WHERE processed = false")
+
+
+def downgrade():
+    # Which rows were flipped is not recorded; leave them processed
+    pass
@@ -1,11 +1,23 @@
+from typing import Annotated
+
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import Session
 
 from app.core.database import get_db
+from app.core.db import get_session
 from app.repositories.product_repository import ProductRepository
+from app.services.auth_service import AuthService
 from app.services.product_service import ProductService
 
 
 async def get_product_service(db: AsyncSession = Depends(get_db)) -> ProductService:
     repo = ProductRepository(db)
     return ProductService(repo)
+
+
+def get_auth_service(session: Session = Depends(get_session)) -> AuthService:
+    return AuthService(session)
+
+
+AuthServiceDep = Annotated[AuthService, Depends(get_auth_service)]
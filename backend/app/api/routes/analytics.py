@@ -3,6 +3,7 @@
 from datetime import date, datetime, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
 from sqlmodel import Session
 
 from ...api.deps import get_current_active_superuser
@@ -11,6 +12,8 @@ from ...core.db import get_db
 from ...models import User
 from ...services.alert_service import AlertService, AlertSeverity, AlertType
 from ...services.analytics_service import AnalyticsService
+from ...services.cohort_analysis_service import CohortAnalysisService
+from ...services.conversion_funnel_service import ConversionFunnelService
 
 router = APIRouter()
 
@@ -334,6 +337,57 @@ def get_cart_abandonment_rate(
     }
 
 
+@router.post("/conversion/rollups/refresh")
+def refresh_cart_rollups(
+    *,
+    db: Session = Depends(get_db),
+    _current_user: User = Depends(get_current_active_superuser),
+) -> dict:
+    """
+    Refresh the daily cart and completed-order rollups behind the cart
+    abandonment rate now instead of waiting for the hourly scheduled refresh.
+    Requires admin privileges.
+    """
+    analytics_service = AnalyticsService(db)
+    analytics_service.refresh_cart_rollups()
+
+    return {"refreshed_at": datetime.utcnow().isoformat()}
+
+
+@router.post("/cohorts/first-purchases/refresh")
+def refresh_cohort_first_purchases(
+    *,
+    db: Session = Depends(get_db),
+    _current_user: User = Depends(get_current_active_superuser),
+) -> dict:
+    """
+    Refresh the per-customer first purchase view used by cohort analysis
+    now instead of waiting for the nightly scheduled refresh.
+    Requires admin privileges.
+    """
+    cohort_service = CohortAnalysisService(db)
+    cohort_service.refresh_first_purchases()
+
+    return {"refreshed_at": datetime.utcnow().isoformat()}
+
+
+@router.post("/funnel/rollups/refresh")
+def refresh_funnel_rollups(
+    *,
+    db: Session = Depends(get_db),
+    _current_user: User = Depends(get_current_active_superuser),
+) -> dict:
+    """
+    Refresh the daily per-customer rollups behind the conversion funnels
+    now instead of waiting for the hourly scheduled refresh.
+    Requires admin privileges.
+    """
+    funnel_service = ConversionFunnelService(db)
+    funnel_service.refresh_funnel_rollups()
+
+    return {"refreshed_at": datetime.utcnow().isoformat()}
+
+
 @router.get("/revenue/mrr")
 def get_monthly_recurring_revenue(
     *,
@@ -711,8 +765,6 @@ async def get_cohort_retention_analysis(
     Get cohort retention analysis.
     Requires admin privileges. Cached for 60 minutes.
     """
-    from ...services.cohort_analysis_service import CohortAnalysisService
-
     cache_key = f"analytics:cohort_retention:{months_back}"
     cached_data = await CacheService.get(cache_key)
     if cached_data:
@@ -738,8 +790,6 @@ async def get_cohort_revenue_analysis(
     Get cohort revenue analysis.
     Requires admin privileges. Cached for 60 minutes.
     """
-    from ...services.cohort_analysis_service import CohortAnalysisService
-
     cache_key = f"analytics:cohort_revenue:{months_back}"
     cached_data = await CacheService.get(cache_key)
     if cached_data:
@@ -765,8 +815,6 @@ def get_product_adoption_cohorts(
     Get product adoption cohort analysis.
     Requires admin privileges.
     """
-    from ...services.cohort_analysis_service import CohortAnalysisService
-
     cohort_service = CohortAnalysisService(db)
     data = cohort_service.calculate_product_adoption_cohorts(product_category)
 
@@ -780,17 +828,18 @@ async def get_conversion_funnel(
     channel: str | None = Query(None, description="Marketing channel filter"),
     db: Session = Depends(get_db),
     _current_user: User = Depends(get_current_active_superuser),
-) -> dict:
+) -> JSONResponse:
     """
     Get detailed conversion funnel analysis.
     Requires admin privileges. Cached for 20 minutes.
-    """
-    from ...services.conversion_funnel_service import ConversionFunnelService
 
+    Funnel payloads are built from plain JSON types, so they are returned as
+    a JSONResponse to skip FastAPI's recursive jsonable_encoder pass.
+    """
     cache_key = f"analytics:conversion_funnel:{days}:{channel or 'all'}"
     cached_data = await CacheService.get(cache_key)
     if cached_data:
-        return cached_data
+        return JSONResponse(cached_data)
 
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
@@ -799,7 +848,7 @@ async def get_conversion_funnel(
     data = funnel_service.calculate_conversion_funnel(start_date, end_date, channel)
 
     await CacheService.set(cache_key, data, ttl=1200)  # 20 minutes
-    return data
+    return JSONResponse(data)
 
 
 @router.get("/funnel/product/{product_id}")
@@ -809,20 +858,18 @@ def get_product_conversion_funnel(
     days: int = Query(30, description="Number of days to analyze", ge=1, le=90),
     db: Session = Depends(get_db),
     _current_user: User = Depends(get_current_active_superuser),
-) -> dict:
+) -> JSONResponse:
     """
     Get conversion funnel for a specific product.
     Requires admin privileges.
     """
-    from ...services.conversion_funnel_service import ConversionFunnelService
-
     funnel_service = ConversionFunnelService(db)
     data = funnel_service.calculate_product_funnel(product_id, days)
 
     if not data:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    return data
+    return JSONResponse(data)
 
 
 @router.get("/funnel/channels")
@@ -831,23 +878,21 @@ async def get_channel_conversion_funnels(
     days: int = Query(30, description="Number of days to analyze", ge=1, le=90),
     db: Session = Depends(get_db),
     _current_user: User = Depends(get_current_active_superuser),
-) -> dict:
+) -> JSONResponse:
     """
     Get conversion funnels by marketing channel.
     Requires admin privileges. Cached for 30 minutes.
     """
-    from ...services.conversion_funnel_service import ConversionFunnelService
-
     cache_key = f"analytics:channel_funnels:{days}"
     cached_data = await CacheService.get(cache_key)
     if cached_data:
-        return cached_data
+        return JSONResponse(cached_data)
 
     funnel_service = ConversionFunnelService(db)
     data = funnel_service.calculate_channel_funnels(days)
 
     await CacheService.set(cache_key, data, ttl=1800)  # 30 minutes
-    return data
+    return JSONResponse(data)
 
 
 @router.get("/funnel/devices")
@@ -856,23 +901,21 @@ async def get_device_conversion_comparison(
     days: int = Query(30, description="Number of days to analyze", ge=1, le=90),
     db: Session = Depends(get_db),
     _current_user: User = Depends(get_current_active_superuser),
-) -> dict:
+) -> JSONResponse:
     """
     Get mobile vs desktop conversion funnel comparison.
     Requires admin privileges. Cached for 30 minutes.
     """
-    from ...services.conversion_funnel_service import ConversionFunnelService
-
     cache_key = f"analytics:device_funnels:{days}"
     cached_data = await CacheService.get(cache_key)
     if cached_data:
-        return cached_data
+        return JSONResponse(cached_data)
 
     funnel_service = ConversionFunnelService(db)
     data = funnel_service.calculate_mobile_vs_desktop_funnel(days)
 
     await CacheService.set(cache_key, data, ttl=1800)  # 30 minutes
-    return data
+    return JSONResponse(data)
 
 
 @router.get("/reports/executive")
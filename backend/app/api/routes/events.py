@@ -1,14 +1,17 @@
 # Event Sourcing API Routes for Brain2Gain
 # Provides endpoints for event history and aggregate reconstruction
 
+from collections.abc import AsyncIterator
 from datetime import datetime, timedelta
 from typing import Any
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 from app.api.deps import get_current_admin_user, get_current_user
-from app.core.event_sourcing import EventRepository, get_db
+from app.core.database import AsyncSessionLocal
+from app.core.event_sourcing import EventRepository, dumps_event_payload
 from app.models import User
 from app.services.event_integration_service import (
     AggregateReconstructionService,
@@ -18,21 +21,24 @@ from app.services.event_integration_service import (
 router = APIRouter()
 
 
+async def _ndjson(records: AsyncIterator[dict[str, Any]]) -> AsyncIterator[str]:
+    """Encode records as newline-delimited JSON as they arrive"""
+    async for record in records:
+        yield dumps_event_payload(record) + "\n"
+
+
 @router.get("/events/product/{product_id}/history")
 async def get_product_event_history(
     product_id: UUID, _current_user: User = Depends(get_current_admin_user)
-) -> list[dict[str, Any]]:
+) -> StreamingResponse:
     """
-    Get complete event history for a product.
+    Stream complete event history for a product as NDJSON.
     Requires admin privileges.
     """
-    try:
-        history = await EventQueryService.get_product_history(product_id)
-        return history
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Error retrieving product history: {str(e)}"
-        )
+    return StreamingResponse(
+        _ndjson(EventQueryService.stream_history(product_id, "Product")),
+        media_type="application/x-ndjson",
+    )
 
 
 @router.get("/events/order/{order_id}/history")
@@ -71,9 +77,9 @@ async def get_order_event_history(
 @router.get("/events/user/{user_id}/history")
 async def get_user_event_history(
     user_id: UUID, current_user: User = Depends(get_current_user)
-) -> list[dict[str, Any]]:
+) -> StreamingResponse:
     """
-    Get complete event history for a user.
+    Stream complete event history for a user as NDJSON.
     Users can only access their own history, admins can access all.
     """
     # Check authorization
@@ -82,13 +88,10 @@ async def get_user_event_history(
             status_code=403, detail="Not authorized to access this user's history"
         )
 
-    try:
-        history = await EventQueryService.get_user_history(user_id)
-        return history
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Error retrieving user history: {str(e)}"
-        )
+    return StreamingResponse(
+        _ndjson(EventQueryService.stream_history(user_id, "User")),
+        media_type="application/x-ndjson",
+    )
 
 
 @router.get("/events/cart/{cart_id}/history")
@@ -199,7 +202,7 @@ async def get_event_statistics(
     Requires admin privileges.
     """
     try:
-        async with get_db() as db:
+        async with AsyncSessionLocal() as db:
             EventRepository(db)
 
             # Calculate date range
@@ -247,7 +250,7 @@ async def get_unprocessed_events(
     Requires admin privileges.
     """
     try:
-        async with get_db() as db:
+        async with AsyncSessionLocal() as db:
             event_repo = EventRepository(db)
             events = await event_repo.get_unprocessed_events(limit)
 
@@ -268,7 +271,7 @@ async def mark_event_processed(
     Requires admin privileges.
     """
     try:
-        async with get_db() as db:
+        async with AsyncSessionLocal() as db:
             event_repo = EventRepository(db)
             await event_repo.mark_event_processed(event_id)
 
@@ -293,7 +296,7 @@ async def get_event_system_health(
     Requires admin privileges.
     """
     try:
-        async with get_db() as db:
+        async with AsyncSessionLocal() as db:
             event_repo = EventRepository(db)
 
             # Get recent unprocessed events
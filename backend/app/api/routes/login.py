@@ -4,11 +4,13 @@ from typing import Annotated, Any
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import HTMLResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlmodel import Session
 
-from app import crud
-from app.api.deps import CurrentUser, SessionDep, get_current_active_superuser
+from app.api.dependencies import AuthServiceDep
+from app.api.deps import CurrentUser, get_current_active_superuser
 from app.core import security
 from app.core.config import settings
+from app.core.db import get_session
 from app.core.security import get_password_hash
 from app.middlewares.advanced_rate_limiting import apply_endpoint_limits
 from app.models import Message, NewPassword, Token, UserPublic
@@ -26,15 +28,13 @@ router = APIRouter(tags=["login"])
 # # @apply_endpoint_limits # Temporary # Temporary("auth")
 def login_access_token(
     request: Request,
-    session: SessionDep,
+    auth_service: AuthServiceDep,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 ) -> Token:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = crud.authenticate(
-        session=session, email=form_data.username, password=form_data.password
-    )
+    user = auth_service.authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     elif not user.is_active:
@@ -56,11 +56,11 @@ def test_token(current_user: CurrentUser) -> Any:
 
 
 @router.post("/password-recovery/{email}")
-def recover_password(email: str, session: SessionDep) -> Message:
+def recover_password(email: str, auth_service: AuthServiceDep) -> Message:
     """
     Password Recovery
     """
-    user = crud.get_user_by_email(session=session, email=email)
+    user = auth_service.get_user_by_email(email)
 
     if not user:
         raise HTTPException(
@@ -80,14 +80,19 @@ def recover_password(email: str, session: SessionDep) -> Message:
 
 
 @router.post("/reset-password/")
-def reset_password(session: SessionDep, body: NewPassword) -> Message:
+def reset_password(
+    session: Annotated[Session, Depends(get_session)],
+    auth_service: AuthServiceDep,
+    body: NewPassword,
+) -> Message:
     """
     Reset password
     """
     email = verify_password_reset_token(token=body.token)
     if not email:
         raise HTTPException(status_code=400, detail="Invalid token")
-    user = crud.get_user_by_email(session=session, email=email)
+    # The auth service shares this request's session, so the user can be saved
+    user = auth_service.get_user_by_email(email)
     if not user:
         raise HTTPException(
             status_code=404,
@@ -107,11 +112,11 @@ def reset_password(session: SessionDep, body: NewPassword) -> Message:
     dependencies=[Depends(get_current_active_superuser)],
     response_class=HTMLResponse,
 )
-def recover_password_html_content(email: str, session: SessionDep) -> Any:
+def recover_password_html_content(email: str, auth_service: AuthServiceDep) -> Any:
     """
     HTML Content for Password Recovery
     """
-    user = crud.get_user_by_email(session=session, email=email)
+    user = auth_service.get_user_by_email(email)
 
     if not user:
         raise HTTPException(
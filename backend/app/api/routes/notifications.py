@@ -4,7 +4,8 @@ Part of Phase 3: Production Deployment Infrastructure
 
 Endpoints:
 - POST /notifications/send-email - Send single email
-- POST /notifications/send-bulk-emails - Send multiple emails
+- POST /notifications/send-bulk-emails - Queue multiple emails
+- GET /notifications/bulk-email-status/{message_id} - Queued email result
 - POST /notifications/order-confirmation - Send order confirmation
 - POST /notifications/order-shipped - Send shipping notification
 - POST /notifications/order-delivered - Send delivery notification
@@ -26,6 +27,7 @@ from app.services.email_delivery_service import (
     EmailDeliveryResult,
     EmailPriority,
     EmailRequest,
+    EmailStatus,
     email_delivery_service,
 )
 
@@ -49,8 +51,13 @@ class BulkEmailRequest(BaseModel):
     """Request model for sending bulk emails"""
 
     emails: list[SendEmailRequest]
-    batch_size: int = 10
-    delay_between_batches: float = 1.0
+
+
+class BulkEmailQueued(BaseModel):
+    """Response model for queued bulk emails"""
+
+    accepted: int
+    message_ids: list[str]
 
 
 class OrderEmailRequest(BaseModel):
@@ -114,14 +121,20 @@ async def send_email(
         )
 
 
-@router.post("/send-bulk-emails", response_model=list[EmailDeliveryResult])
+@router.post(
+    "/send-bulk-emails",
+    response_model=BulkEmailQueued,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 async def send_bulk_emails(
     request: BulkEmailRequest,
     current_user: User = Depends(get_current_active_superuser),
-) -> list[EmailDeliveryResult]:
+) -> BulkEmailQueued:
     """
-    Send multiple emails in batches
+    Queue multiple emails for delivery by the email queue workers
 
+    Returns the queued message IDs immediately; use
+    /bulk-email-status/{message_id} to check each delivery.
     Requires superuser permissions for security.
     """
     try:
@@ -137,28 +150,39 @@ async def send_bulk_emails(
             for email in request.emails
         ]
 
-        results = await email_delivery_service.send_bulk_emails(
-            email_requests,
-            batch_size=request.batch_size,
-            delay_between_batches=request.delay_between_batches,
-        )
+        message_ids = await email_delivery_service.enqueue_bulk_emails(email_requests)
 
-        successful_count = sum(1 for result in results if result.success)
         logger.info(
-            f"Bulk email completed: {successful_count}/{len(results)} successful "
-            f"by admin {current_user.email}"
+            f"Bulk email queued: {len(message_ids)} emails by admin {current_user.email}"
         )
 
-        return results
+        return BulkEmailQueued(accepted=len(message_ids), message_ids=message_ids)
 
     except Exception as e:
-        logger.error(f"Failed to send bulk emails: {str(e)}")
+        logger.error(f"Failed to queue bulk emails: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to send bulk emails: {str(e)}",
+            detail=f"Failed to queue bulk emails: {str(e)}",
         )
 
 
+@router.get("/bulk-email-status/{message_id}", response_model=EmailDeliveryResult)
+async def get_bulk_email_status(
+    message_id: str,
+    _current_user: User = Depends(get_current_active_superuser),
+) -> EmailDeliveryResult:
+    """
+    Get the delivery result of a queued bulk email
+
+    Returns a pending result until a queue worker has sent the email.
+    Requires superuser permissions for security.
+    """
+    result = await email_delivery_service.get_queued_email_status(message_id)
+    if result is None:
+        return EmailDeliveryResult(success=False, status=EmailStatus.PENDING)
+    return result
+
+
 @router.post("/order-confirmation", response_model=EmailDeliveryResult)
 async def send_order_confirmation(
     request: OrderEmailRequest,
@@ -3,13 +3,18 @@ Cache service using Redis for high-performance data caching.
 Implements the cache strategy from IMMEDIATE_IMPROVEMENTS.md
 """
 
+import asyncio
+import hashlib
+import inspect
 import json
 import logging
+import time
 from collections.abc import Callable
 from functools import wraps
 from typing import Any, TypeVar
 
 import redis.asyncio as redis
+from redis import Redis as SyncRedis
 from redis.asyncio import Redis
 
 from app.core.config import settings
@@ -19,6 +24,11 @@ logger = logging.getLogger(__name__)
 # Redis client instance
 redis_client: Redis | None = None
 
+# Synchronous client for sync services (analytics run in the threadpool)
+sync_redis_client: SyncRedis | None = None
+_sync_redis_retry_at: float = 0.0
+SYNC_REDIS_RETRY_SECONDS = 60
+
 # Type variable for generic function typing
 F = TypeVar("F", bound=Callable[..., Any])
 
@@ -73,22 +83,69 @@ class MockRedisClient:
 
     def __init__(self):
         self._data = {}
+        self._expires_at: dict[str, float] = {}
+        self._lists: dict[str, list[str]] = {}
+
+    def _expire(self, key: str) -> None:
+        """Drop a key whose TTL has elapsed, as Redis would."""
+        expires_at = self._expires_at.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            del self._expires_at[key]
+
+    def _store(self, key: str, value: str, ttl: int | None) -> None:
+        self._data[key] = value
+        if ttl is None:
+            self._expires_at.pop(key, None)
+        else:
+            self._expires_at[key] = time.monotonic() + ttl
 
     async def get(self, key: str) -> str | None:
+        self._expire(key)
         return self._data.get(key)
 
     async def setex(self, key: str, ttl: int, value: str) -> bool:
-        self._data[key] = value
+        self._store(key, value, ttl)
+        return True
+
+    async def set(
+        self, key: str, value: str, ex: int | None = None, nx: bool = False
+    ) -> bool | None:
+        self._expire(key)
+        if nx and key in self._data:
+            return None
+        self._store(key, value, ex)
         return True
 
     async def delete(self, *keys: str) -> int:
         deleted = 0
         for key in keys:
+            self._expire(key)
             if key in self._data:
                 del self._data[key]
+                self._expires_at.pop(key, None)
                 deleted += 1
         return deleted
 
+    async def lpush(self, key: str, *values: str) -> int:
+        items = self._lists.setdefault(key, [])
+        for value in values:
+            items.insert(0, value)
+        return len(items)
+
+    async def rpush(self, key: str, *values: str) -> int:
+        items = self._lists.setdefault(key, [])
+        items.extend(values)
+        return len(items)
+
+    async def brpop(self, keys: str | list[str], timeout: int = 0) -> tuple[str, str] | None:
+        """Mock brpop; waits briefly instead of blocking when the lists are empty."""
+        for key in [keys] if isinstance(keys, str) else keys:
+            if self._lists.get(key):
+                return key, self._lists[key].pop()
+        await asyncio.sleep(min(timeout, 1) if timeout else 1)
+        return None
+
     async def ping(self) -> bool:
         return True
 
@@ -98,7 +155,8 @@ class MockRedisClient:
     async def scan_iter(self, match: str):
         """Mock scan_iter for pattern matching."""
         for key in list(self._data.keys()):
-            if match.replace("*", "") in key:
+            self._expire(key)
+            if key in self._data and match.replace("*", "") in key:
                 yield key
 
 
@@ -163,6 +221,111 @@ def cache_key_wrapper(prefix: str, ttl: int = 300):
     return decorator
 
 
+def get_sync_redis_client() -> SyncRedis | None:
+    """
+    Get the synchronous Redis client, or None while Redis is unreachable.
+
+    A failed connection is not retried for SYNC_REDIS_RETRY_SECONDS so that
+    callers fall through to the uncached path without paying a timeout each time.
+    """
+    global sync_redis_client, _sync_redis_retry_at
+
+    if sync_redis_client is None:
+        if time.monotonic() < _sync_redis_retry_at:
+            return None
+        try:
+            client = SyncRedis.from_url(
+                settings.REDIS_URL,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                retry_on_timeout=True,
+                health_check_interval=30,
+            )
+            client.ping()
+            sync_redis_client = client
+        except Exception as e:
+            logger.warning(f"Sync Redis unavailable, caching disabled: {e}")
+            _sync_redis_retry_at = time.monotonic() + SYNC_REDIS_RETRY_SECONDS
+            return None
+
+    return sync_redis_client
+
+
+def cached_result(prefix: str, ttl: int = 300):
+    """
+    Decorator to cache synchronous method results in Redis.
+
+    The key is the prefix plus a BLAKE2b digest of the bound call arguments
+    (excluding ``self``, with defaults applied), so equivalent calls share an
+    entry. Results are stored as JSON like CacheService entries, so dict keys
+    come back as strings; misses return the same JSON form as hits.
+
+    Args:
+        prefix: Cache key prefix
+        ttl: Time to live in seconds (default: 5 minutes)
+
+    Usage:
+        @cached_result("cohorts:retention", ttl=900)
+        def calculate_retention_cohorts(self, months_back: int = 12):
+            ...
+    """
+
+    def decorator(func: F) -> F:
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            client = get_sync_redis_client()
+            if client is None:
+                return func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = {k: v for k, v in bound.arguments.items() if k != "self"}
+            digest = hashlib.blake2b(
+                json.dumps(params, sort_keys=True, default=str).encode(),
+                digest_size=16,
+            ).hexdigest()
+            cache_key = f"{prefix}:{digest}"
+
+            try:
+                cache_metrics["total_requests"] += 1
+                cached_value = client.get(cache_key)
+                if cached_value is not None:
+                    cache_metrics["hits"] += 1
+                    logger.debug(f"Cache HIT for key: {cache_key}")
+                    return json.loads(cached_value)
+                cache_metrics["misses"] += 1
+                logger.debug(f"Cache MISS for key: {cache_key}")
+            except Exception as e:
+                cache_metrics["errors"] += 1
+                logger.error(f"Cache error for key {cache_key}: {e}")
+                return func(*args, **kwargs)
+
+            payload = json.dumps(_with_string_keys(func(*args, **kwargs)), default=str)
+
+            try:
+                client.setex(cache_key, ttl, payload)
+            except Exception as e:
+                cache_metrics["errors"] += 1
+                logger.error(f"Cache set error for key {cache_key}: {e}")
+
+            return json.loads(payload)
+
+        return wrapper
+
+    return decorator
+
+
+def _with_string_keys(value: Any) -> Any:
+    """Copy nested dicts with str() keys; json.dumps rejects e.g. Timestamp keys."""
+    if isinstance(value, dict):
+        return {str(k): _with_string_keys(v) for k, v in value.items()}
+    if isinstance(value, list | tuple):
+        return [_with_string_keys(v) for v in value]
+    return value
+
+
 def _generate_cache_key(prefix: str, args: tuple, kwargs: dict) -> str:
     """Generate unique cache key from function arguments."""
     # Convert args to strings
@@ -234,6 +397,29 @@ async def invalidate_cache_key(key: str) -> bool:
         return False
 
 
+async def invalidate_cache_keys(keys: list[str]) -> int:
+    """
+    Invalidate several cache keys in one round trip.
+
+    Args:
+        keys: Exact cache keys to delete
+
+    Returns:
+        Number of keys deleted
+    """
+    if not keys:
+        return 0
+
+    client = await get_redis_client()
+
+    try:
+        return await client.delete(*keys)
+
+    except Exception as e:
+        logger.error(f"Error invalidating cache keys {keys}: {e}")
+        return 0
+
+
 async def get_cache_stats() -> dict:
     """Get comprehensive cache statistics and performance metrics."""
     client = await get_redis_client()
@@ -460,6 +646,8 @@ __all__ = [
     "close_redis",
     "get_redis_client",
     "cache_key_wrapper",
+    "cached_result",
+    "get_sync_redis_client",
     "invalidate_cache_pattern",
     "invalidate_cache_key",
     "get_cache_stats",
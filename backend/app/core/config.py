@@ -62,6 +62,10 @@ class Settings(BaseSettings):
     REDIS_PASSWORD: str = ""
     REDIS_DB: int = 0
 
+    # Analytics materialized view refresh intervals (seconds)
+    ANALYTICS_ROLLUP_REFRESH_SECONDS: int = 3600
+    ANALYTICS_COHORT_REFRESH_SECONDS: int = 86400
+
     # Server configuration for microservices migration
     BACKEND_PORT: int = 8001  # Legacy backend port (moved from 8000)
     GATEWAY_PORT: int = 8000  # Kong gateway port (main entry point)
@@ -97,6 +101,14 @@ class Settings(BaseSettings):
     SMTP_HOST: str | None = None
     SMTP_USER: str | None = None
     SMTP_PASSWORD: str | None = None
+    SMTP_POOL_SIZE: int = 5
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    # Provider send quota; the SES sandbox allows 14 messages per second
+    EMAIL_RATE_PER_SECOND: float = 14.0
+    EMAIL_BURST: int = 14
+    # Bulk email queue consumers and delivery attempts per message
+    EMAIL_QUEUE_WORKERS: int = 4
+    EMAIL_QUEUE_MAX_ATTEMPTS: int = 3
     # TODO: update type to EmailStr when sqlmodel supports it
     EMAILS_FROM_EMAIL: str | None = None
     EMAILS_FROM_NAME: str | None = None
@@ -115,6 +127,8 @@ class Settings(BaseSettings):
     SENDGRID_API_KEY: str = ""
     MAILGUN_API_KEY: str = ""
     MAILGUN_DOMAIN: str = ""
+    AWS_ACCESS_KEY_ID: str = ""
+    AWS_SECRET_ACCESS_KEY: str = ""
     AWS_SES_REGION: str = "us-east-1"
     
     # Email template configuration
@@ -1,20 +1,92 @@
 # Event Sourcing Infrastructure for Brain2Gain
 # Phase 1: Domain Event Management
 
+import asyncio
+import contextlib
 import json
+import logging
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 from datetime import datetime
+from decimal import Decimal
 from enum import Enum
 from typing import Any
 from uuid import UUID, uuid4
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Identity,
+    Integer,
+    String,
+    Text,
+    func,
+    select,
+    update,
+)
 from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 
-from app.core.database import get_db
+from app.core.cache import invalidate_cache_keys
+from app.core.database import AsyncSessionLocal
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Lifetime of cached reconstructed aggregate state
+AGGREGATE_STATE_CACHE_TTL = 3600
+
+# Outbox drainer: events claimed per batch and idle poll interval (seconds)
+OUTBOX_BATCH_SIZE = 500
+OUTBOX_POLL_INTERVAL = 1.0
+
+# Rows fetched per round trip when streaming an aggregate's events
+EVENT_STREAM_BATCH_SIZE = 500
+
+# Naive datetimes in event payloads are UTC; emit them with a "Z" suffix
+_ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z if orjson else 0
+
+
+def _json_default(value: Any) -> Any:
+    """Encode payload values the JSON encoder has no native support for"""
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            return value.isoformat() + "Z"
+        return value.isoformat().replace("+00:00", "Z")
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def aggregate_state_cache_key(aggregate_type: str, aggregate_id: UUID) -> str:
+    """Redis key of the reconstructed state cached for an aggregate"""
+    return f"aggregate_state:{aggregate_type.lower()}:{aggregate_id}"
+
+
+def dumps_event_payload(payload: dict[str, Any]) -> str:
+    """Serialize event data/metadata; UUID and datetime values are allowed"""
+    if orjson is not None:
+        return orjson.dumps(
+            payload, default=_json_default, option=_ORJSON_OPTIONS
+        ).decode()
+    return json.dumps(payload, default=_json_default)
+
+
+def loads_event_payload(raw: str) -> dict[str, Any]:
+    """Deserialize event data/metadata read from the event store"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
 
 class EventType(str, Enum):
@@ -55,7 +127,7 @@ class EventType(str, Enum):
     PAYMENT_REFUNDED = "payment.refunded"
 
 
-@dataclass
+@dataclass(slots=True)
 class DomainEvent:
     """Base domain event class"""
 
@@ -67,6 +139,8 @@ class DomainEvent:
     metadata: dict[str, Any]
     occurred_at: datetime
     version: int = 1
+    # Event store position, assigned by the database on insert
+    sequence: int | None = None
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -94,6 +168,16 @@ class DomainEvent:
         )
 
 
+@dataclass
+class AggregateSnapshotState:
+    """Aggregate state after replaying its events up to `sequence`"""
+
+    aggregate_id: UUID
+    aggregate_type: str
+    sequence: int
+    state: dict[str, Any]
+
+
 Base = declarative_base()
 
 
@@ -111,6 +195,22 @@ class EventStore(Base):
     occurred_at = Column(DateTime, nullable=False, index=True)
     version = Column(Integer, nullable=False, default=1)
     processed = Column(Boolean, default=False, index=True)
+    # Insertion order; replay resumes after a sequence, not an offset
+    sequence = Column(BigInteger, Identity(), nullable=False, unique=True)
+
+
+class AggregateSnapshot(Base):
+    """Snapshot table for reconstructed aggregate state"""
+
+    __tablename__ = "aggregate_snapshot"
+
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid4)
+    aggregate_id = Column(PostgresUUID(as_uuid=True), nullable=False, index=True)
+    aggregate_type = Column(String(50), nullable=False)
+    # Sequence of the last aggregate event folded into the state
+    sequence = Column(BigInteger, nullable=False)
+    state = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False)
 
 
 class EventHandler(ABC):
@@ -149,17 +249,17 @@ class EventBus:
             for handler in self._handlers[event.event_type]:
                 try:
                     await handler.handle(event)
-                except Exception as e:
+                except Exception:
                     # Log error but don't stop other handlers
-                    print(f"Error handling event {event.id}: {e}")
+                    logger.exception("Error handling event %s", event.id)
 
         # Handle general subscribers
         for handler in self._subscribers:
             if handler.can_handle(event.event_type):
                 try:
                     await handler.handle(event)
-                except Exception as e:
-                    print(f"Error handling event {event.id}: {e}")
+                except Exception:
+                    logger.exception("Error handling event %s", event.id)
 
 
 class EventRepository:
@@ -168,78 +268,171 @@ class EventRepository:
     def __init__(self, db_session: AsyncSession):
         self.db = db_session
 
-    async def save_event(self, event: DomainEvent) -> None:
-        """Save a domain event to the event store"""
-        db_event = EventStore(
+    @staticmethod
+    def _to_db_event(event: DomainEvent, processed: bool = False) -> EventStore:
+        return EventStore(
             id=event.id,
             event_type=event.event_type.value,
             aggregate_id=event.aggregate_id,
             aggregate_type=event.aggregate_type,
-            data=json.dumps(event.data),
-            event_metadata=json.dumps(event.metadata),
+            data=dumps_event_payload(event.data),
+            event_metadata=dumps_event_payload(event.metadata),
+            occurred_at=event.occurred_at,
+            version=event.version,
+            processed=processed,
+        )
+
+    @staticmethod
+    def _to_domain_event(event: EventStore) -> DomainEvent:
+        return DomainEvent(
+            id=event.id,
+            event_type=EventType(event.event_type),
+            aggregate_id=event.aggregate_id,
+            aggregate_type=event.aggregate_type,
+            data=loads_event_payload(event.data),
+            metadata=loads_event_payload(event.event_metadata),
             occurred_at=event.occurred_at,
             version=event.version,
+            sequence=event.sequence,
         )
-        self.db.add(db_event)
+
+    async def _lock_aggregates(self, events: list[DomainEvent]) -> None:
+        """Serialize writers of the same aggregates until this transaction ends
+
+        The sequence is assigned at INSERT, not at commit. Holding a
+        per-aggregate advisory lock from before the insert until the
+        commit means an aggregate's events become visible in sequence
+        order, so replay after a snapshot's sequence cannot skip an
+        event that was still uncommitted when the snapshot was taken.
+        """
+        # Sorted so overlapping batches take the locks in the same order
+        for key in sorted(
+            {f"{event.aggregate_type}:{event.aggregate_id}" for event in events}
+        ):
+            await self.db.execute(
+                select(func.pg_advisory_xact_lock(func.hashtextextended(key, 0)))
+            )
+
+    async def save_event(self, event: DomainEvent) -> None:
+        """Save a domain event to the event store"""
+        await self.save_events([event])
+
+    async def save_events(
+        self, events: list[DomainEvent], processed: bool = False
+    ) -> None:
+        """Save several domain events to the event store in one commit"""
+        await self._lock_aggregates(events)
+        self.db.add_all([self._to_db_event(event, processed) for event in events])
         await self.db.commit()
 
     async def get_events_by_aggregate(
-        self, aggregate_id: UUID, aggregate_type: str = None
+        self, aggregate_id: UUID, aggregate_type: str = None, after_sequence: int = 0
     ) -> list[DomainEvent]:
-        """Get all events for a specific aggregate"""
-        query = self.db.query(EventStore).filter(
-            EventStore.aggregate_id == aggregate_id
-        )
+        """Get events for a specific aggregate stored after after_sequence"""
+        query = select(EventStore).where(EventStore.aggregate_id == aggregate_id)
 
         if aggregate_type:
-            query = query.filter(EventStore.aggregate_type == aggregate_type)
-
-        events = await query.order_by(EventStore.occurred_at).all()
-
-        return [
-            DomainEvent(
-                id=event.id,
-                event_type=EventType(event.event_type),
-                aggregate_id=event.aggregate_id,
-                aggregate_type=event.aggregate_type,
-                data=json.loads(event.data),
-                metadata=json.loads(event.event_metadata),
-                occurred_at=event.occurred_at,
-                version=event.version,
-            )
-            for event in events
-        ]
+            query = query.where(EventStore.aggregate_type == aggregate_type)
+
+        if after_sequence:
+            query = query.where(EventStore.sequence > after_sequence)
+
+        events = await self.db.scalars(query.order_by(EventStore.sequence))
+
+        return [self._to_domain_event(event) for event in events]
+
+    async def stream_events_by_aggregate(
+        self, aggregate_id: UUID, aggregate_type: str = None
+    ) -> AsyncIterator[DomainEvent]:
+        """Yield events for an aggregate from a server-side cursor"""
+        query = select(EventStore).where(EventStore.aggregate_id == aggregate_id)
+
+        if aggregate_type:
+            query = query.where(EventStore.aggregate_type == aggregate_type)
+
+        query = query.order_by(EventStore.sequence).execution_options(
+            yield_per=EVENT_STREAM_BATCH_SIZE
+        )
+
+        async for event in await self.db.stream_scalars(query):
+            yield self._to_domain_event(event)
+
+    @staticmethod
+    def _unprocessed_events_query(limit: int):
+        return (
+            select(EventStore)
+            .where(EventStore.processed.is_(False))
+            .order_by(EventStore.sequence)
+            .limit(limit)
+        )
 
     async def get_unprocessed_events(self, limit: int = 100) -> list[DomainEvent]:
         """Get unprocessed events for batch processing"""
-        events = (
-            await self.db.query(EventStore)
-            .filter(not EventStore.processed)
-            .order_by(EventStore.occurred_at)
-            .limit(limit)
-            .all()
+        events = await self.db.scalars(self._unprocessed_events_query(limit))
+
+        return [self._to_domain_event(event) for event in events]
+
+    async def claim_unprocessed_events(self, limit: int) -> list[DomainEvent]:
+        """Lock a batch of unprocessed events until the transaction ends
+
+        Rows locked by another drainer are skipped, so concurrent drainers
+        never dispatch the same event.
+        """
+        events = await self.db.scalars(
+            self._unprocessed_events_query(limit).with_for_update(skip_locked=True)
         )
 
-        return [
-            DomainEvent(
-                id=event.id,
-                event_type=EventType(event.event_type),
-                aggregate_id=event.aggregate_id,
-                aggregate_type=event.aggregate_type,
-                data=json.loads(event.data),
-                metadata=json.loads(event.event_metadata),
-                occurred_at=event.occurred_at,
-                version=event.version,
+        return [self._to_domain_event(event) for event in events]
+
+    async def mark_events_processed(self, event_ids: list[UUID]) -> None:
+        """Mark events as processed, releasing any claim on them"""
+        await self.db.execute(
+            update(EventStore)
+            .where(EventStore.id.in_(event_ids))
+            .values(processed=True)
+        )
+        await self.db.commit()
+
+    async def save_snapshot(self, snapshot: AggregateSnapshotState) -> None:
+        """Save a snapshot of reconstructed aggregate state"""
+        self.db.add(
+            AggregateSnapshot(
+                aggregate_id=snapshot.aggregate_id,
+                aggregate_type=snapshot.aggregate_type,
+                sequence=snapshot.sequence,
+                state=dumps_event_payload(snapshot.state),
+                created_at=datetime.utcnow(),
             )
-            for event in events
-        ]
+        )
+        await self.db.commit()
+
+    async def get_latest_snapshot(
+        self, aggregate_id: UUID, aggregate_type: str
+    ) -> AggregateSnapshotState | None:
+        """Get the snapshot covering the most events of an aggregate"""
+        snapshot = await self.db.scalar(
+            select(AggregateSnapshot)
+            .where(
+                AggregateSnapshot.aggregate_id == aggregate_id,
+                AggregateSnapshot.aggregate_type == aggregate_type,
+            )
+            .order_by(AggregateSnapshot.sequence.desc())
+            .limit(1)
+        )
+
+        if snapshot is None:
+            return None
+
+        return AggregateSnapshotState(
+            aggregate_id=snapshot.aggregate_id,
+            aggregate_type=snapshot.aggregate_type,
+            sequence=snapshot.sequence,
+            state=loads_event_payload(snapshot.state),
+        )
 
     async def mark_event_processed(self, event_id: UUID) -> None:
         """Mark an event as processed"""
-        await self.db.query(EventStore).filter(EventStore.id == event_id).update(
-            {"processed": True}
-        )
-        await self.db.commit()
+        await self.mark_events_processed([event_id])
 
 
 class EventSourcingMixin:
@@ -355,48 +548,165 @@ event_bus.subscribe(notification_handler)
 
 async def publish_event(event: DomainEvent, persist: bool = True):
     """Publish an event and optionally persist it"""
-    if persist:
-        async with get_db() as db:
-            event_repo = EventRepository(db)
-            await event_repo.save_event(event)
+    await publish_events([event], persist)
+
 
-    await event_bus.publish(event)
+async def _publish_stream(events: list[DomainEvent]):
+    for event in events:
+        await event_bus.publish(event)
+
+
+async def _dispatch_events(events: list[DomainEvent]):
+    """Dispatch each aggregate's events in order, aggregates concurrently"""
+    streams: dict[tuple[str, UUID], list[DomainEvent]] = {}
+    for event in events:
+        streams.setdefault((event.aggregate_type, event.aggregate_id), []).append(
+            event
+        )
+
+    await asyncio.gather(*(_publish_stream(stream) for stream in streams.values()))
+
+
+async def publish_events(events: list[DomainEvent], persist: bool = True):
+    """Publish several events, persisting them in a single commit
+
+    Persisted events go to the event store outbox and are dispatched by
+    the running event processor; without one they are dispatched here.
+    """
+    if not events:
+        return
+
+    if not persist:
+        await _dispatch_events(events)
+        return
+
+    drained = event_processor.running
+    async with AsyncSessionLocal() as db:
+        event_repo = EventRepository(db)
+        await event_repo.save_events(events, processed=not drained)
+    await invalidate_cache_keys(
+        list(
+            {
+                aggregate_state_cache_key(event.aggregate_type, event.aggregate_id)
+                for event in events
+            }
+        )
+    )
+
+    if drained:
+        event_processor.notify()
+    else:
+        await _dispatch_events(events)
 
 
 async def get_aggregate_events(
-    aggregate_id: UUID, aggregate_type: str = None
+    aggregate_id: UUID, aggregate_type: str = None, after_sequence: int = 0
 ) -> list[DomainEvent]:
-    """Get all events for an aggregate"""
-    async with get_db() as db:
+    """Get the events for an aggregate stored after after_sequence"""
+    async with AsyncSessionLocal() as db:
+        event_repo = EventRepository(db)
+        return await event_repo.get_events_by_aggregate(
+            aggregate_id, aggregate_type, after_sequence
+        )
+
+
+async def stream_aggregate_events(
+    aggregate_id: UUID, aggregate_type: str = None
+) -> AsyncIterator[DomainEvent]:
+    """Yield all events for an aggregate without loading them at once"""
+    async with AsyncSessionLocal() as db:
         event_repo = EventRepository(db)
-        return await event_repo.get_events_by_aggregate(aggregate_id, aggregate_type)
+        async for event in event_repo.stream_events_by_aggregate(
+            aggregate_id, aggregate_type
+        ):
+            yield event
+
+
+async def save_snapshot(
+    aggregate_id: UUID, aggregate_type: str, sequence: int, state: dict[str, Any]
+) -> None:
+    """Persist aggregate state reconstructed from its events up to `sequence`"""
+    async with AsyncSessionLocal() as db:
+        event_repo = EventRepository(db)
+        await event_repo.save_snapshot(
+            AggregateSnapshotState(aggregate_id, aggregate_type, sequence, state)
+        )
+
+
+async def get_latest_snapshot(
+    aggregate_id: UUID, aggregate_type: str
+) -> AggregateSnapshotState | None:
+    """Get the most recent snapshot for an aggregate, if any"""
+    async with AsyncSessionLocal() as db:
+        event_repo = EventRepository(db)
+        return await event_repo.get_latest_snapshot(aggregate_id, aggregate_type)
 
 
 # Event Processing Service
 class EventProcessor:
-    """Service for processing unprocessed events in batches"""
+    """Outbox drainer dispatching unprocessed events in batches"""
 
-    def __init__(self, batch_size: int = 100):
+    def __init__(
+        self,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        poll_interval: float = OUTBOX_POLL_INTERVAL,
+    ):
         self.batch_size = batch_size
-
-    async def process_unprocessed_events(self):
-        """Process all unprocessed events"""
-        async with get_db() as db:
+        self.poll_interval = poll_interval
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def notify(self) -> None:
+        """Wake the drainer after new events were stored"""
+        self._wakeup.set()
+
+    async def process_unprocessed_events(self) -> int:
+        """Process all unprocessed events, returning how many were dispatched"""
+        processed = 0
+        async with AsyncSessionLocal() as db:
             event_repo = EventRepository(db)
 
             while True:
-                events = await event_repo.get_unprocessed_events(self.batch_size)
+                events = await event_repo.claim_unprocessed_events(self.batch_size)
 
                 if not events:
                     break
 
-                for event in events:
-                    try:
-                        await event_bus.publish(event)
-                        await event_repo.mark_event_processed(event.id)
-                    except Exception as e:
-                        print(f"Error processing event {event.id}: {e}")
-                        # Could implement retry logic here
+                await _dispatch_events(events)
+                await event_repo.mark_events_processed([event.id for event in events])
+                processed += len(events)
+
+        return processed
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.process_unprocessed_events()
+            except Exception:
+                # Claimed events are rolled back and retried on the next pass
+                logger.exception("Error draining event outbox")
+
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+
+    def start(self) -> None:
+        """Start draining the outbox in a background task"""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background drainer"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
 
 
 # Initialize event processor
@@ -0,0 +1,34 @@
+// Long-lived MJML compiler used by EmailTemplateService.
+//
+// Reads one JSON object per line on stdin ({"mjml": "<mjml>...</mjml>"}) and
+// writes one JSON line per request to stdout: {"html": "..."} on success or
+// {"error": "..."} on failure. A {"ready": true} line is written once mjml
+// has loaded, so the caller can tell a missing install from a crash.
+
+const { execSync } = require("child_process");
+const path = require("path");
+const readline = require("readline");
+
+function loadMjml() {
+  try {
+    return require("mjml");
+  } catch (err) {
+    // `npm install -g mjml` is not on node's default module path
+    const globalRoot = execSync("npm root -g").toString().trim();
+    return require(path.join(globalRoot, "mjml"));
+  }
+}
+
+const mjml2html = loadMjml();
+const write = (reply) => process.stdout.write(JSON.stringify(reply) + "\n");
+
+write({ ready: true });
+
+readline.createInterface({ input: process.stdin }).on("line", (line) => {
+  try {
+    const { mjml } = JSON.parse(line);
+    write({ html: mjml2html(mjml).html });
+  } catch (err) {
+    write({ error: String(err && err.message ? err.message : err) });
+  }
+});
@@ -90,6 +90,32 @@ async def lifespan(_app: FastAPI):
         logger.warning(f"Redis initialization failed: {e}")
         logger.info("Continuing without Redis cache (using mock)")
 
+    # Start consuming the bulk email queue
+    try:
+        from app.services.email_delivery_service import email_delivery_service
+
+        await email_delivery_service.start_queue_workers()
+    except Exception as e:
+        logger.error(f"Error starting email queue workers: {e}")
+
+    # Keep the analytics materialized views current
+    try:
+        from app.services.analytics_refresh_service import (
+            analytics_refresh_scheduler,
+        )
+
+        analytics_refresh_scheduler.start()
+    except Exception as e:
+        logger.error(f"Error starting analytics refresh scheduler: {e}")
+
+    # Start draining the domain event outbox
+    try:
+        from app.core.event_sourcing import event_processor
+
+        event_processor.start()
+    except Exception as e:
+        logger.error(f"Error starting event outbox drainer: {e}")
+
     logger.info("Brain2Gain API started successfully")
 
     yield
@@ -97,6 +123,35 @@ async def lifespan(_app: FastAPI):
     # Shutdown
     logger.info("Shutting down Brain2Gain API...")
 
+    # Stop refreshing analytics views
+    try:
+        from app.services.analytics_refresh_service import (
+            analytics_refresh_scheduler,
+        )
+
+        await analytics_refresh_scheduler.stop()
+    except Exception as e:
+        logger.error(f"Error stopping analytics refresh scheduler: {e}")
+
+    # Stop the event outbox drainer; undispatched events stay in the outbox
+    try:
+        from app.core.event_sourcing import event_processor
+
+        await event_processor.stop()
+    except Exception as e:
+        logger.error(f"Error stopping event outbox drainer: {e}")
+
+    # Stop email queue workers before Redis closes so they can requeue,
+    # then close pooled SMTP connections and MJML workers
+    try:
+        from app.services.email_delivery_service import email_delivery_service
+        from app.services.email_template_service import email_template_service
+
+        await email_delivery_service.aclose()
+        await email_template_service.aclose()
+    except Exception as e:
+        logger.error(f"Error closing email services: {e}")
+
     # Close Redis connection
     try:
         await close_redis()
@@ -1,10 +1,12 @@
 from uuid import UUID
 
+from sqlalchemy import Row, func, literal, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.models import Cart, CartItem
+from app.models import Cart, CartItem, Product, ProductStatus
 
 
 class CartRepository:
@@ -55,6 +57,55 @@ class CartRepository:
         await self.session.refresh(cart_item)
         return cart_item
 
+    async def upsert_cart_item(
+        self, cart_id: int, product_id: int, quantity: int
+    ) -> tuple[ProductStatus, int | None] | None:
+        """
+        Validate the product and insert or increment the cart item in one round-trip.
+
+        Returns None when the product does not exist, otherwise the product
+        status and the resulting item quantity (None if the product is not
+        active and nothing was written).
+        """
+        valid = (
+            select(Product.product_id, Product.status)
+            .where(Product.product_id == product_id)
+            .with_for_update(read=True, key_share=True)
+            .cte("valid")
+        )
+
+        upsert = pg_insert(CartItem).from_select(
+            ["cart_id", "product_id", "quantity", "created_at", "updated_at"],
+            select(
+                literal(cart_id),
+                valid.c.product_id,
+                literal(quantity),
+                func.now(),
+                func.now(),
+            ).where(valid.c.status == ProductStatus.ACTIVE),
+        )
+        upserted = (
+            upsert.on_conflict_do_update(
+                index_elements=[CartItem.cart_id, CartItem.product_id],
+                set_={
+                    "quantity": CartItem.quantity + upsert.excluded.quantity,
+                    "updated_at": func.now(),
+                },
+            )
+            .returning(CartItem.quantity)
+            .cte("upserted")
+        )
+
+        statement = (
+            select(valid.c.status, upserted.c.quantity)
+            .select_from(valid.outerjoin(upserted, true()))
+        )
+
+        result = await self.session.execute(statement)
+        row = result.first()
+        await self.session.commit()
+        return tuple(row) if row is not None else None
+
     async def update_cart_item(self, cart_item: CartItem) -> CartItem:
         """Update cart item quantity"""
         self.session.add(cart_item)
@@ -87,3 +138,35 @@ class CartRepository:
         )
         result = await self.session.exec(statement)
         return result.all()
+
+    async def get_cart_with_totals(self, cart_id: int) -> list[Row]:
+        """
+        Get cart metadata, its items and running totals in a single query.
+
+        Returns one row per item (or a single row with NULL item columns for an
+        empty cart); total_amount and item_count are window sums over the cart.
+        """
+        line_total = Product.unit_price * CartItem.quantity
+        statement = (
+            select(
+                Cart.cart_id,
+                Cart.user_id,
+                Cart.session_id,
+                Cart.created_at,
+                Cart.updated_at,
+                CartItem.product_id,
+                CartItem.quantity,
+                Product.name,
+                Product.sku,
+                Product.unit_price,
+                line_total.label("line_total"),
+                func.sum(line_total).over().label("total_amount"),
+                func.sum(CartItem.quantity).over().label("item_count"),
+            )
+            .select_from(Cart)
+            .outerjoin(CartItem, CartItem.cart_id == Cart.cart_id)
+            .outerjoin(Product, Product.product_id == CartItem.product_id)
+            .where(Cart.cart_id == cart_id)
+        )
+        result = await self.session.execute(statement)
+        return list(result.all())
@@ -0,0 +1,168 @@
+"""
+Analytics Refresh Service - keeps analytics materialized views current
+
+The dashboards read daily rollups and per-customer views instead of the
+live tables. This service refreshes them on a fixed schedule from a
+background task started in the application lifespan.
+
+Each refresh is claimed in Redis for its interval before it runs, so with
+several API workers a view is refreshed once per interval, not once per
+worker. A failed refresh releases its claim and is retried on the next
+tick.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlmodel import Session
+
+from app.core.cache import get_redis_client
+from app.core.config import settings
+from app.core.db import engine
+from app.services.analytics_service import AnalyticsService
+from app.services.cohort_analysis_service import CohortAnalysisService
+from app.services.conversion_funnel_service import ConversionFunnelService
+
+logger = logging.getLogger(__name__)
+
+REFRESH_CLAIM_KEY_PREFIX = "analytics:refresh:"
+# How often the scheduler wakes up to look for due jobs (seconds)
+REFRESH_TICK_SECONDS = 60
+
+
+@dataclass
+class RefreshJob:
+    """A materialized view refresh run every `interval` seconds"""
+
+    name: str
+    interval: int
+    refresh: Callable[[Session], None]
+    next_run: float = 0.0
+
+
+def _refresh_cart_rollups(session: Session) -> None:
+    AnalyticsService(session).refresh_cart_rollups()
+
+
+def _refresh_first_purchases(session: Session) -> None:
+    CohortAnalysisService(session).refresh_first_purchases()
+
+
+def _refresh_funnel_rollups(session: Session) -> None:
+    ConversionFunnelService(session).refresh_funnel_rollups()
+
+
+def default_refresh_jobs() -> list[RefreshJob]:
+    """Refresh jobs for every materialized view read by the analytics API"""
+    return [
+        RefreshJob(
+            "cart_rollups",
+            settings.ANALYTICS_ROLLUP_REFRESH_SECONDS,
+            _refresh_cart_rollups,
+        ),
+        RefreshJob(
+            "cohort_first_purchases",
+            settings.ANALYTICS_COHORT_REFRESH_SECONDS,
+            _refresh_first_purchases,
+        ),
+        RefreshJob(
+            "funnel_rollups",
+            settings.ANALYTICS_ROLLUP_REFRESH_SECONDS,
+            _refresh_funnel_rollups,
+        ),
+    ]
+
+
+class AnalyticsRefreshScheduler:
+    """Background task running analytics view refreshes when they are due"""
+
+    def __init__(self, jobs: list[RefreshJob] | None = None):
+        self.jobs = default_refresh_jobs() if jobs is None else jobs
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _claim(self, job: RefreshJob) -> bool:
+        """Claim a job for one interval so other workers skip it"""
+        try:
+            client = await get_redis_client()
+            return bool(
+                await client.set(
+                    f"{REFRESH_CLAIM_KEY_PREFIX}{job.name}",
+                    str(time.time()),
+                    ex=job.interval,
+                    nx=True,
+                )
+            )
+        except Exception as e:
+            # Without Redis every worker refreshes; Postgres serializes them
+            logger.warning("Could not claim refresh %s: %s", job.name, e)
+            return True
+
+    async def _release(self, job: RefreshJob) -> None:
+        """Drop a claim so the next worker tick can retry a failed refresh"""
+        try:
+            client = await get_redis_client()
+            await client.delete(f"{REFRESH_CLAIM_KEY_PREFIX}{job.name}")
+        except Exception as e:
+            logger.warning("Could not release refresh %s: %s", job.name, e)
+
+    @staticmethod
+    def _run_refresh(job: RefreshJob) -> None:
+        with Session(engine) as session:
+            job.refresh(session)
+
+    async def run_due_jobs(self) -> list[str]:
+        """Run every job whose interval has elapsed; returns the refreshed names"""
+        refreshed = []
+        now = time.monotonic()
+
+        for job in self.jobs:
+            if job.next_run > now:
+                continue
+            job.next_run = now + job.interval
+
+            if not await self._claim(job):
+                continue
+
+            try:
+                await asyncio.to_thread(self._run_refresh, job)
+            except Exception:
+                logger.exception("Analytics refresh %s failed", job.name)
+                # Retry on the next tick instead of waiting out the interval
+                job.next_run = now
+                await self._release(job)
+                continue
+
+            refreshed.append(job.name)
+            logger.info("Refreshed analytics views: %s", job.name)
+
+        return refreshed
+
+    async def _run(self) -> None:
+        while True:
+            await self.run_due_jobs()
+            await asyncio.sleep(REFRESH_TICK_SECONDS)
+
+    def start(self) -> None:
+        """Start refreshing in a background task"""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+
+analytics_refresh_scheduler = AnalyticsRefreshScheduler()
@@ -16,7 +16,7 @@ from datetime import date, datetime, timedelta
 from decimal import Decimal
 from enum import Enum
 
-from sqlmodel import Session, and_, func, select
+from sqlmodel import Session, and_, func, select, text
 
 from .analytics import OrderAnalytics, RevenueAnalytics
 
@@ -294,35 +294,42 @@ class AnalyticsService:
     # ─── CONVERSION METRICS ───────────────────────────────────────────────────
 
     def get_cart_abandonment_rate(self, days: int = 30) -> float:
-        """Calculate cart abandonment rate"""
-        start_date = datetime.utcnow() - timedelta(days=days)
-
-        # Total carts created
-        total_carts = (
-            self.db.exec(
-                select(func.count(Cart.cart_id)).where(Cart.created_at >= start_date)
-            ).first()
-            or 0
-        )
-
-        # Completed orders (carts that converted)
-        completed_orders = (
-            self.db.exec(
-                select(func.count(SalesOrder.so_id)).where(
-                    and_(
-                        SalesOrder.order_date >= start_date,
-                        SalesOrder.status == OrderStatus.COMPLETED,
-                    )
-                )
-            ).first()
-            or 0
-        )
+        """
+        Calculate cart abandonment rate from the daily rollup views.
+
+        mv_cart_daily and mv_order_daily_completed are refreshed hourly by the
+        analytics refresh scheduler, so the rate can lag the live tables by up
+        to an hour in exchange for not scanning every cart on each dashboard
+        poll.
+        """
+        row = self.db.exec(
+            text(
+                """
+                SELECT COALESCE(SUM(c.carts), 0) AS total_carts,
+                       COALESCE(SUM(o.orders), 0) AS completed_orders
+                FROM mv_cart_daily c
+                FULL JOIN mv_order_daily_completed o USING (d)
+                WHERE d >= current_date - :days
+                """
+            ).bindparams(days=days)
+        ).first()
+
+        total_carts = row.total_carts if row else 0
+        completed_orders = row.completed_orders if row else 0
 
         if total_carts == 0:
             return 0.0
 
         abandonment_rate = ((total_carts - completed_orders) / total_carts) * 100
-        return round(abandonment_rate, 2)
+        return round(float(abandonment_rate), 2)
+
+    def refresh_cart_rollups(self) -> None:
+        """Refresh the daily cart/order rollups; run hourly by the scheduler"""
+        self.db.exec(text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_cart_daily"))
+        self.db.exec(
+            text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_order_daily_completed")
+        )
+        self.db.commit()
 
     def calculate_conversion_rate(self, days: int = 30) -> float:
         """Calculate overall conversion rate"""
@@ -4,6 +4,8 @@ Implements JWT tokens, OAuth2, and role-based access control
 """
 
 import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
@@ -11,19 +13,30 @@ from fastapi import HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
 
 from app.core.config import settings
-from app.core.database import engine
+from app.core.db import engine
 from app.models import User, UserCreate
 
 
 class AuthService:
-    def __init__(self):
+    def __init__(self, session: Session | None = None):
+        self.session = session
         self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
         self.algorithm = "HS256"
         self.oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+    @contextmanager
+    def _session_scope(self) -> Iterator[Session]:
+        """Reuse the injected session, or open a short-lived one when standalone"""
+        if self.session is not None:
+            yield self.session
+        else:
+            with Session(engine) as session:
+                yield session
+
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify a password against its hash"""
         return self.pwd_context.verify(plain_password, hashed_password)
@@ -100,7 +113,7 @@ class AuthService:
 
     def authenticate_user(self, email: str, password: str) -> User | None:
         """Authenticate user with email and password"""
-        with Session(engine) as session:
+        with self._session_scope() as session:
             statement = select(User).where(User.email == email)
             user = session.exec(statement).first()
 
@@ -114,26 +127,19 @@ class AuthService:
 
     def get_user_by_email(self, email: str) -> User | None:
         """Get user by email"""
-        with Session(engine) as session:
+        with self._session_scope() as session:
             statement = select(User).where(User.email == email)
             return session.exec(statement).first()
 
     def get_user_by_id(self, user_id: uuid.UUID) -> User | None:
         """Get user by ID"""
-        with Session(engine) as session:
+        with self._session_scope() as session:
             statement = select(User).where(User.id == user_id)
             return session.exec(statement).first()
 
     def create_user(self, user_create: UserCreate) -> User:
-        """Create new user"""
-        # Check if user already exists
-        if self.get_user_by_email(user_create.email):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered",
-            )
-
-        with Session(engine) as session:
+        """Create new user, relying on the unique email index to reject duplicates"""
+        with self._session_scope() as session:
             hashed_password = self.get_password_hash(user_create.password)
 
             user = User(
@@ -144,7 +150,14 @@ class AuthService:
             )
 
             session.add(user)
-            session.commit()
+            try:
+                session.commit()
+            except IntegrityError:
+                session.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Email already registered",
+                )
             session.refresh(user)
             return user
 
@@ -5,7 +5,7 @@ from uuid import UUID
 from fastapi import HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.models import Cart, CartItem
+from app.models import Cart, ProductStatus
 from app.repositories.cart_repository import CartRepository
 from app.repositories.product_repository import ProductRepository
 from app.schemas.cart import (
@@ -22,25 +22,35 @@ class CartService:
         self.cart_repo = CartRepository(session)
         self.product_repo = ProductRepository(session)
 
+    async def _find_cart(
+        self, user_id: UUID | None = None, session_id: str | None = None
+    ) -> Cart | None:
+        """Get the existing cart for a user or session, if any"""
+        if user_id:
+            return await self.cart_repo.get_cart_by_user(user_id)
+        if session_id:
+            return await self.cart_repo.get_cart_by_session(session_id)
+        return None
+
+    async def _create_cart(
+        self, user_id: UUID | None = None, session_id: str | None = None
+    ) -> Cart:
+        cart_data = Cart(
+            user_id=user_id,
+            session_id=session_id,
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow(),
+        )
+        return await self.cart_repo.create_cart(cart_data)
+
     async def get_or_create_cart(
         self, user_id: UUID | None = None, session_id: str | None = None
     ) -> Cart:
         """Get existing cart or create new one"""
-        cart = None
-
-        if user_id:
-            cart = await self.cart_repo.get_cart_by_user(user_id)
-        elif session_id:
-            cart = await self.cart_repo.get_cart_by_session(session_id)
+        cart = await self._find_cart(user_id, session_id)
 
         if not cart:
-            cart_data = Cart(
-                user_id=user_id,
-                session_id=session_id,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
-            )
-            cart = await self.cart_repo.create_cart(cart_data)
+            cart = await self._create_cart(user_id, session_id)
 
         return cart
 
@@ -51,50 +61,36 @@ class CartService:
         session_id: str | None = None,
     ) -> CartRead:
         """Add product to cart"""
-        # Verify product exists and is active
-        product = await self.product_repo.get_by_id(request.product_id)
-        if not product:
+        cart = await self._find_cart(user_id, session_id)
+        if not cart:
+            # Check the product before creating a cart so a rejected item
+            # does not leave an empty cart behind
+            product = await self.product_repo.get_by_id(request.product_id)
+            self._ensure_available(product.status if product else None)
+            cart = await self._create_cart(user_id, session_id)
+
+        # Validate the product and insert or increment the item in one statement
+        upserted = await self.cart_repo.upsert_cart_item(
+            cart.cart_id, request.product_id, request.quantity
+        )
+        self._ensure_available(upserted[0] if upserted else None)
+
+        return await self.get_cart_details(cart.cart_id)
+
+    @staticmethod
+    def _ensure_available(product_status: ProductStatus | None) -> None:
+        """Reject missing (404) and inactive (400) products"""
+        if product_status is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
             )
 
-        if product.status != "ACTIVE":
+        if product_status != ProductStatus.ACTIVE:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Product is not available",
             )
 
-        # Get or create cart
-        cart = await self.get_or_create_cart(user_id, session_id)
-
-        # Check if item already exists in cart
-        existing_item = await self.cart_repo.get_cart_item(
-            cart.cart_id, request.product_id
-        )
-
-        if existing_item:
-            # Update quantity
-            existing_item.quantity += request.quantity
-            existing_item.updated_at = datetime.utcnow()
-            await self.cart_repo.update_cart_item(existing_item)
-        else:
-            # Add new item
-            cart_item = CartItem(
-                cart_id=cart.cart_id,
-                product_id=request.product_id,
-                quantity=request.quantity,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
-            )
-            await self.cart_repo.add_cart_item(cart_item)
-
-        # Update cart timestamp
-        cart.updated_at = datetime.utcnow()
-        self.session.add(cart)
-        await self.session.commit()
-
-        return await self.get_cart_details(cart.cart_id)
-
     async def update_cart_item(
         self,
         product_id: int,
@@ -115,11 +111,6 @@ class CartService:
         cart_item.updated_at = datetime.utcnow()
         await self.cart_repo.update_cart_item(cart_item)
 
-        # Update cart timestamp
-        cart.updated_at = datetime.utcnow()
-        self.session.add(cart)
-        await self.session.commit()
-
         return await self.get_cart_details(cart.cart_id)
 
     async def remove_from_cart(
@@ -139,11 +130,6 @@ class CartService:
 
         await self.cart_repo.remove_cart_item(cart_item)
 
-        # Update cart timestamp
-        cart.updated_at = datetime.utcnow()
-        self.session.add(cart)
-        await self.session.commit()
-
         return await self.get_cart_details(cart.cart_id)
 
     async def get_cart(
@@ -162,38 +148,33 @@ class CartService:
 
     async def get_cart_details(self, cart_id: int) -> CartRead:
         """Get detailed cart information with items and totals"""
-        items = await self.cart_repo.get_cart_items_with_products(cart_id)
-
-        cart_items = []
-        total_amount = Decimal("0.00")
-        item_count = 0
-
-        for item in items:
-            item_total = item.product.unit_price * item.quantity
-            total_amount += item_total
-            item_count += item.quantity
-
-            cart_items.append(
-                CartItemRead(
-                    product_id=item.product_id,
-                    quantity=item.quantity,
-                    product_name=item.product.name,
-                    product_sku=item.product.sku,
-                    unit_price=item.product.unit_price,
-                    total_price=item_total,
-                )
+        rows = await self.cart_repo.get_cart_with_totals(cart_id)
+        if not rows:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Cart not found"
             )
 
-        # Get cart info
-        cart = await self.session.get(Cart, cart_id)
+        cart = rows[0]
+        cart_items = [
+            CartItemRead(
+                product_id=row.product_id,
+                quantity=row.quantity,
+                product_name=row.name,
+                product_sku=row.sku,
+                unit_price=row.unit_price,
+                total_price=row.line_total,
+            )
+            for row in rows
+            if row.product_id is not None
+        ]
 
         return CartRead(
             cart_id=cart_id,
             user_id=cart.user_id,
             session_id=cart.session_id,
             items=cart_items,
-            total_amount=total_amount,
-            item_count=item_count,
+            total_amount=cart.total_amount or Decimal("0.00"),
+            item_count=cart.item_count or 0,
             created_at=cart.created_at,
             updated_at=cart.updated_at,
         )
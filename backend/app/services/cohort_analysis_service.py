@@ -3,12 +3,34 @@ Cohort Analysis Service - Advanced Analytics Phase 2
 Implements cohort retention analysis and revenue cohorts.
 """
 
-from datetime import datetime, timedelta
+from collections.abc import Sequence
+from datetime import datetime
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import text
+from sqlalchemy import TextClause, text
 from sqlmodel import Session
 
+from app.core.cache import cached_result
+
+# Cohort grids only change as orders complete; dashboards can tolerate 15 minutes
+COHORT_CACHE_TTL = 900
+
+# Rows fetched per round trip when streaming cohort results
+COHORT_FETCH_BATCH_SIZE = 10_000
+
+# Insight thresholds (retention values are percentages)
+MONTH1_RETENTION_LOW = 20
+MONTH1_RETENTION_STRONG = 40
+MONTH3_RETENTION_POOR = 15
+MONTH6_RETENTION_EXCELLENT = 25
+RETENTION_TREND_THRESHOLD = 2
+LTV_GROWTH_FACTOR = 1.5
+REVENUE_VARIABILITY_CV = 0.5
+SUSTAINED_ADOPTION_PERIOD = 3
+COHORT_REVENUE_MARGIN = 0.1
+RETENTION_IMPROVEMENT_THRESHOLD = 10
+
 
 class CohortAnalysisService:
     """Service for advanced cohort analysis."""
@@ -33,90 +55,79 @@ class CohortAnalysisService:
         query = text(
             """
             WITH first_purchases AS (
-                SELECT
-                    c.customer_id,
-                    MIN(so.order_date) as first_purchase_date,
-                    DATE_TRUNC('month', MIN(so.order_date)) as cohort_month
-                FROM customers c
-                JOIN sales_orders so ON c.customer_id = so.customer_id
-                WHERE so.status = 'COMPLETED'
-                    AND so.order_date >= :start_date
-                GROUP BY c.customer_id
+                SELECT customer_id, cohort_month
+                FROM mv_customer_first_purchase
+                WHERE cohort_month >= date_trunc('month', timezone('UTC', now()))
+                    - make_interval(months => :months_back)
             ),
             customer_orders AS (
-                SELECT
+                SELECT DISTINCT
                     fp.customer_id,
                     fp.cohort_month,
-                    so.order_date,
-                    DATE_TRUNC('month', so.order_date) as order_month
+                    (EXTRACT(YEAR FROM so.order_date) - EXTRACT(YEAR FROM fp.cohort_month)) * 12
+                        + (EXTRACT(MONTH FROM so.order_date) - EXTRACT(MONTH FROM fp.cohort_month))
+                        as period_number
                 FROM first_purchases fp
                 JOIN sales_orders so ON fp.customer_id = so.customer_id
                 WHERE so.status = 'COMPLETED'
             )
             SELECT
                 cohort_month,
-                order_month,
-                COUNT(DISTINCT customer_id) as customers
+                period_number::int as period_number,
+                COUNT(*) as customers
             FROM customer_orders
-            GROUP BY cohort_month, order_month
-            ORDER BY cohort_month, order_month
+            GROUP BY cohort_month, period_number
+            ORDER BY cohort_month, period_number
         """
         )
 
-        start_date = datetime.utcnow() - timedelta(days=months_back * 30)
-        result = self.db.execute(query, {"start_date": start_date})
-        data = result.fetchall()
+        # Stream into typed columns; period_number (months since cohort start) comes from SQL
+        cohort_months, period_numbers, customers = self._fetch_columns(
+            query,
+            {"months_back": months_back},
+            ("datetime64[ns]", np.int64, np.float64),
+        )
 
-        if not data:
+        if not len(cohort_months):
             return {}
 
-        # Convert to DataFrame
-        df = pd.DataFrame(data, columns=["cohort_month", "order_month", "customers"])
-        df["cohort_month"] = pd.to_datetime(df["cohort_month"])
-        df["order_month"] = pd.to_datetime(df["order_month"])
-
-        # Calculate period number (months since cohort start)
-        df["period_number"] = (
-            ((df["order_month"] - df["cohort_month"]).dt.days / 30.44)
-            .round()
-            .astype(int)
-        )
-
         # Create cohort table
-        cohort_data = df.pivot_table(
-            index="cohort_month",
-            columns="period_number",
-            values="customers",
-            fill_value=0,
+        cohort_data = self._pivot_periods(
+            cohort_months, period_numbers, customers, months_back + 1
         )
 
-        # Calculate cohort sizes (period 0)
-        cohort_sizes = cohort_data.iloc[:, 0]
+        # Work on the raw grid; DataFrames are only rebuilt for serialization
+        grid = cohort_data.to_numpy()
+        periods = cohort_data.columns.to_numpy()
 
-        # Calculate retention rates
-        retention_table = cohort_data.divide(cohort_sizes, axis=0)
+        # Calculate cohort sizes (period 0)
+        cohort_sizes = grid[:, 0]
 
-        # Convert to percentage
-        retention_percentage = retention_table * 100
+        # Calculate retention rates as percentages
+        retention = grid / cohort_sizes[:, None] * 100
+        retention_percentage = pd.DataFrame(
+            retention, index=cohort_data.index, columns=cohort_data.columns
+        )
 
         # Calculate average retention by period
-        avg_retention = retention_percentage.mean(axis=0)
+        avg_retention = retention.mean(axis=0)
 
         return {
             "cohort_data": {
-                "raw_data": cohort_data.fillna(0).to_dict(),
-                "retention_rates": retention_percentage.fillna(0).round(1).to_dict(),
-                "cohort_sizes": cohort_sizes.to_dict(),
+                "raw_data": self._grid_to_dict(cohort_data),
+                "retention_rates": self._grid_to_dict(retention_percentage, 1),
+                "cohort_sizes": cohort_data.iloc[:, 0].to_dict(),
             },
             "summary": {
                 "total_cohorts": len(cohort_data),
-                "avg_retention_by_period": avg_retention.fillna(0).round(1).to_dict(),
+                "avg_retention_by_period": pd.Series(avg_retention, index=periods)
+                .fillna(0)
+                .round(1)
+                .to_dict(),
                 "total_customers_analyzed": int(cohort_sizes.sum()),
                 "analysis_period_months": months_back,
             },
-            "insights": self._generate_retention_insights(
-                retention_percentage, avg_retention
-            ),
+            "insights": self._generate_retention_insights(periods, avg_retention),
             "calculated_at": datetime.utcnow().isoformat(),
         }
 
@@ -133,98 +144,79 @@ class CohortAnalysisService:
         query = text(
             """
             WITH first_purchases AS (
-                SELECT
-                    c.customer_id,
-                    MIN(so.order_date) as first_purchase_date,
-                    DATE_TRUNC('month', MIN(so.order_date)) as cohort_month
-                FROM customers c
-                JOIN sales_orders so ON c.customer_id = so.customer_id
-                WHERE so.status = 'COMPLETED'
-                    AND so.order_date >= :start_date
-                GROUP BY c.customer_id
+                SELECT customer_id, cohort_month
+                FROM mv_customer_first_purchase
+                WHERE cohort_month >= date_trunc('month', timezone('UTC', now()))
+                    - make_interval(months => :months_back)
             ),
             customer_revenue AS (
                 SELECT
                     fp.customer_id,
                     fp.cohort_month,
-                    DATE_TRUNC('month', t.transaction_date) as revenue_month,
+                    (EXTRACT(YEAR FROM t.transaction_date) - EXTRACT(YEAR FROM fp.cohort_month)) * 12
+                        + (EXTRACT(MONTH FROM t.transaction_date) - EXTRACT(MONTH FROM fp.cohort_month))
+                        as period_number,
                     SUM(t.amount) as revenue
                 FROM first_purchases fp
                 JOIN transactions t ON fp.customer_id = t.customer_id
                 WHERE t.transaction_type = 'SALE'
                     AND t.status = 'COMPLETED'
                     AND t.paid = true
-                GROUP BY fp.customer_id, fp.cohort_month, DATE_TRUNC('month', t.transaction_date)
+                GROUP BY fp.customer_id, fp.cohort_month, period_number
             )
             SELECT
                 cohort_month,
-                revenue_month,
-                COUNT(DISTINCT customer_id) as customers,
+                period_number::int as period_number,
+                COUNT(*) as customers,
                 SUM(revenue) as total_revenue,
-                AVG(revenue) as avg_revenue_per_customer
+                SUM(SUM(revenue)) OVER () as grand_total
             FROM customer_revenue
-            GROUP BY cohort_month, revenue_month
-            ORDER BY cohort_month, revenue_month
+            GROUP BY cohort_month, period_number
+            ORDER BY cohort_month, period_number
         """
         )
 
-        start_date = datetime.utcnow() - timedelta(days=months_back * 30)
-        result = self.db.execute(query, {"start_date": start_date})
-        data = result.fetchall()
-
-        if not data:
-            return {}
-
-        # Convert to DataFrame
-        df = pd.DataFrame(
-            data,
-            columns=[
-                "cohort_month",
-                "revenue_month",
-                "customers",
-                "total_revenue",
-                "avg_revenue_per_customer",
-            ],
+        # Stream into typed columns
+        (
+            cohort_months,
+            period_numbers,
+            customers,
+            total_revenue,
+            grand_total,
+        ) = self._fetch_columns(
+            query,
+            {"months_back": months_back},
+            ("datetime64[ns]", np.int64, np.float64, np.float64, np.float64),
         )
-        df["cohort_month"] = pd.to_datetime(df["cohort_month"])
-        df["revenue_month"] = pd.to_datetime(df["revenue_month"])
 
-        # Calculate period number
-        df["period_number"] = (
-            ((df["revenue_month"] - df["cohort_month"]).dt.days / 30.44)
-            .round()
-            .astype(int)
-        )
+        if not len(cohort_months):
+            return {}
 
         # Create revenue cohort tables
-        revenue_table = df.pivot_table(
-            index="cohort_month",
-            columns="period_number",
-            values="total_revenue",
-            fill_value=0,
+        revenue_table = self._pivot_periods(
+            cohort_months, period_numbers, total_revenue, months_back + 1
         )
-
-        avg_revenue_table = df.pivot_table(
-            index="cohort_month",
-            columns="period_number",
-            values="avg_revenue_per_customer",
-            fill_value=0,
+        customers_table = self._pivot_periods(
+            cohort_months, period_numbers, customers, months_back + 1
         )
 
+        # Average revenue per customer falls out of the two grids cell by cell
+        avg_revenue_table = revenue_table.divide(
+            customers_table.replace(0, np.nan)
+        ).fillna(0)
+
         # Calculate cumulative revenue
         cumulative_revenue = revenue_table.cumsum(axis=1)
 
-        # Calculate LTV by cohort
-        ltv_table = cumulative_revenue.copy()
+        # LTV by cohort is the cumulative revenue; neither frame is mutated below
+        ltv_table = cumulative_revenue
 
         return {
             "revenue_cohorts": {
-                "monthly_revenue": revenue_table.fillna(0).round(2).to_dict(),
-                "cumulative_revenue": cumulative_revenue.fillna(0).round(2).to_dict(),
-                "avg_revenue_per_customer": avg_revenue_table.fillna(0)
-                .round(2)
-                .to_dict(),
-                "customer_ltv": ltv_table.fillna(0).round(2).to_dict(),
+                "monthly_revenue": self._grid_to_dict(revenue_table, 2),
+                "cumulative_revenue": self._grid_to_dict(cumulative_revenue, 2),
+                "avg_revenue_per_customer": self._grid_to_dict(avg_revenue_table, 2),
+                "customer_ltv": self._grid_to_dict(ltv_table, 2),
             },
             "summary": {
                 "total_cohorts": len(revenue_table),
@@ -236,15 +228,19 @@ class CohortAnalysisService:
                 .fillna(0)
                 .round(2)
                 .to_dict(),
-                "total_revenue_analyzed": float(revenue_table.sum().sum()),
+                # Same on every row; computed by the query's window aggregate
+                "total_revenue_analyzed": float(grand_total[0]),
                 "analysis_period_months": months_back,
             },
             "insights": self._generate_revenue_cohort_insights(
-                revenue_table, ltv_table
+                revenue_table.columns.to_numpy(),
+                revenue_table.to_numpy(),
+                ltv_table.to_numpy(),
             ),
             "calculated_at": datetime.utcnow().isoformat(),
         }
 
+    @cached_result("cohorts:product_adoption", ttl=COHORT_CACHE_TTL)
     def calculate_product_adoption_cohorts(
         self, product_category: str | None = None
     ) -> dict:
@@ -263,42 +259,34 @@ class CohortAnalysisService:
 
         query = text(
             f"""
-            WITH first_purchases AS (
-                SELECT
-                    c.customer_id,
-                    MIN(so.order_date) as first_purchase_date,
-                    DATE_TRUNC('month', MIN(so.order_date)) as cohort_month
-                FROM customers c
-                JOIN sales_orders so ON c.customer_id = so.customer_id
-                WHERE so.status = 'COMPLETED'
-                GROUP BY c.customer_id
-            ),
-            product_purchases AS (
+            WITH product_purchases AS (
                 SELECT
                     fp.customer_id,
                     fp.cohort_month,
                     p.name as product_name,
                     p.category,
-                    DATE_TRUNC('month', so.order_date) as purchase_month,
+                    (EXTRACT(YEAR FROM so.order_date) - EXTRACT(YEAR FROM fp.cohort_month)) * 12
+                        + (EXTRACT(MONTH FROM so.order_date) - EXTRACT(MONTH FROM fp.cohort_month))
+                        as period_number,
                     COUNT(*) as purchase_count
-                FROM first_purchases fp
+                FROM mv_customer_first_purchase fp
                 JOIN sales_orders so ON fp.customer_id = so.customer_id
                 JOIN sales_items si ON so.order_id = si.order_id
                 JOIN products p ON si.product_id = p.product_id
                 WHERE so.status = 'COMPLETED'
                     {category_filter}
-                GROUP BY fp.customer_id, fp.cohort_month, p.name, p.category, DATE_TRUNC('month', so.order_date)
+                GROUP BY fp.customer_id, fp.cohort_month, p.name, p.category, period_number
             )
             SELECT
                 cohort_month,
                 product_name,
                 category,
-                purchase_month,
-                COUNT(DISTINCT customer_id) as customers,
+                period_number::int as period_number,
+                COUNT(*) as customers,
                 SUM(purchase_count) as total_purchases
             FROM product_purchases
-            GROUP BY cohort_month, product_name, category, purchase_month
-            ORDER BY cohort_month, product_name, purchase_month
+            GROUP BY cohort_month, product_name, category, period_number
+            ORDER BY cohort_month, product_name, period_number
         """
         )
 
@@ -319,37 +307,40 @@ class CohortAnalysisService:
                 "cohort_month",
                 "product_name",
                 "category",
-                "purchase_month",
+                "period_number",
                 "customers",
                 "total_purchases",
             ],
         )
-
-        # Calculate period number
         df["cohort_month"] = pd.to_datetime(df["cohort_month"])
-        df["purchase_month"] = pd.to_datetime(df["purchase_month"])
-        df["period_number"] = (
-            ((df["purchase_month"] - df["cohort_month"]).dt.days / 30.44)
-            .round()
-            .astype(int)
+
+        # Low-cardinality labels repeated on every row; group on int codes
+        df["product_name"] = df["product_name"].astype("category")
+        df["category"] = df["category"].astype("category")
+
+        # Build every product's adoption grid in one pass, then slice per product
+        adoption = (
+            df.groupby(
+                ["product_name", "cohort_month", "period_number"], observed=True
+            )["customers"]
+            .sum()
+            .unstack(fill_value=0)
+            .astype(float)
         )
+        product_categories = df.drop_duplicates("product_name").set_index(
+            "product_name"
+        )["category"]
 
-        # Group by product and create adoption tables
         product_adoption = {}
 
-        for product in df["product_name"].unique():
-            product_data = df[df["product_name"] == product]
-
-            adoption_table = product_data.pivot_table(
-                index="cohort_month",
-                columns="period_number",
-                values="customers",
-                fill_value=0,
-            )
+        for product, category in product_categories.items():
+            adoption_table = adoption.xs(product, level="product_name")
+            # Keep only the periods this product was actually bought in
+            adoption_table = adoption_table.loc[:, adoption_table.any(axis=0)]
 
             product_adoption[product] = {
-                "adoption_table": adoption_table.fillna(0).to_dict(),
-                "category": product_data["category"].iloc[0],
+                "adoption_table": self._grid_to_dict(adoption_table),
+                "category": category,
                 "total_customers": int(adoption_table.sum().sum()),
                 "peak_adoption_period": (
                     int(adoption_table.mean(axis=0).idxmax())
@@ -370,18 +361,20 @@ class CohortAnalysisService:
             "calculated_at": datetime.utcnow().isoformat(),
         }
 
+    @cached_result("cohorts:comparison", ttl=COHORT_CACHE_TTL)
     def get_cohort_comparison(
         self,
-        cohort1_start: datetime,
-        cohort2_start: datetime,
+        cohort_starts: list[datetime],
         comparison_periods: int = 6,
     ) -> dict:
         """
-        Compare two specific cohorts side by side.
+        Compare specific cohorts side by side.
+
+        Every cohort is fetched in a single query; later cohorts are measured
+        against the first one as the baseline.
 
         Args:
-            cohort1_start: Start date of first cohort
-            cohort2_start: Start date of second cohort
+            cohort_starts: Start dates of the cohorts to compare, oldest first
             comparison_periods: Number of periods to compare
 
         Returns:
@@ -389,159 +382,234 @@ class CohortAnalysisService:
         """
         query = text(
             """
-            WITH cohort_data AS (
+            WITH cohort_orders AS (
                 SELECT
-                    c.customer_id,
-                    DATE_TRUNC('month', MIN(so.order_date)) as cohort_month,
-                    so.order_date,
-                    t.amount
-                FROM customers c
-                JOIN sales_orders so ON c.customer_id = so.customer_id
+                    fp.customer_id,
+                    fp.cohort_month,
+                    (EXTRACT(YEAR FROM so.order_date) - EXTRACT(YEAR FROM fp.cohort_month)) * 12
+                        + (EXTRACT(MONTH FROM so.order_date) - EXTRACT(MONTH FROM fp.cohort_month))
+                        as period_number,
+                    SUM(t.amount) as amount
+                FROM mv_customer_first_purchase fp
+                JOIN sales_orders so ON fp.customer_id = so.customer_id
                 JOIN transactions t ON so.order_id = t.order_id
-                WHERE so.status = 'COMPLETED'
+                WHERE fp.cohort_month = ANY(:cohorts)
+                    AND so.status = 'COMPLETED'
                     AND t.transaction_type = 'SALE'
                     AND t.status = 'COMPLETED'
                     AND t.paid = true
-                    AND (DATE_TRUNC('month', so.order_date) = :cohort1
-                         OR DATE_TRUNC('month', so.order_date) = :cohort2)
-                GROUP BY c.customer_id, DATE_TRUNC('month', MIN(so.order_date)), so.order_date, t.amount
+                GROUP BY fp.customer_id, fp.cohort_month, period_number
             )
             SELECT
                 cohort_month,
-                DATE_TRUNC('month', order_date) as order_month,
-                COUNT(DISTINCT customer_id) as customers,
+                period_number::int as period_number,
+                COUNT(*) as customers,
                 SUM(amount) as revenue
-            FROM cohort_data
-            GROUP BY cohort_month, DATE_TRUNC('month', order_date)
-            ORDER BY cohort_month, order_month
+            FROM cohort_orders
+            GROUP BY cohort_month, period_number
+            ORDER BY cohort_month, period_number
         """
         )
 
-        result = self.db.execute(
-            query,
-            {
-                "cohort1": cohort1_start.replace(day=1),
-                "cohort2": cohort2_start.replace(day=1),
-            },
-        )
+        cohort_months = [
+            datetime(start.year, start.month, 1) for start in cohort_starts
+        ]
+        result = self.db.execute(query, {"cohorts": cohort_months})
         data = result.fetchall()
 
         if not data:
             return {}
 
         df = pd.DataFrame(
-            data, columns=["cohort_month", "order_month", "customers", "revenue"]
+            data, columns=["cohort_month", "period_number", "customers", "revenue"]
         )
         df["cohort_month"] = pd.to_datetime(df["cohort_month"])
-        df["order_month"] = pd.to_datetime(df["order_month"])
-        df["period_number"] = (
-            ((df["order_month"] - df["cohort_month"]).dt.days / 30.44)
-            .round()
-            .astype(int)
-        )
-
-        # Separate cohorts
-        cohort1_data = df[df["cohort_month"] == cohort1_start.replace(day=1)]
-        cohort2_data = df[df["cohort_month"] == cohort2_start.replace(day=1)]
-
-        comparison = {
-            "cohort1": {
-                "start_date": cohort1_start.isoformat(),
-                "retention": cohort1_data.set_index("period_number")[
-                    "customers"
-                ].to_dict(),
-                "revenue": cohort1_data.set_index("period_number")["revenue"].to_dict(),
-                "total_customers": int(
-                    cohort1_data[cohort1_data["period_number"] == 0]["customers"].sum()
-                ),
-                "total_revenue": float(cohort1_data["revenue"].sum()),
-            },
-            "cohort2": {
-                "start_date": cohort2_start.isoformat(),
-                "retention": cohort2_data.set_index("period_number")[
-                    "customers"
-                ].to_dict(),
-                "revenue": cohort2_data.set_index("period_number")["revenue"].to_dict(),
-                "total_customers": int(
-                    cohort2_data[cohort2_data["period_number"] == 0]["customers"].sum()
-                ),
-                "total_revenue": float(cohort2_data["revenue"].sum()),
-            },
-        }
 
-        # Calculate comparison metrics
-        if (
-            comparison["cohort1"]["total_customers"] > 0
-            and comparison["cohort2"]["total_customers"] > 0
+        # Split the batched rows back out per requested cohort
+        comparison = {}
+        for i, (start, month) in enumerate(
+            zip(cohort_starts, cohort_months, strict=True), 1
         ):
-            retention_improvement = {}
-            revenue_improvement = {}
-
-            for period in range(comparison_periods):
-                c1_retention = comparison["cohort1"]["retention"].get(period, 0)
-                c2_retention = comparison["cohort2"]["retention"].get(period, 0)
-                c1_revenue = comparison["cohort1"]["revenue"].get(period, 0)
-                c2_revenue = comparison["cohort2"]["revenue"].get(period, 0)
-
-                if c1_retention > 0:
-                    retention_improvement[period] = (
-                        (c2_retention - c1_retention) / c1_retention
-                    ) * 100
-
-                if c1_revenue > 0:
-                    revenue_improvement[period] = (
-                        (c2_revenue - c1_revenue) / c1_revenue
-                    ) * 100
-
-            comparison["improvements"] = {
-                "retention_improvement_percentage": retention_improvement,
-                "revenue_improvement_percentage": revenue_improvement,
+            cohort_data = df[df["cohort_month"] == month].set_index("period_number")
+            comparison[f"cohort{i}"] = {
+                "start_date": start.isoformat(),
+                "retention": cohort_data["customers"].to_dict(),
+                "revenue": cohort_data["revenue"].to_dict(),
+                "total_customers": int(cohort_data["customers"].get(0, 0)),
+                "total_revenue": float(cohort_data["revenue"].sum()),
             }
 
+        # Calculate comparison metrics against the baseline cohort
+        baseline = comparison.get("cohort1")
+        improvements = {}
+        if baseline and baseline["total_customers"] > 0:
+            for key, cohort in list(comparison.items())[1:]:
+                if cohort["total_customers"] == 0:
+                    continue
+
+                retention_improvement = {}
+                revenue_improvement = {}
+
+                for period in range(comparison_periods):
+                    c1_retention = baseline["retention"].get(period, 0)
+                    c2_retention = cohort["retention"].get(period, 0)
+                    c1_revenue = baseline["revenue"].get(period, 0)
+                    c2_revenue = cohort["revenue"].get(period, 0)
+
+                    if c1_retention > 0:
+                        retention_improvement[period] = (
+                            (c2_retention - c1_retention) / c1_retention
+                        ) * 100
+
+                    if c1_revenue > 0:
+                        revenue_improvement[period] = (
+                            (c2_revenue - c1_revenue) / c1_revenue
+                        ) * 100
+
+                improvements[key] = {
+                    "retention_improvement_percentage": retention_improvement,
+                    "revenue_improvement_percentage": revenue_improvement,
+                }
+
+        if improvements:
+            comparison["improvements"] = improvements
+
         return {
             "comparison": comparison,
             "insights": self._generate_comparison_insights(comparison),
             "calculated_at": datetime.utcnow().isoformat(),
         }
 
+    def refresh_first_purchases(self) -> None:
+        """Refresh the per-customer cohort month view; run nightly by the scheduler."""
+        self.db.execute(
+            text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_customer_first_purchase")
+        )
+        self.db.commit()
+
+    def _fetch_columns(
+        self, query: TextClause, params: dict, dtypes: Sequence
+    ) -> list[np.ndarray]:
+        """
+        Execute a query and stream its rows into one typed array per column.
+
+        Rows are pulled COHORT_FETCH_BATCH_SIZE at a time through a server-side
+        cursor, so only a single batch of Python tuples is alive at once.
+        """
+        result = self.db.execute(
+            query, params, execution_options={"yield_per": COHORT_FETCH_BATCH_SIZE}
+        )
+
+        chunks: list[list[np.ndarray]] = [[] for _ in dtypes]
+        for batch in result.partitions():
+            for chunk, column, dtype in zip(
+                chunks, zip(*batch, strict=True), dtypes, strict=True
+            ):
+                chunk.append(np.asarray(column, dtype=dtype))
+
+        return [
+            np.concatenate(chunk) if chunk else np.empty(0, dtype=dtype)
+            for chunk, dtype in zip(chunks, dtypes, strict=True)
+        ]
+
+    @staticmethod
+    def _pivot_periods(
+        cohort_months: Sequence,
+        period_numbers: Sequence,
+        values: Sequence,
+        n_periods: int,
+    ) -> pd.DataFrame:
+        """
+        Reshape long cohort columns into a cohort_month x period_number grid.
+
+        Periods are already small ints bounded by the analysis window, so each
+        row maps to a flat cell index (cohort * n_periods + period) and a single
+        np.bincount sums the values into an (n_cohorts, n_periods) grid. Only
+        observed periods become columns; missing cells are 0.
+        """
+        cohort_idx, cohorts = pd.factorize(pd.to_datetime(cohort_months), sort=True)
+        period_idx = np.asarray(period_numbers, dtype=np.int64)
+        weights = np.asarray(values, dtype=float)
+
+        in_window = (period_idx >= 0) & (period_idx < n_periods)
+        cohort_idx = cohort_idx[in_window]
+        period_idx = period_idx[in_window]
+
+        grid = np.bincount(
+            cohort_idx * n_periods + period_idx,
+            weights=weights[in_window],
+            minlength=len(cohorts) * n_periods,
+        ).reshape(len(cohorts), n_periods)
+
+        observed = np.bincount(period_idx, minlength=n_periods) > 0
+        return pd.DataFrame(
+            grid[:, observed],
+            index=pd.Index(cohorts, name="cohort_month"),
+            columns=pd.Index(np.flatnonzero(observed), name="period_number"),
+        )
+
+    @staticmethod
+    def _grid_to_dict(table: pd.DataFrame, decimals: int | None = None) -> dict:
+        """
+        Serialize a cohort grid as {period: {cohort_month: value}}.
+
+        Same shape as DataFrame.to_dict() with NaN as 0, but built from one
+        tolist() of the whole array instead of boxing every cell in pandas.
+        """
+        values = table.to_numpy(dtype=float)
+        values = np.where(np.isnan(values), 0.0, values)
+        if decimals is not None:
+            values = values.round(decimals)
+
+        index = table.index.tolist()
+        return {
+            period: dict(zip(index, column, strict=True))
+            for period, column in zip(
+                table.columns.tolist(), values.T.tolist(), strict=True
+            )
+        }
+
     def _generate_retention_insights(
-        self, retention_table: pd.DataFrame, avg_retention: pd.Series
+        self, periods: np.ndarray, avg_retention: np.ndarray
     ) -> list[str]:
         """Generate insights from retention analysis."""
         insights = []
+        retention_by_period = dict(
+            zip(periods.tolist(), avg_retention.tolist(), strict=True)
+        )
 
         # Check retention at key periods
-        if 1 in avg_retention.index:
-            month1_retention = avg_retention[1]
-            if month1_retention < 20:
+        if 1 in retention_by_period:
+            month1_retention = retention_by_period[1]
+            if month1_retention < MONTH1_RETENTION_LOW:
                 insights.append(
                     f"Low 1-month retention ({month1_retention:.1f}%) indicates onboarding issues"
                 )
-            elif month1_retention > 40:
+            elif month1_retention > MONTH1_RETENTION_STRONG:
                 insights.append(
                     f"Strong 1-month retention ({month1_retention:.1f}%) shows good product-market fit"
                 )
 
-        if 3 in avg_retention.index:
-            month3_retention = avg_retention[3]
-            if month3_retention < 15:
+        if 3 in retention_by_period:
+            month3_retention = retention_by_period[3]
+            if month3_retention < MONTH3_RETENTION_POOR:
                 insights.append(
                     f"Poor 3-month retention ({month3_retention:.1f}%) suggests engagement problems"
                 )
 
-        if 6 in avg_retention.index:
-            month6_retention = avg_retention[6]
-            if month6_retention > 25:
+        if 6 in retention_by_period:
+            month6_retention = retention_by_period[6]
+            if month6_retention > MONTH6_RETENTION_EXCELLENT:
                 insights.append(
                     f"Excellent 6-month retention ({month6_retention:.1f}%) indicates strong customer loyalty"
                 )
 
         # Check for improving/declining trends
         if len(avg_retention) >= 3:
-            recent_trend = avg_retention.tail(3).diff().mean()
-            if recent_trend > 2:
+            recent_trend = np.diff(avg_retention[-3:]).mean()
+            if recent_trend > RETENTION_TREND_THRESHOLD:
                 insights.append("Retention rates are improving over recent cohorts")
-            elif recent_trend < -2:
+            elif recent_trend < -RETENTION_TREND_THRESHOLD:
                 insights.append(
                     "Retention rates are declining - investigate recent changes"
                 )
@@ -549,33 +617,26 @@ class CohortAnalysisService:
         return insights
 
     def _generate_revenue_cohort_insights(
-        self, revenue_table: pd.DataFrame, ltv_table: pd.DataFrame
+        self, periods: np.ndarray, revenue: np.ndarray, ltv: np.ndarray
     ) -> list[str]:
         """Generate insights from revenue cohort analysis."""
         insights = []
 
         # Check LTV progression
-        if not ltv_table.empty:
-            avg_ltv_6m = (
-                ltv_table.iloc[:, :7].iloc[:, -1].mean()
-                if ltv_table.shape[1] >= 7
-                else 0
-            )
-            avg_ltv_12m = (
-                ltv_table.iloc[:, :13].iloc[:, -1].mean()
-                if ltv_table.shape[1] >= 13
-                else avg_ltv_6m
-            )
+        if ltv.size:
+            avg_ltv_6m = ltv[:, 6].mean() if ltv.shape[1] >= 7 else 0
+            avg_ltv_12m = ltv[:, 12].mean() if ltv.shape[1] >= 13 else avg_ltv_6m
 
-            if avg_ltv_12m > avg_ltv_6m * 1.5:
+            if avg_ltv_12m > avg_ltv_6m * LTV_GROWTH_FACTOR:
                 insights.append(
                     f"Strong LTV growth from 6m (${avg_ltv_6m:.0f}) to 12m (${avg_ltv_12m:.0f})"
                 )
 
-        # Check revenue consistency
-        if not revenue_table.empty:
-            cv = revenue_table.std(axis=0) / revenue_table.mean(axis=0)
-            high_variability_periods = cv[cv > 0.5].index.tolist()
+        # Check revenue consistency (needs at least two cohorts for a spread)
+        if revenue.shape[0] > 1:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cv = revenue.std(axis=0, ddof=1) / revenue.mean(axis=0)
+            high_variability_periods = periods[cv > REVENUE_VARIABILITY_CV].tolist()
 
             if high_variability_periods:
                 insights.append(
@@ -604,7 +665,7 @@ class CohortAnalysisService:
         sustained_products = [
             product
             for product, data in product_adoption.items()
-            if data["peak_adoption_period"] > 3
+            if data["peak_adoption_period"] > SUSTAINED_ADOPTION_PERIOD
         ]
 
         if sustained_products:
@@ -618,31 +679,33 @@ class CohortAnalysisService:
         """Generate insights from cohort comparison."""
         insights = []
 
-        c1 = comparison["cohort1"]
-        c2 = comparison["cohort2"]
+        cohort_keys = [key for key in comparison if key != "improvements"]
+        if len(cohort_keys) < 2:
+            return insights
+
+        # Compare the newest cohort's overall performance with the baseline
+        c1 = comparison[cohort_keys[0]]
+        c2 = comparison[cohort_keys[-1]]
 
-        # Compare overall performance
-        if c2["total_revenue"] > c1["total_revenue"] * 1.1:
+        if c2["total_revenue"] > c1["total_revenue"] * (1 + COHORT_REVENUE_MARGIN):
             insights.append(
                 "Newer cohort shows significantly better revenue performance"
             )
-        elif c2["total_revenue"] < c1["total_revenue"] * 0.9:
+        elif c2["total_revenue"] < c1["total_revenue"] * (1 - COHORT_REVENUE_MARGIN):
             insights.append("Newer cohort underperforming compared to previous cohort")
 
         # Check retention improvements
-        if "improvements" in comparison:
-            retention_improvements = comparison["improvements"][
-                "retention_improvement_percentage"
-            ]
+        for key, improvements in comparison.get("improvements", {}).items():
+            retention_improvements = improvements["retention_improvement_percentage"]
             positive_periods = [
                 p
                 for p, improvement in retention_improvements.items()
-                if improvement > 10
+                if improvement > RETENTION_IMPROVEMENT_THRESHOLD
             ]
 
             if positive_periods:
                 insights.append(
-                    f"Strong retention improvements in periods {positive_periods}"
+                    f"Strong retention improvements for {key} in periods {positive_periods}"
                 )
 
         return insights
@@ -3,12 +3,42 @@ Conversion Funnel Service - Advanced Analytics Phase 2
 Implements detailed conversion funnel analysis with multi-step tracking.
 """
 
-from datetime import datetime, timedelta
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
 from enum import Enum
+from operator import itemgetter
+from typing import ClassVar
 
+import numpy as np
 from sqlalchemy import text
 from sqlmodel import Session
 
+from app.core.cache import cached_result
+
+# Funnel counts feed dashboards refreshed every few minutes
+FUNNEL_CACHE_TTL = 300
+
+# Simulated per-channel adjustments, ordered like the funnel steps
+# (visitor, product_view, add_to_cart, checkout_start, purchase)
+CHANNEL_COUNT_MULTIPLIERS = {
+    # Paid search typically has higher intent
+    "paid_search": np.array([0.3, 0.3, 0.3, 0.3, 0.3]),
+    # Social has more browsers, lower conversion
+    "social": np.array([0.4, 0.2, 0.2, 0.2, 0.2]),
+}
+CHANNEL_PERCENTAGE_MULTIPLIERS = {
+    "paid_search": np.array([1.0, 1.2, 1.2, 1.2, 1.2]),
+    "social": np.array([1.0, 0.8, 0.8, 0.8, 0.8]),
+}
+
+# Simulated device split: share of traffic, then per-step adjustments
+# (mobile converts worse than desktop from add_to_cart onwards)
+DEVICE_TRAFFIC_SHARES = {"mobile": 0.6, "desktop": 0.4}
+DEVICE_STEP_MULTIPLIERS = {
+    "mobile": np.array([1.0, 1.0, 0.7, 0.7, 0.7]),
+    "desktop": np.array([1.0, 1.0, 1.3, 1.3, 1.3]),
+}
+
 
 class FunnelStep(str, Enum):
     VISITOR = "visitor"
@@ -21,18 +51,37 @@ class FunnelStep(str, Enum):
     PURCHASE = "purchase"
 
 
+@dataclass(slots=True)
+class FunnelStepData:
+    count: int
+    percentage: float
+    description: str
+
+
 class ConversionFunnelService:
     """Service for detailed conversion funnel analysis."""
 
+    # Steps tracked by the funnel, in order; shared by every instance
+    FUNNEL_STEPS: ClassVar[tuple[FunnelStep, ...]] = (
+        FunnelStep.VISITOR,
+        FunnelStep.PRODUCT_VIEW,
+        FunnelStep.ADD_TO_CART,
+        FunnelStep.CHECKOUT_START,
+        FunnelStep.PURCHASE,
+    )
+    FUNNEL_STEP_VALUES: ClassVar[tuple[str, ...]] = tuple(
+        step.value for step in FUNNEL_STEPS
+    )
+    FUNNEL_STEP_DESCRIPTIONS: ClassVar[tuple[str, ...]] = (
+        "Unique visitors to the site",
+        "Visitors who viewed product pages",
+        "Visitors who added items to cart",
+        "Visitors who started checkout process",
+        "Visitors who completed purchase",
+    )
+
     def __init__(self, db: Session):
         self.db = db
-        self.funnel_steps = [
-            FunnelStep.VISITOR,
-            FunnelStep.PRODUCT_VIEW,
-            FunnelStep.ADD_TO_CART,
-            FunnelStep.CHECKOUT_START,
-            FunnelStep.PURCHASE,
-        ]
 
     def calculate_conversion_funnel(
         self, start_date: datetime, end_date: datetime, channel: str | None = None
@@ -53,23 +102,18 @@ class ConversionFunnelService:
 
         funnel_data = self._calculate_basic_funnel(start_date, end_date, channel)
 
-        # Calculate conversion rates between steps
-        conversions = self._calculate_step_conversions(funnel_data)
-
-        # Calculate drop-off analysis
-        dropoffs = self._calculate_dropoff_analysis(funnel_data)
+        # Calculate conversion rates and drop-offs between steps
+        conversions, dropoffs = self._calculate_step_metrics(funnel_data)
 
         # Generate insights
         insights = self._generate_funnel_insights(conversions, dropoffs)
 
         return {
-            "period": {
-                "start_date": start_date.isoformat(),
-                "end_date": end_date.isoformat(),
-                "days": (end_date - start_date).days,
-            },
+            "period": self._build_period(
+                start_date, end_date, (end_date - start_date).days
+            ),
             "channel": channel,
-            "funnel_steps": funnel_data,
+            "funnel_steps": self._serialize_funnel(funnel_data),
             "conversions": conversions,
             "dropoffs": dropoffs,
             "insights": insights,
@@ -78,53 +122,12 @@ class ConversionFunnelService:
 
     def _calculate_basic_funnel(
         self, start_date: datetime, end_date: datetime, channel: str | None = None
-    ) -> dict:
+    ) -> dict[str, FunnelStepData]:
         """Calculate basic funnel metrics from available data."""
-
-        # Get customers who made purchases in the period
-        purchase_query = text(
-            """
-            SELECT COUNT(DISTINCT c.customer_id) as customers
-            FROM customers c
-            JOIN sales_orders so ON c.customer_id = so.customer_id
-            WHERE so.status = 'COMPLETED'
-                AND so.order_date BETWEEN :start_date AND :end_date
-        """
-        )
-
-        purchase_result = self.db.execute(
-            purchase_query, {"start_date": start_date, "end_date": end_date}
-        )
-        purchase_customers = purchase_result.fetchone()[0] or 0
-
-        # Get customers who added to cart
-        cart_query = text(
-            """
-            SELECT COUNT(DISTINCT c.customer_id) as customers
-            FROM customers c
-            JOIN carts cart ON c.customer_id = cart.customer_id
-            WHERE cart.created_at BETWEEN :start_date AND :end_date
-        """
-        )
-
-        cart_result = self.db.execute(
-            cart_query, {"start_date": start_date, "end_date": end_date}
+        # Counts come from daily rollups, so calls within a day share a cache entry
+        purchase_customers, cart_customers, checkout_starts = self._funnel_counts(
+            start_date.date(), end_date.date()
         )
-        cart_customers = cart_result.fetchone()[0] or 0
-
-        # Get total orders in period (including non-completed)
-        orders_query = text(
-            """
-            SELECT COUNT(DISTINCT so.order_id) as orders
-            FROM sales_orders so
-            WHERE so.order_date BETWEEN :start_date AND :end_date
-        """
-        )
-
-        orders_result = self.db.execute(
-            orders_query, {"start_date": start_date, "end_date": end_date}
-        )
-        checkout_starts = orders_result.fetchone()[0] or 0
 
         # Estimate visitors (we'll use a multiple of purchasers for simulation)
         # In real implementation, this would come from web analytics
@@ -135,108 +138,158 @@ class ConversionFunnelService:
         # Estimate product views (multiple of cart additions)
         estimated_product_views = max(cart_customers * 3, cart_customers + 50)
 
+        counts = (
+            estimated_visitors,
+            estimated_product_views,
+            cart_customers,
+            checkout_starts,
+            purchase_customers,
+        )
+        # Visitors are never estimated below 100, so the shares are always defined
+        percentages = np.round(np.array(counts) / estimated_visitors * 100, 2)
+
         funnel_data = {
-            FunnelStep.VISITOR.value: {
-                "count": estimated_visitors,
-                "percentage": 100.0,
-                "description": "Unique visitors to the site",
-            },
-            FunnelStep.PRODUCT_VIEW.value: {
-                "count": estimated_product_views,
-                "percentage": (
-                    round((estimated_product_views / estimated_visitors) * 100, 2)
-                    if estimated_visitors > 0
-                    else 0
-                ),
-                "description": "Visitors who viewed product pages",
-            },
-            FunnelStep.ADD_TO_CART.value: {
-                "count": cart_customers,
-                "percentage": (
-                    round((cart_customers / estimated_visitors) * 100, 2)
-                    if estimated_visitors > 0
-                    else 0
-                ),
-                "description": "Visitors who added items to cart",
-            },
-            FunnelStep.CHECKOUT_START.value: {
-                "count": checkout_starts,
-                "percentage": (
-                    round((checkout_starts / estimated_visitors) * 100, 2)
-                    if estimated_visitors > 0
-                    else 0
-                ),
-                "description": "Visitors who started checkout process",
-            },
-            FunnelStep.PURCHASE.value: {
-                "count": purchase_customers,
-                "percentage": (
-                    round((purchase_customers / estimated_visitors) * 100, 2)
-                    if estimated_visitors > 0
-                    else 0
-                ),
-                "description": "Visitors who completed purchase",
-            },
+            step: FunnelStepData(count, percentage, description)
+            for step, count, percentage, description in zip(
+                self.FUNNEL_STEP_VALUES,
+                counts,
+                percentages.tolist(),
+                self.FUNNEL_STEP_DESCRIPTIONS,
+                strict=True,
+            )
         }
 
         return funnel_data
 
-    def _calculate_step_conversions(self, funnel_data: dict) -> dict:
-        """Calculate conversion rates between funnel steps."""
-        conversions = {}
-        steps = list(funnel_data.keys())
-
-        for i in range(len(steps) - 1):
-            current_step = steps[i]
-            next_step = steps[i + 1]
+    def _build_period(
+        self, start_date: datetime, end_date: datetime, days: int
+    ) -> dict:
+        """Serialize an analysis window for the response payload."""
+        return {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "days": days,
+        }
 
-            current_count = funnel_data[current_step]["count"]
-            next_count = funnel_data[next_step]["count"]
+    @cached_result("funnel:basic_counts", ttl=FUNNEL_CACHE_TTL)
+    def _funnel_counts(self, start_date: date, end_date: date) -> tuple[int, int, int]:
+        """
+        Count purchasers, cart users and checkout starts in one round trip.
 
-            conversion_rate = (
-                (next_count / current_count * 100) if current_count > 0 else 0
+        Reads the per-customer daily rollups refreshed hourly by the analytics
+        refresh scheduler, so whole days are counted and the latest hour may
+        be missing, in exchange for not scanning every order and cart.
+        """
+        funnel_query = text(
+            """
+            WITH order_stats AS (
+                SELECT
+                    COUNT(DISTINCT customer_id) FILTER (WHERE completed_orders > 0) as purchase_customers,
+                    COALESCE(SUM(orders), 0)::bigint as checkout_starts
+                FROM mv_funnel_order_daily
+                WHERE d BETWEEN :start_date AND :end_date
+            ),
+            cart_stats AS (
+                SELECT COUNT(DISTINCT user_id) as cart_customers
+                FROM mv_funnel_cart_daily
+                WHERE d BETWEEN :start_date AND :end_date
             )
+            SELECT purchase_customers, cart_customers, checkout_starts
+            FROM order_stats CROSS JOIN cart_stats
+        """
+        )
 
-            conversions[f"{current_step}_to_{next_step}"] = {
-                "from_step": current_step,
-                "to_step": next_step,
-                "from_count": current_count,
-                "to_count": next_count,
-                "conversion_rate": round(conversion_rate, 2),
-                "drop_off_count": current_count - next_count,
-                "drop_off_rate": round(100 - conversion_rate, 2),
-            }
+        # The aggregates always produce exactly one non-null row
+        counts = self.db.execute(
+            funnel_query, {"start_date": start_date, "end_date": end_date}
+        ).one()
 
-        return conversions
+        # checkout_starts counts every order in the period, not only completed
+        return (
+            counts.purchase_customers,
+            counts.cart_customers,
+            counts.checkout_starts,
+        )
 
-    def _calculate_dropoff_analysis(self, funnel_data: dict) -> dict:
-        """Calculate detailed drop-off analysis."""
-        steps = list(funnel_data.keys())
-        total_visitors = funnel_data[steps[0]]["count"]
+    def refresh_funnel_rollups(self) -> None:
+        """Refresh the daily funnel rollups; run hourly by the scheduler."""
+        self.db.execute(
+            text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_funnel_order_daily")
+        )
+        self.db.execute(
+            text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_funnel_cart_daily")
+        )
+        self.db.commit()
 
-        dropoffs = {}
+    def _serialize_funnel(self, funnel_data: dict[str, FunnelStepData]) -> dict:
+        """Convert funnel steps to plain dicts for the response payload."""
+        return {step: asdict(data) for step, data in funnel_data.items()}
 
-        for i, step in enumerate(steps[:-1]):
-            current_count = funnel_data[step]["count"]
-            next_count = funnel_data[steps[i + 1]]["count"]
-            dropped_users = current_count - next_count
+    def _calculate_step_conversions(
+        self, funnel_data: dict[str, FunnelStepData]
+    ) -> dict:
+        """Calculate conversion rates between funnel steps."""
+        return self._calculate_step_metrics(funnel_data)[0]
+
+    def _calculate_step_metrics(
+        self, funnel_data: dict[str, FunnelStepData]
+    ) -> tuple[dict, dict]:
+        """Calculate step conversions and drop-off analysis in one vectorized pass."""
+        # Every funnel is derived from the basic funnel, so steps are in this order
+        steps = self.FUNNEL_STEP_VALUES
+        step_counts = [funnel_data[step].count for step in steps]
+
+        counts = np.array(step_counts, dtype=np.float64)
+        current, following = counts[:-1], counts[1:]
+        dropped = current - following
+        has_current = current > 0
+        total_visitors = counts[0]
+
+        conversion_rates = (
+            np.divide(following, current, out=np.zeros_like(current), where=has_current)
+            * 100
+        )
+        dropoff_rates = (
+            np.divide(dropped, current, out=np.zeros_like(current), where=has_current)
+            * 100
+        )
+        total_shares = (
+            dropped / total_visitors * 100
+            if total_visitors > 0
+            else np.zeros_like(dropped)
+        )
 
-            dropoffs[step] = {
+        conversions = {}
+        dropoffs = {}
+        for i, (conversion_rate, leave_rate, dropoff_rate, total_share) in enumerate(
+            zip(
+                np.round(conversion_rates, 2).tolist(),
+                np.round(100 - conversion_rates, 2).tolist(),
+                np.round(dropoff_rates, 2).tolist(),
+                np.round(total_shares, 2).tolist(),
+                strict=True,
+            )
+        ):
+            current_step, next_step = steps[i], steps[i + 1]
+            dropped_users = step_counts[i] - step_counts[i + 1]
+
+            conversions[f"{current_step}_to_{next_step}"] = {
+                "from_step": current_step,
+                "to_step": next_step,
+                "from_count": step_counts[i],
+                "to_count": step_counts[i + 1],
+                "conversion_rate": conversion_rate,
+                "drop_off_count": dropped_users,
+                "drop_off_rate": leave_rate,
+            }
+            dropoffs[current_step] = {
                 "users_dropped": dropped_users,
-                "drop_off_rate": (
-                    round((dropped_users / current_count * 100), 2)
-                    if current_count > 0
-                    else 0
-                ),
-                "percentage_of_total": (
-                    round((dropped_users / total_visitors * 100), 2)
-                    if total_visitors > 0
-                    else 0
-                ),
-                "step_description": funnel_data[step]["description"],
+                "drop_off_rate": dropoff_rate,
+                "percentage_of_total": total_share,
+                "step_description": funnel_data[current_step].description,
             }
 
-        return dropoffs
+        return conversions, dropoffs
 
     def calculate_product_funnel(self, product_id: int, days: int = 30) -> dict:
         """
@@ -249,100 +302,116 @@ class ConversionFunnelService:
         Returns:
             Dictionary with product-specific funnel
         """
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
+        return self.calculate_product_funnels([product_id], days).get(product_id, {})
 
-        # Get product details
-        product_query = text(
-            """
-            SELECT name, category, price
-            FROM products
-            WHERE product_id = :product_id
+    def calculate_product_funnels(
+        self, product_ids: list[int], days: int = 30
+    ) -> dict[int, dict]:
         """
-        )
+        Calculate conversion funnels for several products in one query.
 
-        product_result = self.db.execute(product_query, {"product_id": product_id})
-        product_info = product_result.fetchone()
+        Args:
+            product_ids: Product IDs to analyze
+            days: Number of days to look back
 
-        if not product_info:
+        Returns:
+            Dictionary of product-specific funnels keyed by product ID; unknown
+            products are omitted
+        """
+        if not product_ids:
             return {}
 
-        # Get funnel data for this product
+        end_date = datetime.utcnow()
+        start_date = end_date - timedelta(days=days)
+
+        # Cart adds and order stats are aggregated per product and joined onto
+        # the product details, so any number of products costs one round-trip
         funnel_query = text(
             """
+            WITH cart_stats AS (
+                SELECT ci.product_id, COUNT(DISTINCT cart.customer_id) as cart_adds
+                FROM cart_items ci
+                JOIN carts cart ON ci.cart_id = cart.cart_id
+                WHERE ci.product_id = ANY(:product_ids)
+                    AND ci.created_at BETWEEN :start_date AND :end_date
+                GROUP BY ci.product_id
+            ),
+            order_stats AS (
+                SELECT
+                    si.product_id,
+                    COUNT(DISTINCT so.customer_id) FILTER (WHERE so.status = 'COMPLETED') as purchases,
+                    COUNT(DISTINCT so.order_id) as checkout_starts,
+                    COALESCE(SUM(si.qty * si.unit_price) FILTER (WHERE so.status = 'COMPLETED'), 0) as revenue
+                FROM sales_items si
+                JOIN sales_orders so ON si.order_id = so.order_id
+                WHERE si.product_id = ANY(:product_ids)
+                    AND so.order_date BETWEEN :start_date AND :end_date
+                GROUP BY si.product_id
+            )
             SELECT
-                COUNT(DISTINCT CASE WHEN ci.product_id = :product_id THEN c.customer_id END) as cart_adds,
-                COUNT(DISTINCT CASE WHEN si.product_id = :product_id AND so.status = 'COMPLETED' THEN c.customer_id END) as purchases,
-                COUNT(DISTINCT CASE WHEN si.product_id = :product_id THEN so.order_id END) as checkout_starts,
-                SUM(CASE WHEN si.product_id = :product_id AND so.status = 'COMPLETED' THEN si.qty * si.unit_price ELSE 0 END) as revenue
-            FROM customers c
-            LEFT JOIN carts cart ON c.customer_id = cart.customer_id
-            LEFT JOIN cart_items ci ON cart.cart_id = ci.cart_id
-            LEFT JOIN sales_orders so ON c.customer_id = so.customer_id
-            LEFT JOIN sales_items si ON so.order_id = si.order_id
-            WHERE (ci.created_at BETWEEN :start_date AND :end_date)
-                OR (so.order_date BETWEEN :start_date AND :end_date)
+                p.product_id, p.name, p.category, p.price,
+                COALESCE(cs.cart_adds, 0) as cart_adds,
+                COALESCE(os.purchases, 0) as purchases,
+                COALESCE(os.checkout_starts, 0) as checkout_starts,
+                COALESCE(os.revenue, 0) as revenue
+            FROM products p
+            LEFT JOIN cart_stats cs ON cs.product_id = p.product_id
+            LEFT JOIN order_stats os ON os.product_id = p.product_id
+            WHERE p.product_id = ANY(:product_ids)
         """
         )
 
-        funnel_result = self.db.execute(
+        rows = self.db.execute(
             funnel_query,
-            {"product_id": product_id, "start_date": start_date, "end_date": end_date},
-        )
-        funnel_stats = funnel_result.fetchone()
+            {
+                "product_ids": list(product_ids),
+                "start_date": start_date,
+                "end_date": end_date,
+            },
+        ).fetchall()
 
+        period = self._build_period(start_date, end_date, days)
+        return {row.product_id: self._build_product_funnel(row, period) for row in rows}
+
+    def _build_product_funnel(self, stats, period: dict) -> dict:
+        """Shape one product's aggregated stats into the product funnel response."""
         # Estimate product views (in real app, this would be tracked)
-        estimated_views = max(funnel_stats[0] * 5, 10)  # Assume 20% add-to-cart rate
+        estimated_views = max(stats.cart_adds * 5, 10)  # Assume 20% add-to-cart rate
+
+        add_rate, checkout_rate, purchase_rate = np.round(
+            np.array([stats.cart_adds, stats.checkout_starts, stats.purchases])
+            / estimated_views
+            * 100,
+            2,
+        ).tolist()
 
-        product_funnel = {
+        return {
             "product_info": {
-                "product_id": product_id,
-                "name": product_info[0],
-                "category": product_info[1],
-                "price": float(product_info[2]),
-            },
-            "period": {
-                "start_date": start_date.isoformat(),
-                "end_date": end_date.isoformat(),
-                "days": days,
+                "product_id": stats.product_id,
+                "name": stats.name,
+                "category": stats.category,
+                "price": float(stats.price),
             },
+            "period": dict(period),
             "funnel": {
                 "product_views": {"count": estimated_views, "percentage": 100.0},
                 "add_to_cart": {
-                    "count": funnel_stats[0] or 0,
-                    "percentage": (
-                        round((funnel_stats[0] / estimated_views * 100), 2)
-                        if estimated_views > 0
-                        else 0
-                    ),
+                    "count": stats.cart_adds,
+                    "percentage": add_rate,
                 },
                 "checkout_start": {
-                    "count": funnel_stats[2] or 0,
-                    "percentage": (
-                        round((funnel_stats[2] / estimated_views * 100), 2)
-                        if estimated_views > 0
-                        else 0
-                    ),
+                    "count": stats.checkout_starts,
+                    "percentage": checkout_rate,
                 },
                 "purchase": {
-                    "count": funnel_stats[1] or 0,
-                    "percentage": (
-                        round((funnel_stats[1] / estimated_views * 100), 2)
-                        if estimated_views > 0
-                        else 0
-                    ),
+                    "count": stats.purchases,
+                    "percentage": purchase_rate,
                 },
             },
-            "revenue": float(funnel_stats[3] or 0),
-            "conversion_rate": (
-                round((funnel_stats[1] / estimated_views * 100), 2)
-                if estimated_views > 0
-                else 0
-            ),
+            "revenue": float(stats.revenue),
+            "conversion_rate": purchase_rate,
         }
 
-        return product_funnel
-
     def calculate_channel_funnels(self, days: int = 30) -> dict:
         """
         Calculate conversion funnels by marketing channel.
@@ -358,58 +427,56 @@ class ConversionFunnelService:
 
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
+        # The window ends at calculation time, so both share one timestamp
+        period = self._build_period(start_date, end_date, days)
 
         # Simulate channel data (in real app, this would come from tracking)
         channels = ["organic", "paid_search", "social", "email", "direct"]
         channel_funnels = {}
+        conversion_rates = {}
+
+        # The simulated channels all start from the same base funnel; fetch it once
+        base_funnel = self._calculate_basic_funnel(start_date, end_date)
+        steps = self.FUNNEL_STEP_VALUES
+        base_counts = np.array([base_funnel[step].count for step in steps])
+        base_percentages = np.array(
+            [base_funnel[step].percentage for step in steps], dtype=float
+        )
+        no_adjustment = np.ones(len(steps))
 
         for channel in channels:
-            # Get basic metrics (simulated)
-            channel_funnel = self._calculate_basic_funnel(start_date, end_date, channel)
-
-            # Add channel-specific adjustments
-            if channel == "paid_search":
-                # Paid search typically has higher intent
-                for step in channel_funnel:
-                    channel_funnel[step]["count"] = int(
-                        channel_funnel[step]["count"] * 0.3
-                    )
-                    if step != "visitor":
-                        channel_funnel[step]["percentage"] *= 1.2  # Higher conversion
-            elif channel == "social":
-                # Social has more browsers, lower conversion
-                for step in channel_funnel:
-                    if step == "visitor":
-                        channel_funnel[step]["count"] = int(
-                            channel_funnel[step]["count"] * 0.4
-                        )
-                    else:
-                        channel_funnel[step]["count"] = int(
-                            channel_funnel[step]["count"] * 0.2
-                        )
-                        channel_funnel[step]["percentage"] *= 0.8  # Lower conversion
+            # Add channel-specific adjustments as whole-funnel vector ops
+            counts = (
+                base_counts * CHANNEL_COUNT_MULTIPLIERS.get(channel, no_adjustment)
+            ).astype(np.int64)
+            percentages = base_percentages * CHANNEL_PERCENTAGE_MULTIPLIERS.get(
+                channel, no_adjustment
+            )
 
+            channel_funnel = {
+                step: FunnelStepData(count, percentage, base_funnel[step].description)
+                for step, count, percentage in zip(
+                    steps, counts.tolist(), percentages.tolist(), strict=True
+                )
+            }
+
+            # The purchase percentage is already the end-to-end conversion rate
+            conversion_rates[channel] = channel_funnel["purchase"].percentage
             channel_funnels[channel] = {
-                "funnel": channel_funnel,
+                "funnel": self._serialize_funnel(channel_funnel),
                 "conversions": self._calculate_step_conversions(channel_funnel),
-                "total_conversion_rate": channel_funnel.get("purchase", {}).get(
-                    "percentage", 0
-                ),
+                "total_conversion_rate": conversion_rates[channel],
             }
 
         # Calculate channel comparison
-        channel_comparison = self._compare_channels(channel_funnels)
+        channel_comparison = self._compare_channels(conversion_rates)
 
         return {
-            "period": {
-                "start_date": start_date.isoformat(),
-                "end_date": end_date.isoformat(),
-                "days": days,
-            },
+            "period": period,
             "channels": channel_funnels,
             "comparison": channel_comparison,
-            "insights": self._generate_channel_insights(channel_funnels),
-            "calculated_at": datetime.utcnow().isoformat(),
+            "insights": self._generate_channel_insights(channel_comparison),
+            "calculated_at": period["end_date"],
         }
 
     def calculate_mobile_vs_desktop_funnel(self, days: int = 30) -> dict:
@@ -424,84 +491,62 @@ class ConversionFunnelService:
         """
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
+        # The window ends at calculation time, so both share one timestamp
+        period = self._build_period(start_date, end_date, days)
 
         # Simulate device-specific data (in real app, this would come from user agent tracking)
         base_funnel = self._calculate_basic_funnel(start_date, end_date)
 
-        mobile_funnel = {}
-        desktop_funnel = {}
-
-        # Apply device-specific conversion patterns
-        for step, data in base_funnel.items():
-            # Mobile typically has more traffic but lower conversion
-            mobile_count = int(data["count"] * 0.6)  # 60% of traffic is mobile
-            desktop_count = int(data["count"] * 0.4)  # 40% is desktop
+        steps = self.FUNNEL_STEP_VALUES
+        base_counts = np.array([base_funnel[step].count for step in steps])
+        base_percentages = np.array(
+            [base_funnel[step].percentage for step in steps], dtype=float
+        )
 
-            if step in ["add_to_cart", "checkout_start", "purchase"]:
-                # Mobile has lower conversion in later funnel steps
-                mobile_multiplier = 0.7
-                desktop_multiplier = 1.3
+        # Apply device-specific conversion patterns as whole-funnel vector ops
+        device_funnels = {}
+        for device, traffic_share in DEVICE_TRAFFIC_SHARES.items():
+            multipliers = DEVICE_STEP_MULTIPLIERS[device]
+            counts = (
+                (base_counts * traffic_share).astype(np.int64) * multipliers
+            ).astype(np.int64)
+
+            # Recalculate percentages against the device's own visitors
+            if counts[0] > 0:
+                percentages = np.round(counts / counts[0] * 100, 2)
             else:
-                mobile_multiplier = 1.0
-                desktop_multiplier = 1.0
-
-            mobile_funnel[step] = {
-                "count": int(mobile_count * mobile_multiplier),
-                "percentage": data["percentage"] * mobile_multiplier,
-                "description": data["description"],
-            }
-
-            desktop_funnel[step] = {
-                "count": int(desktop_count * desktop_multiplier),
-                "percentage": data["percentage"] * desktop_multiplier,
-                "description": data["description"],
-            }
+                percentages = base_percentages * multipliers
 
-        # Recalculate percentages for mobile and desktop
-        mobile_visitors = mobile_funnel["visitor"]["count"]
-        desktop_visitors = desktop_funnel["visitor"]["count"]
-
-        for step in mobile_funnel:
-            if mobile_visitors > 0:
-                mobile_funnel[step]["percentage"] = round(
-                    (mobile_funnel[step]["count"] / mobile_visitors) * 100, 2
+            device_funnels[device] = {
+                step: FunnelStepData(count, percentage, base_funnel[step].description)
+                for step, count, percentage in zip(
+                    steps, counts.tolist(), percentages.tolist(), strict=True
                 )
+            }
 
-        for step in desktop_funnel:
-            if desktop_visitors > 0:
-                desktop_funnel[step]["percentage"] = round(
-                    (desktop_funnel[step]["count"] / desktop_visitors) * 100, 2
-                )
+        mobile_funnel = device_funnels["mobile"]
+        desktop_funnel = device_funnels["desktop"]
 
         return {
-            "period": {
-                "start_date": start_date.isoformat(),
-                "end_date": end_date.isoformat(),
-                "days": days,
-            },
+            "period": period,
             "mobile": {
-                "funnel": mobile_funnel,
+                "funnel": self._serialize_funnel(mobile_funnel),
                 "conversions": self._calculate_step_conversions(mobile_funnel),
             },
             "desktop": {
-                "funnel": desktop_funnel,
+                "funnel": self._serialize_funnel(desktop_funnel),
                 "conversions": self._calculate_step_conversions(desktop_funnel),
             },
             "comparison": self._compare_device_funnels(mobile_funnel, desktop_funnel),
             "insights": self._generate_device_insights(mobile_funnel, desktop_funnel),
-            "calculated_at": datetime.utcnow().isoformat(),
+            "calculated_at": period["end_date"],
         }
 
-    def _compare_channels(self, channel_funnels: dict) -> dict:
-        """Compare performance across channels."""
+    def _compare_channels(self, conversion_rates: dict[str, float]) -> dict:
+        """Compare end-to-end conversion rates across channels."""
         comparison = {}
 
         # Find best and worst performing channels
-        conversion_rates = {
-            channel: data["total_conversion_rate"]
-            for channel, data in channel_funnels.items()
-        }
-
         if conversion_rates:
             best_channel = max(conversion_rates, key=conversion_rates.get)
             worst_channel = min(conversion_rates, key=conversion_rates.get)
@@ -522,11 +567,13 @@ class ConversionFunnelService:
         return comparison
 
     def _compare_device_funnels(
-        self, mobile_funnel: dict, desktop_funnel: dict
+        self,
+        mobile_funnel: dict[str, FunnelStepData],
+        desktop_funnel: dict[str, FunnelStepData],
     ) -> dict:
         """Compare mobile vs desktop funnel performance."""
-        mobile_conversion = mobile_funnel.get("purchase", {}).get("percentage", 0)
-        desktop_conversion = desktop_funnel.get("purchase", {}).get("percentage", 0)
+        mobile_conversion = mobile_funnel["purchase"].percentage
+        desktop_conversion = desktop_funnel["purchase"].percentage
 
         return {
             "mobile_conversion_rate": mobile_conversion,
@@ -539,11 +586,8 @@ class ConversionFunnelService:
             ),
             "mobile_traffic_share": round(
                 (
-                    mobile_funnel["visitor"]["count"]
-                    / (
-                        mobile_funnel["visitor"]["count"]
-                        + desktop_funnel["visitor"]["count"]
-                    )
+                    mobile_funnel["visitor"].count
+                    / (mobile_funnel["visitor"].count + desktop_funnel["visitor"].count)
                 )
                 * 100,
                 1,
@@ -555,10 +599,11 @@ class ConversionFunnelService:
         insights = []
 
         # Find biggest drop-off points
-        biggest_dropoff = max(dropoffs.items(), key=lambda x: x[1]["drop_off_rate"])
-        insights.append(
-            f"Biggest drop-off at {biggest_dropoff[0]} ({biggest_dropoff[1]['drop_off_rate']:.1f}%)"
-        )
+        dropoff_rates = [
+            (step, data["drop_off_rate"]) for step, data in dropoffs.items()
+        ]
+        biggest_step, biggest_rate = max(dropoff_rates, key=itemgetter(1))
+        insights.append(f"Biggest drop-off at {biggest_step} ({biggest_rate:.1f}%)")
 
         # Check for low conversion rates
         for conversion_key, data in conversions.items():
@@ -586,44 +631,41 @@ class ConversionFunnelService:
 
         return insights
 
-    def _generate_channel_insights(self, channel_funnels: dict) -> list[str]:
-        """Generate insights from channel funnel analysis."""
+    def _generate_channel_insights(self, channel_comparison: dict) -> list[str]:
+        """Generate insights from the channel comparison."""
         insights = []
 
-        # Compare channel performance
-        conversion_rates = {
-            channel: data["total_conversion_rate"]
-            for channel, data in channel_funnels.items()
-        }
-
-        if conversion_rates:
-            best_channel = max(conversion_rates, key=conversion_rates.get)
-            worst_channel = min(conversion_rates, key=conversion_rates.get)
+        # Reuse the best/worst channels already picked by _compare_channels
+        if channel_comparison:
+            best = channel_comparison["best_converting_channel"]
+            worst = channel_comparison["worst_converting_channel"]
 
             insights.append(
-                f"Best performing channel: {best_channel} ({conversion_rates[best_channel]:.1f}%)"
+                f"Best performing channel: {best['channel']} ({best['conversion_rate']:.1f}%)"
             )
             insights.append(
-                f"Worst performing channel: {worst_channel} ({conversion_rates[worst_channel]:.1f}%)"
+                f"Worst performing channel: {worst['channel']} ({worst['conversion_rate']:.1f}%)"
             )
 
             # Check for significant differences
-            spread = conversion_rates[best_channel] - conversion_rates[worst_channel]
+            spread = channel_comparison["conversion_rate_spread"]
             if spread > 3:
                 insights.append(
-                    f"Large performance gap ({spread:.1f}%) between channels - optimize {worst_channel}"
+                    f"Large performance gap ({spread:.1f}%) between channels - optimize {worst['channel']}"
                 )
 
         return insights
 
     def _generate_device_insights(
-        self, mobile_funnel: dict, desktop_funnel: dict
+        self,
+        mobile_funnel: dict[str, FunnelStepData],
+        desktop_funnel: dict[str, FunnelStepData],
     ) -> list[str]:
         """Generate insights from device funnel comparison."""
         insights = []
 
-        mobile_conversion = mobile_funnel.get("purchase", {}).get("percentage", 0)
-        desktop_conversion = desktop_funnel.get("purchase", {}).get("percentage", 0)
+        mobile_conversion = mobile_funnel["purchase"].percentage
+        desktop_conversion = desktop_funnel["purchase"].percentage
 
         if desktop_conversion > mobile_conversion * 1.5:
             insights.append(
@@ -635,8 +677,8 @@ class ConversionFunnelService:
             )
 
         # Check mobile traffic share
-        mobile_visitors = mobile_funnel["visitor"]["count"]
-        total_visitors = mobile_visitors + desktop_funnel["visitor"]["count"]
+        mobile_visitors = mobile_funnel["visitor"].count
+        total_visitors = mobile_visitors + desktop_funnel["visitor"].count
         mobile_share = (
             (mobile_visitors / total_visitors) * 100 if total_visitors > 0 else 0
         )
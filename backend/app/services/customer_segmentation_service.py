@@ -7,7 +7,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 
-import pandas as pd
+import numpy as np
 from sqlalchemy import text
 from sqlmodel import Session
 
@@ -48,317 +48,361 @@ class CustomerSegmentProfile:
     color: str
 
 
+# Rows fetched per round trip when streaming scored customers
+RFM_FETCH_BATCH_SIZE = 10_000
+
+# RFM Segment definitions based on score combinations
+RFM_SEGMENTS = {
+    # Champions: R=4-5, F=4-5, M=4-5
+    RFMSegment.CHAMPIONS: {
+        "R": [4, 5],
+        "F": [4, 5],
+        "M": [4, 5],
+        "description": "Best customers who bought recently, buy often and spend the most",
+        "characteristics": [
+            "High value",
+            "Recent purchase",
+            "Frequent buyers",
+            "Brand advocates",
+        ],
+        "marketing_strategy": [
+            "Reward them",
+            "Early access to new products",
+            "VIP treatment",
+            "Referral programs",
+        ],
+        "expected_percentage": 11.1,
+        "color": "#10B981",  # Green
+    },
+    # Loyal Customers: R=2-5, F=3-5, M=3-5
+    RFMSegment.LOYAL_CUSTOMERS: {
+        "R": [2, 5],
+        "F": [3, 5],
+        "M": [3, 5],
+        "description": "Customers who spend good money and respond to promotions",
+        "characteristics": [
+            "Regular buyers",
+            "Good monetary value",
+            "Responsive to offers",
+        ],
+        "marketing_strategy": [
+            "Upsell higher value products",
+            "Cross-sell complementary items",
+            "Loyalty programs",
+        ],
+        "expected_percentage": 15.6,
+        "color": "#059669",  # Dark green
+    },
+    # Potential Loyalists: R=3-5, F=1-3, M=1-3
+    RFMSegment.POTENTIAL_LOYALISTS: {
+        "R": [3, 5],
+        "F": [1, 3],
+        "M": [1, 3],
+        "description": "Recent customers with average spending who can become loyal",
+        "characteristics": [
+            "Recent buyers",
+            "Low frequency",
+            "Growth potential",
+        ],
+        "marketing_strategy": [
+            "Membership programs",
+            "Educational content",
+            "Product recommendations",
+        ],
+        "expected_percentage": 18.2,
+        "color": "#34D399",  # Light green
+    },
+    # New Customers: R=4-5, F=1, M=1
+    RFMSegment.NEW_CUSTOMERS: {
+        "R": [4, 5],
+        "F": [1, 1],
+        "M": [1, 1],
+        "description": "Recently acquired customers with low spending",
+        "characteristics": [
+            "Recent first purchase",
+            "Single purchase",
+            "Unknown potential",
+        ],
+        "marketing_strategy": [
+            "Welcome series",
+            "Onboarding offers",
+            "Product education",
+        ],
+        "expected_percentage": 13.3,
+        "color": "#3B82F6",  # Blue
+    },
+    # Promising: R=3-4, F=1, M=2-3
+    RFMSegment.PROMISING: {
+        "R": [3, 4],
+        "F": [1, 1],
+        "M": [2, 3],
+        "description": "Recent customers who spent a good amount",
+        "characteristics": [
+            "Recent buyers",
+            "Higher initial purchase",
+            "Good potential",
+        ],
+        "marketing_strategy": [
+            "Targeted offers",
+            "Product bundles",
+            "Follow-up campaigns",
+        ],
+        "expected_percentage": 12.9,
+        "color": "#6366F1",  # Indigo
+    },
+    # Need Attention: R=2-3, F=2-3, M=2-3
+    RFMSegment.NEED_ATTENTION: {
+        "R": [2, 3],
+        "F": [2, 3],
+        "M": [2, 3],
+        "description": "Average customers who need re-engagement",
+        "characteristics": [
+            "Moderate recency",
+            "Average frequency",
+            "Declining engagement",
+        ],
+        "marketing_strategy": [
+            "Re-engagement campaigns",
+            "Special discounts",
+            "Win-back offers",
+        ],
+        "expected_percentage": 8.1,
+        "color": "#F59E0B",  # Yellow
+    },
+    # About to Sleep: R=2-3, F=1-2, M=1-2
+    RFMSegment.ABOUT_TO_SLEEP: {
+        "R": [2, 3],
+        "F": [1, 2],
+        "M": [1, 2],
+        "description": "Customers who haven't purchased recently",
+        "characteristics": [
+            "Declining activity",
+            "Low engagement",
+            "Risk of churn",
+        ],
+        "marketing_strategy": [
+            "Reactivation campaigns",
+            "Limited-time offers",
+            "Survey feedback",
+        ],
+        "expected_percentage": 7.8,
+        "color": "#F97316",  # Orange
+    },
+    # At Risk: R=1-2, F=2-4, M=2-4
+    RFMSegment.AT_RISK: {
+        "R": [1, 2],
+        "F": [2, 4],
+        "M": [2, 4],
+        "description": "Previously good customers who haven't purchased recently",
+        "characteristics": [
+            "Was valuable",
+            "Long time since purchase",
+            "High churn risk",
+        ],
+        "marketing_strategy": [
+            "Win-back campaigns",
+            "Personal outreach",
+            "Exclusive offers",
+        ],
+        "expected_percentage": 7.3,
+        "color": "#EF4444",  # Red
+    },
+    # Cannot Lose: R=1-2, F=4-5, M=4-5
+    RFMSegment.CANNOT_LOSE: {
+        "R": [1, 2],
+        "F": [4, 5],
+        "M": [4, 5],
+        "description": "High-value customers who haven't purchased recently",
+        "characteristics": [
+            "High historical value",
+            "Frequent past buyers",
+            "Critical to retain",
+        ],
+        "marketing_strategy": [
+            "VIP treatment",
+            "Personal contact",
+            "Major incentives",
+        ],
+        "expected_percentage": 2.4,
+        "color": "#DC2626",  # Dark red
+    },
+    # Hibernating: R=1-2, F=1-2, M=1-2
+    RFMSegment.HIBERNATING: {
+        "R": [1, 2],
+        "F": [1, 2],
+        "M": [1, 2],
+        "description": "Inactive customers with low value",
+        "characteristics": ["Long inactive", "Low value", "Minimal engagement"],
+        "marketing_strategy": [
+            "Low-cost reactivation",
+            "Surveys",
+            "Consider removing",
+        ],
+        "expected_percentage": 3.3,
+        "color": "#6B7280",  # Gray
+    },
+}
+
+# Segment profiles are static, so they are built once rather than per analysis
+SEGMENT_PROFILES = {
+    segment: CustomerSegmentProfile(
+        segment=segment,
+        description=profile_data["description"],
+        characteristics=profile_data["characteristics"],
+        marketing_strategy=profile_data["marketing_strategy"],
+        expected_percentage=profile_data["expected_percentage"],
+        color=profile_data["color"],
+    )
+    for segment, profile_data in RFM_SEGMENTS.items()
+}
+
+
+def _segment_case_sql(segments: dict) -> str:
+    """Build a CASE expression assigning the first segment whose R/F/M ranges match"""
+    branches = "\n".join(
+        f"WHEN recency_score BETWEEN {criteria['R'][0]} AND {criteria['R'][1]} "
+        f"AND frequency_score BETWEEN {criteria['F'][0]} AND {criteria['F'][1]} "
+        f"AND monetary_score BETWEEN {criteria['M'][0]} AND {criteria['M'][1]} "
+        f"THEN '{segment.value}'"
+        for segment, criteria in segments.items()
+    )
+    return f"CASE {branches} ELSE '{RFMSegment.HIBERNATING.value}' END"
+
+
+# Segment assignment is static, so its SQL is generated once at import
+RFM_SEGMENT_CASE_SQL = _segment_case_sql(RFM_SEGMENTS)
+
+
+def _quintile_sql(rank_column: str) -> str:
+    """
+    SQL for the 1-5 quintile of a 1-based row number among n rows.
+
+    Equivalent to pandas.qcut(rank(method="first"), 5): bins split the rank
+    range 1..n into five equal-width, right-inclusive intervals.
+    """
+    return (
+        f"CASE WHEN {rank_column} = 1 OR n = 1 THEN 1 "
+        f"ELSE (({rank_column} - 1) * 5 + n - 2) / (n - 1) END"
+    )
+
+
+# Scores and segments are computed in the database, so only the fully
+# scored rows are transferred. Rank ties are broken by customer_id.
+RFM_SCORES_SQL = text(
+    f"""
+    WITH customer_rfm AS (
+        SELECT
+            c.customer_id,
+            -- Recency: calendar days since last order, as an integer
+            COALESCE(
+                CAST(:analysis_date AS date) - CAST(MAX(so.order_date) AS date),
+                999
+            ) as recency_days,
+            -- Frequency: number of completed orders
+            COUNT(CASE WHEN so.status = 'COMPLETED' THEN so.so_id END) as frequency,
+            -- Monetary: total amount spent on completed orders
+            COALESCE(
+                SUM(CASE WHEN so.status = 'COMPLETED' THEN si.qty * si.unit_price END),
+                0
+            ) as monetary_value
+        FROM customer c
+        LEFT JOIN salesorder so ON c.customer_id = so.customer_id
+        LEFT JOIN salesitem si ON so.so_id = si.so_id
+        GROUP BY c.customer_id
+        HAVING COUNT(CASE WHEN so.status = 'COMPLETED' THEN so.so_id END) > 0
+    ),
+    ranked AS (
+        SELECT
+            customer_rfm.*,
+            ROW_NUMBER() OVER (ORDER BY recency_days, customer_id) as recency_rank,
+            ROW_NUMBER() OVER (ORDER BY frequency, customer_id) as frequency_rank,
+            ROW_NUMBER() OVER (ORDER BY monetary_value, customer_id) as monetary_rank,
+            COUNT(*) OVER () as n
+        FROM customer_rfm
+    ),
+    scored AS (
+        SELECT
+            customer_id,
+            recency_days,
+            frequency,
+            monetary_value,
+            -- Most recent customers get the highest recency score
+            6 - ({_quintile_sql("recency_rank")}) as recency_score,
+            {_quintile_sql("frequency_rank")} as frequency_score,
+            {_quintile_sql("monetary_rank")} as monetary_score
+        FROM ranked
+    )
+    SELECT
+        scored.*,
+        CAST(recency_score AS TEXT) || CAST(frequency_score AS TEXT)
+            || CAST(monetary_score AS TEXT) as rfm_score,
+        {RFM_SEGMENT_CASE_SQL} as segment
+    FROM scored
+    ORDER BY customer_id
+    """
+)
+
+
 class CustomerSegmentationService:
     """Service for advanced customer segmentation using RFM analysis"""
 
     def __init__(self, db: Session):
         self.db = db
-
-        # RFM Segment definitions based on score combinations
-        self.rfm_segments = {
-            # Champions: R=4-5, F=4-5, M=4-5
-            RFMSegment.CHAMPIONS: {
-                "R": [4, 5],
-                "F": [4, 5],
-                "M": [4, 5],
-                "description": "Best customers who bought recently, buy often and spend the most",
-                "characteristics": [
-                    "High value",
-                    "Recent purchase",
-                    "Frequent buyers",
-                    "Brand advocates",
-                ],
-                "marketing_strategy": [
-                    "Reward them",
-                    "Early access to new products",
-                    "VIP treatment",
-                    "Referral programs",
-                ],
-                "expected_percentage": 11.1,
-                "color": "#10B981",  # Green
-            },
-            # Loyal Customers: R=2-5, F=3-5, M=3-5
-            RFMSegment.LOYAL_CUSTOMERS: {
-                "R": [2, 5],
-                "F": [3, 5],
-                "M": [3, 5],
-                "description": "Customers who spend good money and respond to promotions",
-                "characteristics": [
-                    "Regular buyers",
-                    "Good monetary value",
-                    "Responsive to offers",
-                ],
-                "marketing_strategy": [
-                    "Upsell higher value products",
-                    "Cross-sell complementary items",
-                    "Loyalty programs",
-                ],
-                "expected_percentage": 15.6,
-                "color": "#059669",  # Dark green
-            },
-            # Potential Loyalists: R=3-5, F=1-3, M=1-3
-            RFMSegment.POTENTIAL_LOYALISTS: {
-                "R": [3, 5],
-                "F": [1, 3],
-                "M": [1, 3],
-                "description": "Recent customers with average spending who can become loyal",
-                "characteristics": [
-                    "Recent buyers",
-                    "Low frequency",
-                    "Growth potential",
-                ],
-                "marketing_strategy": [
-                    "Membership programs",
-                    "Educational content",
-                    "Product recommendations",
-                ],
-                "expected_percentage": 18.2,
-                "color": "#34D399",  # Light green
-            },
-            # New Customers: R=4-5, F=1, M=1
-            RFMSegment.NEW_CUSTOMERS: {
-                "R": [4, 5],
-                "F": [1, 1],
-                "M": [1, 1],
-                "description": "Recently acquired customers with low spending",
-                "characteristics": [
-                    "Recent first purchase",
-                    "Single purchase",
-                    "Unknown potential",
-                ],
-                "marketing_strategy": [
-                    "Welcome series",
-                    "Onboarding offers",
-                    "Product education",
-                ],
-                "expected_percentage": 13.3,
-                "color": "#3B82F6",  # Blue
-            },
-            # Promising: R=3-4, F=1, M=2-3
-            RFMSegment.PROMISING: {
-                "R": [3, 4],
-                "F": [1, 1],
-                "M": [2, 3],
-                "description": "Recent customers who spent a good amount",
-                "characteristics": [
-                    "Recent buyers",
-                    "Higher initial purchase",
-                    "Good potential",
-                ],
-                "marketing_strategy": [
-                    "Targeted offers",
-                    "Product bundles",
-                    "Follow-up campaigns",
-                ],
-                "expected_percentage": 12.9,
-                "color": "#6366F1",  # Indigo
-            },
-            # Need Attention: R=2-3, F=2-3, M=2-3
-            RFMSegment.NEED_ATTENTION: {
-                "R": [2, 3],
-                "F": [2, 3],
-                "M": [2, 3],
-                "description": "Average customers who need re-engagement",
-                "characteristics": [
-                    "Moderate recency",
-                    "Average frequency",
-                    "Declining engagement",
-                ],
-                "marketing_strategy": [
-                    "Re-engagement campaigns",
-                    "Special discounts",
-                    "Win-back offers",
-                ],
-                "expected_percentage": 8.1,
-                "color": "#F59E0B",  # Yellow
-            },
-            # About to Sleep: R=2-3, F=1-2, M=1-2
-            RFMSegment.ABOUT_TO_SLEEP: {
-                "R": [2, 3],
-                "F": [1, 2],
-                "M": [1, 2],
-                "description": "Customers who haven't purchased recently",
-                "characteristics": [
-                    "Declining activity",
-                    "Low engagement",
-                    "Risk of churn",
-                ],
-                "marketing_strategy": [
-                    "Reactivation campaigns",
-                    "Limited-time offers",
-                    "Survey feedback",
-                ],
-                "expected_percentage": 7.8,
-                "color": "#F97316",  # Orange
-            },
-            # At Risk: R=1-2, F=2-4, M=2-4
-            RFMSegment.AT_RISK: {
-                "R": [1, 2],
-                "F": [2, 4],
-                "M": [2, 4],
-                "description": "Previously good customers who haven't purchased recently",
-                "characteristics": [
-                    "Was valuable",
-                    "Long time since purchase",
-                    "High churn risk",
-                ],
-                "marketing_strategy": [
-                    "Win-back campaigns",
-                    "Personal outreach",
-                    "Exclusive offers",
-                ],
-                "expected_percentage": 7.3,
-                "color": "#EF4444",  # Red
-            },
-            # Cannot Lose: R=1-2, F=4-5, M=4-5
-            RFMSegment.CANNOT_LOSE: {
-                "R": [1, 2],
-                "F": [4, 5],
-                "M": [4, 5],
-                "description": "High-value customers who haven't purchased recently",
-                "characteristics": [
-                    "High historical value",
-                    "Frequent past buyers",
-                    "Critical to retain",
-                ],
-                "marketing_strategy": [
-                    "VIP treatment",
-                    "Personal contact",
-                    "Major incentives",
-                ],
-                "expected_percentage": 2.4,
-                "color": "#DC2626",  # Dark red
-            },
-            # Hibernating: R=1-2, F=1-2, M=1-2
-            RFMSegment.HIBERNATING: {
-                "R": [1, 2],
-                "F": [1, 2],
-                "M": [1, 2],
-                "description": "Inactive customers with low value",
-                "characteristics": ["Long inactive", "Low value", "Minimal engagement"],
-                "marketing_strategy": [
-                    "Low-cost reactivation",
-                    "Surveys",
-                    "Consider removing",
-                ],
-                "expected_percentage": 3.3,
-                "color": "#6B7280",  # Gray
-            },
-        }
+        # Scores per analysis hour, reused by the public methods within a request
+        self._rfm_cache: dict[str, list[RFMScores]] = {}
+        # The same scores grouped by segment, keyed like _rfm_cache
+        self._segment_cache: dict[str, dict[RFMSegment, list[RFMScores]]] = {}
 
     def calculate_rfm_scores(self, analysis_date: datetime = None) -> list[RFMScores]:
         """Calculate RFM scores for all customers"""
         if analysis_date is None:
             analysis_date = datetime.utcnow()
 
-        # Get customer RFM data
-        rfm_query = """
-        WITH customer_rfm AS (
-            SELECT
-                c.customer_id,
-                c.first_name,
-                c.last_name,
-                c.email,
-                -- Recency: days since last order
-                COALESCE(
-                    EXTRACT(DAY FROM (:analysis_date - MAX(so.order_date))),
-                    999
-                ) as recency_days,
-                -- Frequency: number of completed orders
-                COUNT(CASE WHEN so.status = 'COMPLETED' THEN so.so_id END) as frequency,
-                -- Monetary: total amount spent on completed orders
-                COALESCE(
-                    SUM(CASE WHEN so.status = 'COMPLETED' THEN si.qty * si.unit_price END),
-                    0
-                ) as monetary_value
-            FROM customer c
-            LEFT JOIN salesorder so ON c.customer_id = so.customer_id
-            LEFT JOIN salesitem si ON so.so_id = si.so_id
-            GROUP BY c.customer_id, c.first_name, c.last_name, c.email
-            HAVING COUNT(CASE WHEN so.status = 'COMPLETED' THEN so.so_id END) > 0
-        )
-        SELECT * FROM customer_rfm
-        ORDER BY customer_id
-        """
-
-        result = self.db.exec(text(rfm_query), {"analysis_date": analysis_date})
-        customers_data = result.fetchall()
-
-        if not customers_data:
-            return []
-
-        # Convert to DataFrame for easier analysis
-        df = pd.DataFrame(
-            customers_data,
-            columns=[
-                "customer_id",
-                "first_name",
-                "last_name",
-                "email",
-                "recency_days",
-                "frequency",
-                "monetary_value",
-            ],
-        )
-
-        # Calculate RFM scores using quintile-based scoring
-        df["recency_score"] = pd.qcut(
-            df["recency_days"].rank(method="first"), 5, labels=[5, 4, 3, 2, 1]
-        )
-        df["frequency_score"] = pd.qcut(
-            df["frequency"].rank(method="first"), 5, labels=[1, 2, 3, 4, 5]
-        )
-        df["monetary_score"] = pd.qcut(
-            df["monetary_value"].rank(method="first"), 5, labels=[1, 2, 3, 4, 5]
+        cache_key = analysis_date.strftime("%Y-%m-%d-%H")
+        cached_scores = self._rfm_cache.get(cache_key)
+        if cached_scores is not None:
+            return cached_scores
+
+        # Stream through a server-side cursor so only one batch of rows is
+        # buffered alongside the scores being built
+        result = self.db.execute(
+            RFM_SCORES_SQL,
+            {"analysis_date": analysis_date},
+            execution_options={"yield_per": RFM_FETCH_BATCH_SIZE},
         )
 
-        # Create RFM score string
-        df["rfm_score"] = (
-            df["recency_score"].astype(str)
-            + df["frequency_score"].astype(str)
-            + df["monetary_score"].astype(str)
-        )
-
-        # Assign segments
-        df["segment"] = df.apply(self._assign_rfm_segment, axis=1)
-
-        # Convert to RFMScores objects
-        rfm_scores = []
-        for _, row in df.iterrows():
-            rfm_scores.append(
+        rfm_scores: list[RFMScores] = []
+        for batch in result.partitions():
+            rfm_scores.extend(
                 RFMScores(
-                    customer_id=int(row["customer_id"]),
-                    recency_days=int(row["recency_days"]),
-                    frequency=int(row["frequency"]),
-                    monetary_value=float(row["monetary_value"]),
-                    recency_score=int(row["recency_score"]),
-                    frequency_score=int(row["frequency_score"]),
-                    monetary_score=int(row["monetary_score"]),
-                    rfm_score=str(row["rfm_score"]),
-                    segment=RFMSegment(row["segment"]),
+                    customer_id=row.customer_id,
+                    recency_days=int(row.recency_days),
+                    frequency=row.frequency,
+                    monetary_value=float(row.monetary_value),
+                    recency_score=row.recency_score,
+                    frequency_score=row.frequency_score,
+                    monetary_score=row.monetary_score,
+                    rfm_score=row.rfm_score,
+                    segment=RFMSegment(row.segment),
                 )
+                for row in batch
             )
 
-        return rfm_scores
-
-    def _assign_rfm_segment(self, row) -> str:
-        """Assign RFM segment based on R, F, M scores"""
-        r, f, m = (
-            int(row["recency_score"]),
-            int(row["frequency_score"]),
-            int(row["monetary_score"]),
-        )
+        # Group once so per-segment lookups don't rescan every customer
+        scores_by_segment: dict[RFMSegment, list[RFMScores]] = {}
+        for score in rfm_scores:
+            scores_by_segment.setdefault(score.segment, []).append(score)
 
-        for segment, criteria in self.rfm_segments.items():
-            if (
-                criteria["R"][0] <= r <= criteria["R"][1]
-                and criteria["F"][0] <= f <= criteria["F"][1]
-                and criteria["M"][0] <= m <= criteria["M"][1]
-            ):
-                return segment.value
+        self._rfm_cache[cache_key] = rfm_scores
+        self._segment_cache[cache_key] = scores_by_segment
+        return rfm_scores
 
-        # Default fallback
-        return RFMSegment.HIBERNATING.value
+    def _scores_in_segment(self, segment: RFMSegment) -> list[RFMScores]:
+        """Scores of the customers in a segment, in customer_id order"""
+        analysis_date = datetime.utcnow()
+        self.calculate_rfm_scores(analysis_date)
+        cache_key = analysis_date.strftime("%Y-%m-%d-%H")
+        return self._segment_cache[cache_key].get(segment, [])
 
     def get_segment_analysis(self) -> dict:
         """Get comprehensive segment analysis"""
@@ -372,50 +416,53 @@ class CustomerSegmentationService:
                 "insights": [],
             }
 
-        # Count customers by segment
-        segment_counts = {}
+        # Aggregate customers by segment with one bincount per metric
         total_customers = len(rfm_scores)
+        segments = list(RFMSegment)
+        segment_codes = {segment: code for code, segment in enumerate(segments)}
+
+        # Narrow integer columns for the integral metrics; monetary stays float64
+        # so rounded totals match summing the Python floats
+        codes = np.fromiter(
+            (segment_codes[score.segment] for score in rfm_scores),
+            dtype=np.int8,
+            count=total_customers,
+        )
+        recency = np.fromiter(
+            (score.recency_days for score in rfm_scores),
+            dtype=np.int32,
+            count=total_customers,
+        )
+        frequency = np.fromiter(
+            (score.frequency for score in rfm_scores),
+            dtype=np.int32,
+            count=total_customers,
+        )
+        monetary = np.fromiter(
+            (score.monetary_value for score in rfm_scores),
+            dtype=np.float64,
+            count=total_customers,
+        )
 
-        for score in rfm_scores:
-            segment = score.segment
-            if segment not in segment_counts:
-                segment_counts[segment] = {
-                    "count": 0,
-                    "percentage": 0,
-                    "avg_recency": 0,
-                    "avg_frequency": 0,
-                    "avg_monetary": 0,
-                    "total_monetary": 0,
-                }
+        n_segments = len(segments)
+        counts = np.bincount(codes, minlength=n_segments).tolist()
+        recency_sums = np.bincount(codes, recency, n_segments).tolist()
+        frequency_sums = np.bincount(codes, frequency, n_segments).tolist()
+        monetary_sums = np.bincount(codes, monetary, n_segments).tolist()
 
-            segment_counts[segment]["count"] += 1
-            segment_counts[segment]["avg_recency"] += score.recency_days
-            segment_counts[segment]["avg_frequency"] += score.frequency
-            segment_counts[segment]["avg_monetary"] += score.monetary_value
-            segment_counts[segment]["total_monetary"] += score.monetary_value
-
-        # Calculate averages and percentages
-        for _segment, data in segment_counts.items():
-            count = data["count"]
-            data["percentage"] = round((count / total_customers) * 100, 1)
-            data["avg_recency"] = round(data["avg_recency"] / count, 1)
-            data["avg_frequency"] = round(data["avg_frequency"] / count, 1)
-            data["avg_monetary"] = round(data["avg_monetary"] / count, 2)
-            data["total_monetary"] = round(data["total_monetary"], 2)
-
-        # Get segment profiles
-        segment_profiles = {}
-        for segment in segment_counts.keys():
-            if segment in self.rfm_segments:
-                profile_data = self.rfm_segments[segment]
-                segment_profiles[segment.value] = CustomerSegmentProfile(
-                    segment=segment,
-                    description=profile_data["description"],
-                    characteristics=profile_data["characteristics"],
-                    marketing_strategy=profile_data["marketing_strategy"],
-                    expected_percentage=profile_data["expected_percentage"],
-                    color=profile_data["color"],
-                )
+        # Segments are listed in the order they first appear among customers
+        _, first_seen = np.unique(codes, return_index=True)
+        segment_counts = {}
+        for code in codes[np.sort(first_seen)].tolist():
+            count = counts[code]
+            segment_counts[segments[code]] = {
+                "count": count,
+                "percentage": round((count / total_customers) * 100, 1),
+                "avg_recency": round(recency_sums[code] / count, 1),
+                "avg_frequency": round(frequency_sums[code] / count, 1),
+                "avg_monetary": round(monetary_sums[code] / count, 2),
+                "total_monetary": round(monetary_sums[code], 2),
+            }
 
         # Generate insights
         insights = self._generate_segment_insights(segment_counts, total_customers)
@@ -426,11 +473,8 @@ class CustomerSegmentationService:
             "segments": {
                 segment.value: {
                     **data,
-                    "profile": (
-                        segment_profiles.get(segment.value, {}).__dict__
-                        if segment.value in segment_profiles
-                        else {}
-                    ),
+                    # Copied so callers can't mutate the shared profile
+                    "profile": dict(SEGMENT_PROFILES[segment].__dict__),
                 }
                 for segment, data in segment_counts.items()
             },
@@ -439,10 +483,7 @@ class CustomerSegmentationService:
                     "segment": segment.value,
                     "count": data["count"],
                     "percentage": data["percentage"],
-                    "color": segment_profiles.get(
-                        segment.value,
-                        CustomerSegmentProfile(segment, "", [], [], 0, "#6B7280"),
-                    ).color,
+                    "color": SEGMENT_PROFILES[segment].color,
                 }
                 for segment, data in segment_counts.items()
             ],
@@ -525,9 +566,9 @@ class CustomerSegmentationService:
         self, segment: RFMSegment, limit: int = 100
     ) -> list[dict]:
         """Get customers belonging to a specific segment"""
-        rfm_scores = self.calculate_rfm_scores()
+        segment_scores = self._scores_in_segment(segment)
 
-        segment_customers = [
+        return [
             {
                 "customer_id": score.customer_id,
                 "recency_days": score.recency_days,
@@ -538,24 +579,23 @@ class CustomerSegmentationService:
                 "frequency_score": score.frequency_score,
                 "monetary_score": score.monetary_score,
             }
-            for score in rfm_scores
-            if score.segment == segment
-        ][:limit]
-
-        return segment_customers
+            for score in segment_scores[:limit]
+        ]
 
     def get_segment_recommendations(self, segment: RFMSegment) -> dict:
         """Get marketing recommendations for a specific segment"""
-        if segment not in self.rfm_segments:
+        if segment not in RFM_SEGMENTS:
             return {}
 
-        profile = self.rfm_segments[segment]
+        profile = RFM_SEGMENTS[segment]
         customers = self.get_customers_by_segment(segment, limit=10)
 
+        customer_count = len(self._scores_in_segment(segment))
+
         return {
             "segment": segment.value,
             "profile": profile,
-            "customer_count": len(self.get_customers_by_segment(segment, limit=10000)),
+            "customer_count": min(customer_count, 10000),
             "sample_customers": customers,
             "recommended_actions": profile["marketing_strategy"],
             "characteristics": profile["characteristics"],
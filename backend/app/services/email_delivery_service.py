@@ -12,21 +12,57 @@ Features:
 """
 
 import asyncio
+import json
 import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack, asynccontextmanager
 from datetime import datetime, timezone
+from email import policy
+from email.generator import BytesGenerator
+from email.header import Header
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from enum import Enum
+from io import BytesIO
 from typing import Any
+from uuid import uuid4
 
 import aiosmtplib
-from pydantic import BaseModel, EmailStr
+import httpx
+from pydantic import BaseModel, EmailStr, ValidationError
 
+from app.core.cache import get_redis_client
 from app.core.config import settings
 from app.services.email_template_service import EmailTemplateService
 
 logger = logging.getLogger(__name__)
 
+try:
+    from botocore.exceptions import BotoCoreError, ClientError
+
+    SES_CLIENT_ERRORS: tuple[type[Exception], ...] = (BotoCoreError, ClientError)
+except ImportError:
+    # botocore ships with the optional aioboto3; without it SES uses SMTP
+    SES_CLIENT_ERRORS = ()
+
+# Most destinations SES accepts in one SendBulkEmail call
+SES_BULK_MAX_DESTINATIONS = 50
+
+# Most personalizations SendGrid accepts in one mail/send request
+SENDGRID_MAX_PERSONALIZATIONS = 1000
+SENDGRID_API_URL = "https://api.sendgrid.com"
+
+# Redis keys of the bulk send queue
+EMAIL_QUEUE_KEY = "email:queue"
+EMAIL_DEAD_LETTER_KEY = "email:dead_letter"
+EMAIL_STATUS_KEY_PREFIX = "email:status:"
+EMAIL_STATUS_TTL = 86400  # 1 day
+# Messages pushed per LPUSH when enqueueing
+EMAIL_QUEUE_PUSH_CHUNK = 500
+# Seconds a queue worker blocks on BRPOP before checking again
+EMAIL_QUEUE_POLL_TIMEOUT = 5
+
 
 class DeliveryProvider(str, Enum):
     """Email delivery provider types"""
@@ -84,14 +120,177 @@ class EmailDeliveryResult(BaseModel):
     provider_response: dict[str, Any] | None = None
 
 
+class _SMTPSlot:
+    """A pool slot holding one SMTP connection and its message count"""
+
+    __slots__ = ("smtp", "sent")
+
+    def __init__(self) -> None:
+        self.smtp: aiosmtplib.SMTP | None = None
+        self.sent = 0
+
+
+class _SMTPPool:
+    """
+    Fixed-size pool of authenticated SMTP connections.
+
+    Connections are opened lazily and recycled after
+    max_messages_per_connection messages. Idle slots are handed out
+    most-recently-used first, so sequential sends keep reusing one warm
+    connection and extra connections are only opened under concurrency.
+    """
+
+    def __init__(self, size: int, max_messages_per_connection: int):
+        self.max_messages_per_connection = max_messages_per_connection
+        self._slots = [_SMTPSlot() for _ in range(size)]
+        self._idle: asyncio.LifoQueue[_SMTPSlot] = asyncio.LifoQueue()
+        for slot in reversed(self._slots):
+            self._idle.put_nowait(slot)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        """Check out a connected SMTP client for exclusive use"""
+        slot = await self._idle.get()
+        try:
+            smtp = await self._connect(slot)
+            yield smtp
+            slot.sent += 1
+        finally:
+            self._idle.put_nowait(slot)
+
+    async def _connect(self, slot: _SMTPSlot) -> aiosmtplib.SMTP:
+        """Return the slot's connection, reconnecting if dropped or worn out"""
+        smtp = slot.smtp
+        if smtp is not None and smtp.is_connected:
+            if slot.sent < self.max_messages_per_connection:
+                try:
+                    # Servers close idle sessions; NOOP detects a dead socket
+                    await smtp.noop()
+                    return smtp
+                except aiosmtplib.SMTPException as e:
+                    logger.info(f"SMTP connection lost, reconnecting: {str(e)}")
+            await self._close(smtp)
+
+        smtp_kwargs = {
+            "hostname": settings.SMTP_HOST,
+            "port": settings.SMTP_PORT,
+            "use_tls": settings.SMTP_TLS,
+        }
+
+        if settings.SMTP_USER and settings.SMTP_PASSWORD:
+            smtp_kwargs["username"] = settings.SMTP_USER
+            smtp_kwargs["password"] = settings.SMTP_PASSWORD
+
+        # Clear the slot first so a failed connect isn't reused
+        slot.smtp = None
+        slot.sent = 0
+
+        # connect() also logs in when credentials are given
+        smtp = aiosmtplib.SMTP(**smtp_kwargs)
+        await smtp.connect()
+        slot.smtp = smtp
+        return smtp
+
+    async def _close(self, smtp: aiosmtplib.SMTP) -> None:
+        """Quit a connection, dropping it if the server is already gone"""
+        try:
+            if smtp.is_connected:
+                await smtp.quit()
+        except aiosmtplib.SMTPException as e:
+            logger.warning(f"Error closing SMTP connection: {str(e)}")
+            smtp.close()
+
+    async def aclose(self) -> None:
+        """Close every open connection in the pool"""
+        for slot in self._slots:
+            if slot.smtp is not None:
+                await self._close(slot.smtp)
+                slot.smtp = None
+                slot.sent = 0
+
+
+class _TokenBucket:
+    """
+    Token bucket limiting sends to the provider's quota.
+
+    Tokens refill continuously at rate per second up to capacity, so
+    short bursts go out immediately and sustained traffic is held to
+    the rate without idling between fixed batches.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, n: int = 1) -> float:
+        """Wait until n tokens are available and take them; returns seconds waited"""
+        waited = 0.0
+        # The lock queues waiters so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return waited
+                delay = (n - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+
 class EmailDeliveryService:
     """Production-ready email delivery service with MJML integration"""
 
+    # Send method implementing each supported provider
+    PROVIDER_SEND_METHODS = {
+        DeliveryProvider.SMTP: "_send_via_smtp",
+        DeliveryProvider.SENDGRID: "_send_via_sendgrid",
+        DeliveryProvider.AWS_SES: "_send_via_aws_ses",
+    }
+
+    # Providers that can deliver one message to many recipients per call
+    PROVIDER_BULK_SEND_METHODS = {
+        DeliveryProvider.SMTP: "_send_via_smtp_bulk",
+        DeliveryProvider.SENDGRID: "_send_via_sendgrid_bulk",
+        DeliveryProvider.AWS_SES: "_send_via_aws_ses_bulk",
+    }
+
     def __init__(self):
         self.template_service = EmailTemplateService()
         self.provider = self._get_delivery_provider()
+        if self.provider not in self.PROVIDER_SEND_METHODS:
+            raise ValueError(f"Unsupported delivery provider: {self.provider}")
+        # Looked up by name on each send so instance-level patches still apply
+        self._send_method_name = self.PROVIDER_SEND_METHODS[self.provider]
         self.from_email = settings.EMAILS_FROM_EMAIL
         self.from_name = settings.EMAILS_FROM_NAME
+        self._from_header = f"{self.from_name} <{self.from_email}>"
+
+        # SMTP sessions are reused across sends. Each connection serves one
+        # send at a time, so concurrent sends spread across the pool.
+        self._smtp_pool = _SMTPPool(
+            settings.SMTP_POOL_SIZE, settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+        )
+        self._bucket = _TokenBucket(
+            rate=settings.EMAIL_RATE_PER_SECOND, capacity=settings.EMAIL_BURST
+        )
+
+        # The SES client keeps its HTTPS connections open across sends; it
+        # is opened on first use and held until aclose()
+        self._ses_client: Any = None
+        self._ses_available = True
+        self._ses_lock = asyncio.Lock()
+        self._exit_stack = AsyncExitStack()
+        self._sendgrid_client: httpx.AsyncClient | None = None
+
+        # Consumers of the Redis bulk send queue, started with the app
+        self._queue_workers: list[asyncio.Task] = []
 
         logger.info(f"EmailDeliveryService initialized with provider: {self.provider}")
 
@@ -107,46 +306,52 @@ class EmailDeliveryService:
             logger.warning("No email delivery provider configured, using SMTP fallback")
             return DeliveryProvider.SMTP
 
-    async def send_email(self, request: EmailRequest) -> EmailDeliveryResult:
+    async def send_email(
+        self, request: EmailRequest, html_content: str | None = None
+    ) -> EmailDeliveryResult:
         """
-        Send email with comprehensive error handling and delivery tracking
+        Send email with comprehensive error handling and delivery tracking.
+        html_content, when given, is already-compiled HTML for the request's
+        template and skips compilation.
         """
         try:
-            # Compile template if template_name is provided
-            if request.template_name and request.template_data:
-                html_content = await self.template_service.compile_template(
-                    request.template_name, request.template_data
-                )
-            elif request.html_content:
-                html_content = request.html_content
-            else:
-                raise ValueError(
-                    "Either template_name with template_data or html_content must be provided"
-                )
+            if html_content is None:
+                html_content = await self._resolve_html(request)
 
-            # Send email based on provider
-            if self.provider == DeliveryProvider.SMTP:
-                return await self._send_via_smtp(request, html_content)
-            elif self.provider == DeliveryProvider.SENDGRID:
-                return await self._send_via_sendgrid(request, html_content)
-            elif self.provider == DeliveryProvider.AWS_SES:
-                return await self._send_via_aws_ses(request, html_content)
-            else:
-                raise ValueError(f"Unsupported delivery provider: {self.provider}")
+            waited = await self._bucket.acquire()
+            if waited:
+                logger.debug("Email rate limit delayed send to %s by %.3fs", request.to, waited)
+
+            # The provider's send method was resolved at construction
+            send = getattr(self, self._send_method_name)
+            return await send(request, html_content)
 
         except Exception as e:
-            logger.error(f"Email delivery failed: {str(e)}")
+            # Provider methods handle expected failures; this catches the rest
+            logger.error("Email delivery failed: %s", e, exc_info=True)
             return EmailDeliveryResult(
                 success=False, status=EmailStatus.FAILED, error_message=str(e)
             )
 
+    async def _resolve_html(self, request: EmailRequest) -> str:
+        """Return the request's HTML, compiling its template if given"""
+        if request.template_name and request.template_data:
+            return await self.template_service.compile_template(
+                request.template_name, request.template_data
+            )
+        if request.html_content:
+            return request.html_content
+        raise ValueError(
+            "Either template_name with template_data or html_content must be provided"
+        )
+
     async def _send_via_smtp(
         self, request: EmailRequest, html_content: str
     ) -> EmailDeliveryResult:
         """Send email via SMTP (async)"""
         try:
             message = MIMEMultipart("alternative")
-            message["From"] = f"{self.from_name} <{self.from_email}>"
+            message["From"] = self._from_header
             message["To"] = str(request.to)
             message["Subject"] = request.subject
 
@@ -172,21 +377,11 @@ class EmailDeliveryService:
             if request.bcc:
                 recipients.extend([str(email) for email in request.bcc])
 
-            # Send email using aiosmtplib for async operation
-            smtp_kwargs = {
-                "hostname": settings.SMTP_HOST,
-                "port": settings.SMTP_PORT,
-                "use_tls": settings.SMTP_TLS,
-            }
-
-            if settings.SMTP_USER and settings.SMTP_PASSWORD:
-                smtp_kwargs["username"] = settings.SMTP_USER
-                smtp_kwargs["password"] = settings.SMTP_PASSWORD
-
-            async with aiosmtplib.SMTP(**smtp_kwargs) as smtp:
+            # Send email over a pooled aiosmtplib connection
+            async with self._smtp_pool.connection() as smtp:
                 await smtp.send_message(message, recipients=recipients)
 
-            logger.info(f"Email sent successfully via SMTP to {request.to}")
+            logger.info("Email sent successfully via SMTP to %s", request.to)
 
             return EmailDeliveryResult(
                 success=True,
@@ -195,35 +390,427 @@ class EmailDeliveryService:
                 provider_response={"provider": "smtp", "recipients": recipients},
             )
 
-        except Exception as e:
-            logger.error(f"SMTP delivery failed: {str(e)}")
+        except (aiosmtplib.SMTPException, OSError, asyncio.TimeoutError) as e:
+            logger.error("SMTP delivery failed: %s", e)
             return EmailDeliveryResult(
                 success=False,
                 status=EmailStatus.FAILED,
                 error_message=f"SMTP error: {str(e)}",
             )
 
+    @staticmethod
+    def _build_cached_body(html_content: str, text_content: str | None) -> bytes:
+        """
+        Serialize the MIME body of a message once for reuse across recipients.
+
+        Returns the multipart/alternative part, including its Content-Type
+        and MIME-Version headers, with CRLF line endings. Per-recipient
+        headers are prepended to it.
+        """
+        body = MIMEMultipart("alternative")
+        body.attach(MIMEText(html_content, "html", "utf-8"))
+        if text_content:
+            body.attach(MIMEText(text_content, "plain", "utf-8"))
+
+        buffer = BytesIO()
+        BytesGenerator(buffer, policy=policy.SMTP).flatten(body)
+        return buffer.getvalue()
+
+    async def _send_via_smtp_bulk(
+        self, requests: list[EmailRequest], html_content: str
+    ) -> list[EmailDeliveryResult]:
+        """
+        Send one message to many recipients over the SMTP pool.
+
+        All requests share html_content, subject, text and reply-to, so the
+        MIME body is encoded once and only the address headers are built
+        per recipient.
+        """
+        first = requests[0]
+        body_bytes = self._build_cached_body(html_content, first.text_content)
+
+        shared_headers = (
+            f"From: {self._from_header}\r\n"
+            f"Subject: {Header(first.subject, 'utf-8').encode()}\r\n"
+        )
+        if first.reply_to:
+            shared_headers += f"Reply-To: {first.reply_to}\r\n"
+
+        async def send_one(request: EmailRequest) -> EmailDeliveryResult:
+            recipients = [str(request.to)]
+            headers = f"{shared_headers}To: {request.to}\r\n"
+            if request.cc:
+                cc = [str(email) for email in request.cc]
+                headers += f"Cc: {', '.join(cc)}\r\n"
+                recipients.extend(cc)
+            if request.bcc:
+                recipients.extend(str(email) for email in request.bcc)
+
+            await self._bucket.acquire()
+            try:
+                async with self._smtp_pool.connection() as smtp:
+                    await smtp.sendmail(
+                        self.from_email, recipients, headers.encode() + body_bytes
+                    )
+            except (aiosmtplib.SMTPException, OSError, asyncio.TimeoutError) as e:
+                logger.error("SMTP delivery failed: %s", e)
+                return EmailDeliveryResult(
+                    success=False,
+                    status=EmailStatus.FAILED,
+                    error_message=f"SMTP error: {str(e)}",
+                )
+
+            return EmailDeliveryResult(
+                success=True,
+                status=EmailStatus.SENT,
+                delivered_at=datetime.now(timezone.utc),
+                provider_response={"provider": "smtp", "recipients": recipients},
+            )
+
+        results = await asyncio.gather(
+            *(send_one(request) for request in requests), return_exceptions=True
+        )
+        logger.info("Bulk email sent via SMTP to %d recipients", len(requests))
+        return [
+            EmailDeliveryResult(
+                success=False, status=EmailStatus.FAILED, error_message=str(result)
+            )
+            if isinstance(result, Exception)
+            else result
+            for result in results
+        ]
+
+    async def aclose(self) -> None:
+        """Stop queue workers and close connections, clients and the template compiler"""
+        await self.stop_queue_workers()
+        await self._smtp_pool.aclose()
+        await self._exit_stack.aclose()
+        self._ses_client = None
+        if self._sendgrid_client is not None:
+            await self._sendgrid_client.aclose()
+            self._sendgrid_client = None
+        await self.template_service.aclose()
+
+    def _get_sendgrid_client(self) -> httpx.AsyncClient:
+        """Return the shared SendGrid HTTP client, creating it on first use"""
+        if self._sendgrid_client is None:
+            client_kwargs = {
+                "base_url": SENDGRID_API_URL,
+                "headers": {"Authorization": f"Bearer {settings.SENDGRID_API_KEY}"},
+                "limits": httpx.Limits(max_connections=50),
+                "timeout": 30.0,
+            }
+            try:
+                # HTTP/2 multiplexes concurrent sends over one connection
+                self._sendgrid_client = httpx.AsyncClient(http2=True, **client_kwargs)
+            except ImportError:
+                # httpx needs the h2 package for HTTP/2
+                self._sendgrid_client = httpx.AsyncClient(**client_kwargs)
+        return self._sendgrid_client
+
+    @staticmethod
+    def _sendgrid_personalization(request: EmailRequest) -> dict[str, Any]:
+        """Build the SendGrid personalization for a request's recipients"""
+        personalization: dict[str, Any] = {"to": [{"email": str(request.to)}]}
+        if request.cc:
+            personalization["cc"] = [{"email": str(email)} for email in request.cc]
+        if request.bcc:
+            personalization["bcc"] = [{"email": str(email)} for email in request.bcc]
+        return personalization
+
+    def _sendgrid_payload(
+        self,
+        request: EmailRequest,
+        html_content: str,
+        personalizations: list[dict[str, Any]],
+    ) -> dict[str, Any]:
+        """Build a mail/send payload for the request's message"""
+        # SendGrid requires text/plain to come before text/html
+        content = []
+        if request.text_content:
+            content.append({"type": "text/plain", "value": request.text_content})
+        content.append({"type": "text/html", "value": html_content})
+
+        payload: dict[str, Any] = {
+            "personalizations": personalizations,
+            "from": {"email": self.from_email, "name": self.from_name},
+            "subject": request.subject,
+            "content": content,
+        }
+        if request.reply_to:
+            payload["reply_to"] = {"email": str(request.reply_to)}
+        return payload
+
+    async def _post_to_sendgrid(self, payload: dict[str, Any]) -> httpx.Response:
+        """POST a mail/send payload, pausing if the rate limit is exhausted"""
+        response = await self._get_sendgrid_client().post("/v3/mail/send", json=payload)
+
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            reset_at = float(response.headers.get("X-RateLimit-Reset", 0))
+            delay = reset_at - datetime.now(timezone.utc).timestamp()
+            if delay > 0:
+                logger.warning(f"SendGrid rate limit reached, pausing {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+        return response
+
     async def _send_via_sendgrid(
         self, request: EmailRequest, html_content: str
     ) -> EmailDeliveryResult:
         """Send email via SendGrid API"""
-        # TODO: Implement SendGrid integration
-        logger.warning("SendGrid integration not yet implemented, falling back to SMTP")
-        return await self._send_via_smtp(request, html_content)
+        try:
+            payload = self._sendgrid_payload(
+                request, html_content, [self._sendgrid_personalization(request)]
+            )
+            response = await self._post_to_sendgrid(payload)
+            response.raise_for_status()
+
+            logger.info("Email sent successfully via SendGrid to %s", request.to)
+
+            return EmailDeliveryResult(
+                success=True,
+                message_id=response.headers.get("X-Message-Id"),
+                status=EmailStatus.SENT,
+                delivered_at=datetime.now(timezone.utc),
+                provider_response={"provider": "sendgrid", "status_code": response.status_code},
+            )
+
+        except httpx.HTTPError as e:
+            logger.error("SendGrid delivery failed: %s", e)
+            return EmailDeliveryResult(
+                success=False,
+                status=EmailStatus.FAILED,
+                error_message=f"SendGrid error: {str(e)}",
+            )
+
+    async def _send_via_sendgrid_bulk(
+        self, requests: list[EmailRequest], html_content: str
+    ) -> list[EmailDeliveryResult]:
+        """
+        Send one message to many recipients with SendGrid personalizations.
+
+        All requests share html_content, subject, text and reply-to, so
+        each request becomes one personalization, up to
+        SENDGRID_MAX_PERSONALIZATIONS per mail/send request.
+        """
+        results = []
+        for i in range(0, len(requests), SENDGRID_MAX_PERSONALIZATIONS):
+            chunk = requests[i : i + SENDGRID_MAX_PERSONALIZATIONS]
+            for _ in chunk:
+                await self._bucket.acquire()
+
+            try:
+                payload = self._sendgrid_payload(
+                    chunk[0],
+                    html_content,
+                    [self._sendgrid_personalization(request) for request in chunk],
+                )
+                response = await self._post_to_sendgrid(payload)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                logger.error("SendGrid bulk delivery failed: %s", e)
+                results.extend(
+                    EmailDeliveryResult(
+                        success=False,
+                        status=EmailStatus.FAILED,
+                        error_message=f"SendGrid error: {str(e)}",
+                    )
+                    for _ in chunk
+                )
+                continue
+
+            delivered_at = datetime.now(timezone.utc)
+            message_id = response.headers.get("X-Message-Id")
+            results.extend(
+                EmailDeliveryResult(
+                    success=True,
+                    message_id=message_id,
+                    status=EmailStatus.SENT,
+                    delivered_at=delivered_at,
+                    provider_response={"provider": "sendgrid", "status_code": response.status_code},
+                )
+                for _ in chunk
+            )
+
+            logger.info("Bulk email sent via SendGrid to %d recipients", len(chunk))
+
+        return results
+
+    async def _get_ses_client(self) -> Any:
+        """Return the shared SES v2 client, or None if aioboto3 is not installed"""
+        if self._ses_client is not None or not self._ses_available:
+            return self._ses_client
+
+        async with self._ses_lock:
+            if self._ses_client is None and self._ses_available:
+                try:
+                    import aioboto3
+                except ImportError:
+                    logger.warning("aioboto3 package not installed, sending SES email via SMTP")
+                    self._ses_available = False
+                    return None
+
+                session = aioboto3.Session(
+                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or None,
+                    region_name=settings.AWS_SES_REGION,
+                )
+                self._ses_client = await self._exit_stack.enter_async_context(
+                    session.client("sesv2")
+                )
+        return self._ses_client
+
+    @staticmethod
+    def _ses_destination(request: EmailRequest) -> dict[str, list[str]]:
+        """Build the SES Destination for a request"""
+        return {
+            "ToAddresses": [str(request.to)],
+            "CcAddresses": [str(email) for email in request.cc or []],
+            "BccAddresses": [str(email) for email in request.bcc or []],
+        }
 
     async def _send_via_aws_ses(
         self, request: EmailRequest, html_content: str
     ) -> EmailDeliveryResult:
-        """Send email via AWS SES"""
-        # TODO: Implement AWS SES integration
-        logger.warning("AWS SES integration not yet implemented, falling back to SMTP")
-        return await self._send_via_smtp(request, html_content)
+        """Send email via the AWS SES v2 API"""
+        ses = await self._get_ses_client()
+        if ses is None:
+            return await self._send_via_smtp(request, html_content)
+
+        try:
+            body = {"Html": {"Data": html_content, "Charset": "UTF-8"}}
+            if request.text_content:
+                body["Text"] = {"Data": request.text_content, "Charset": "UTF-8"}
+
+            response = await ses.send_email(
+                FromEmailAddress=self._from_header,
+                Destination=self._ses_destination(request),
+                ReplyToAddresses=[str(request.reply_to)] if request.reply_to else [],
+                Content={
+                    "Simple": {
+                        "Subject": {"Data": request.subject, "Charset": "UTF-8"},
+                        "Body": body,
+                    }
+                },
+            )
+
+            logger.info("Email sent successfully via AWS SES to %s", request.to)
+
+            return EmailDeliveryResult(
+                success=True,
+                message_id=response.get("MessageId"),
+                status=EmailStatus.SENT,
+                delivered_at=datetime.now(timezone.utc),
+                provider_response={"provider": "aws_ses"},
+            )
+
+        except (*SES_CLIENT_ERRORS, OSError, asyncio.TimeoutError) as e:
+            logger.error("AWS SES delivery failed: %s", e)
+            return EmailDeliveryResult(
+                success=False,
+                status=EmailStatus.FAILED,
+                error_message=f"AWS SES error: {str(e)}",
+            )
+
+    async def _send_via_aws_ses_bulk(
+        self, requests: list[EmailRequest], html_content: str
+    ) -> list[EmailDeliveryResult] | None:
+        """
+        Send one message to many recipients with SES SendBulkEmail.
+
+        All requests share html_content, subject, text and reply-to. The
+        HTML is already fully rendered, so it goes out as inline template
+        content with no replacement data, up to SES_BULK_MAX_DESTINATIONS
+        recipients per call. Returns None when the group cannot use
+        SendBulkEmail, leaving it to the per-message path.
+        """
+        ses = await self._get_ses_client()
+        # SES would treat {{...}} in the HTML as template placeholders
+        if ses is None or "{{" in html_content:
+            return None
+
+        first = requests[0]
+        template_content = {"Subject": first.subject, "Html": html_content}
+        if first.text_content:
+            template_content["Text"] = first.text_content
+
+        results = []
+        for i in range(0, len(requests), SES_BULK_MAX_DESTINATIONS):
+            chunk = requests[i : i + SES_BULK_MAX_DESTINATIONS]
+            for _ in chunk:
+                await self._bucket.acquire()
+
+            try:
+                response = await ses.send_bulk_email(
+                    FromEmailAddress=self._from_header,
+                    ReplyToAddresses=[str(first.reply_to)] if first.reply_to else [],
+                    DefaultContent={
+                        "Template": {
+                            "TemplateContent": template_content,
+                            "TemplateData": "{}",
+                        }
+                    },
+                    BulkEmailEntries=[
+                        {"Destination": self._ses_destination(request)}
+                        for request in chunk
+                    ],
+                )
+            except (*SES_CLIENT_ERRORS, OSError, asyncio.TimeoutError) as e:
+                logger.error("AWS SES bulk delivery failed: %s", e)
+                results.extend(
+                    EmailDeliveryResult(
+                        success=False,
+                        status=EmailStatus.FAILED,
+                        error_message=f"AWS SES error: {str(e)}",
+                    )
+                    for _ in chunk
+                )
+                continue
+
+            delivered_at = datetime.now(timezone.utc)
+            for entry in response["BulkEmailEntryResults"]:
+                if entry.get("Status") == "SUCCESS":
+                    results.append(
+                        EmailDeliveryResult(
+                            success=True,
+                            message_id=entry.get("MessageId"),
+                            status=EmailStatus.SENT,
+                            delivered_at=delivered_at,
+                            provider_response={"provider": "aws_ses"},
+                        )
+                    )
+                else:
+                    results.append(
+                        EmailDeliveryResult(
+                            success=False,
+                            status=EmailStatus.FAILED,
+                            error_message=f"AWS SES error: {entry.get('Error') or entry.get('Status')}",
+                        )
+                    )
+
+            logger.info("Bulk email sent via AWS SES to %d recipients", len(chunk))
+
+        return results
+
+    @staticmethod
+    def _helper_request(trusted: bool, **fields: Any) -> EmailRequest:
+        """
+        Build the EmailRequest for a send_* helper.
+
+        Trusted internal callers pass addresses and data that were already
+        validated, so the request is built with model_construct and skips
+        Pydantic validation. API callers get full validation.
+        """
+        if trusted:
+            return EmailRequest.model_construct(**fields)
+        return EmailRequest(**fields)
 
     async def send_order_confirmation(
-        self, email: EmailStr, order_data: dict[str, Any]
+        self, email: EmailStr, order_data: dict[str, Any], trusted: bool = False
     ) -> EmailDeliveryResult:
         """Send order confirmation email using MJML template"""
-        request = EmailRequest(
+        request = self._helper_request(
+            trusted,
             to=email,
             subject=f"Confirmación de Pedido #{order_data.get('order_id', 'N/A')} - Brain2Gain",
             template_name="order_confirmation.mjml",
@@ -233,10 +820,11 @@ class EmailDeliveryService:
         return await self.send_email(request)
 
     async def send_order_shipped(
-        self, email: EmailStr, order_data: dict[str, Any]
+        self, email: EmailStr, order_data: dict[str, Any], trusted: bool = False
     ) -> EmailDeliveryResult:
         """Send order shipped notification"""
-        request = EmailRequest(
+        request = self._helper_request(
+            trusted,
             to=email,
             subject=f"Tu Pedido #{order_data.get('order_id', 'N/A')} Ha Sido Enviado - Brain2Gain",
             template_name="order_shipped.mjml",
@@ -246,10 +834,11 @@ class EmailDeliveryService:
         return await self.send_email(request)
 
     async def send_order_delivered(
-        self, email: EmailStr, order_data: dict[str, Any]
+        self, email: EmailStr, order_data: dict[str, Any], trusted: bool = False
     ) -> EmailDeliveryResult:
         """Send order delivered notification"""
-        request = EmailRequest(
+        request = self._helper_request(
+            trusted,
             to=email,
             subject=f"Tu Pedido #{order_data.get('order_id', 'N/A')} Ha Sido Entregado - Brain2Gain",
             template_name="order_delivered.mjml",
@@ -259,10 +848,11 @@ class EmailDeliveryService:
         return await self.send_email(request)
 
     async def send_password_reset(
-        self, email: EmailStr, reset_data: dict[str, Any]
+        self, email: EmailStr, reset_data: dict[str, Any], trusted: bool = False
     ) -> EmailDeliveryResult:
         """Send password reset email"""
-        request = EmailRequest(
+        request = self._helper_request(
+            trusted,
             to=email,
             subject="Recuperación de Contraseña - Brain2Gain",
             template_name="reset_password.mjml",
@@ -272,10 +862,11 @@ class EmailDeliveryService:
         return await self.send_email(request)
 
     async def send_welcome_email(
-        self, email: EmailStr, user_data: dict[str, Any]
+        self, email: EmailStr, user_data: dict[str, Any], trusted: bool = False
     ) -> EmailDeliveryResult:
         """Send welcome email for new accounts"""
-        request = EmailRequest(
+        request = self._helper_request(
+            trusted,
             to=email,
             subject="¡Bienvenido a Brain2Gain! - Tu cuenta ha sido creada",
             template_name="new_account.mjml",
@@ -288,41 +879,256 @@ class EmailDeliveryService:
         self,
         requests: list[EmailRequest],
         batch_size: int = 10,
-        delay_between_batches: float = 1.0,
     ) -> list[EmailDeliveryResult]:
-        """Send multiple emails in batches with rate limiting"""
-        results = []
+        """
+        Send multiple emails concurrently, with at most batch_size in flight.
+        Sends are paced by the provider token bucket in send_email and
+        spread across the SMTP connection pool.
+        Requests sharing a template and template data are compiled once.
+        """
+        pre_rendered = await self._prerender_templates(requests)
+        results: list[EmailDeliveryResult | None] = [None] * len(requests)
 
-        for i in range(0, len(requests), batch_size):
-            batch = requests[i : i + batch_size]
+        bulk_method_name = self.PROVIDER_BULK_SEND_METHODS.get(self.provider)
+        if bulk_method_name is not None:
+            await self._send_bulk_groups(
+                getattr(self, bulk_method_name), requests, pre_rendered, results
+            )
 
-            # Send batch concurrently
-            batch_tasks = [self.send_email(request) for request in batch]
-            batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
+        # A slow send only holds its own slot rather than a whole batch
+        semaphore = asyncio.Semaphore(batch_size)
 
-            # Process results
-            for result in batch_results:
-                if isinstance(result, Exception):
-                    results.append(
-                        EmailDeliveryResult(
-                            success=False,
-                            status=EmailStatus.FAILED,
-                            error_message=str(result),
-                        )
-                    )
-                else:
-                    results.append(result)
+        async def send_bounded(index: int) -> EmailDeliveryResult:
+            async with semaphore:
+                return await self._send_prerendered(requests[index], pre_rendered[index])
 
-            # Delay between batches to avoid rate limiting
-            if i + batch_size < len(requests):
-                await asyncio.sleep(delay_between_batches)
+        pending = [index for index, result in enumerate(results) if result is None]
+        pending_results = await asyncio.gather(
+            *(send_bounded(index) for index in pending), return_exceptions=True
+        )
 
-            logger.info(
-                f"Processed batch {i//batch_size + 1}/{(len(requests)-1)//batch_size + 1}"
-            )
+        for index, result in zip(pending, pending_results, strict=True):
+            if isinstance(result, Exception):
+                results[index] = EmailDeliveryResult(
+                    success=False,
+                    status=EmailStatus.FAILED,
+                    error_message=str(result),
+                )
+            else:
+                results[index] = result
 
+        logger.info(f"Processed {len(requests)} bulk emails")
         return results
 
+    async def _send_bulk_groups(
+        self,
+        bulk_send: Any,
+        requests: list[EmailRequest],
+        pre_rendered: list[str | Exception | None],
+        results: list[EmailDeliveryResult | None],
+    ) -> None:
+        """
+        Send requests that share a message through the provider's bulk API.
+
+        Requests are grouped by HTML, subject, text and reply-to. Results
+        are written into results at each request's index; requests without
+        ready HTML, without another request to share with, or in a group the
+        provider declines (bulk_send returns None) are left for the
+        per-message path.
+        """
+        groups: dict[tuple, list[int]] = {}
+        for index, request in enumerate(requests):
+            html_content = pre_rendered[index]
+            if html_content is None and not request.template_name:
+                html_content = request.html_content
+            if not isinstance(html_content, str):
+                continue
+            key = (html_content, request.subject, request.text_content, request.reply_to)
+            groups.setdefault(key, []).append(index)
+
+        for (html_content, *_), indices in groups.items():
+            if len(indices) == 1:
+                continue
+            group_results = await bulk_send(
+                [requests[index] for index in indices], html_content
+            )
+            if group_results is None:
+                continue
+            for index, result in zip(indices, group_results, strict=True):
+                results[index] = result
+
+    async def enqueue_bulk_emails(self, requests: list[EmailRequest]) -> list[str]:
+        """
+        Queue emails on Redis for the queue workers and return their IDs.
+
+        Returns without waiting for delivery. Each message's result is
+        stored under EMAIL_STATUS_KEY_PREFIX + ID once it has been sent or
+        has failed EMAIL_QUEUE_MAX_ATTEMPTS times. Workers requeue a
+        message when cancelled, but a process crash loses the messages its
+        workers were sending or backing off.
+        """
+        redis = await get_redis_client()
+        message_ids = []
+        payloads = []
+        for request in requests:
+            message_id = uuid4().hex
+            message_ids.append(message_id)
+            payloads.append(
+                json.dumps(
+                    {
+                        "id": message_id,
+                        "attempts": 0,
+                        "request": request.model_dump(mode="json"),
+                    }
+                )
+            )
+
+        for i in range(0, len(payloads), EMAIL_QUEUE_PUSH_CHUNK):
+            await redis.lpush(EMAIL_QUEUE_KEY, *payloads[i : i + EMAIL_QUEUE_PUSH_CHUNK])
+
+        logger.info(f"Queued {len(payloads)} bulk emails")
+        return message_ids
+
+    async def get_queued_email_status(self, message_id: str) -> EmailDeliveryResult | None:
+        """Return the delivery result of a queued email, or None if still pending"""
+        redis = await get_redis_client()
+        stored = await redis.get(f"{EMAIL_STATUS_KEY_PREFIX}{message_id}")
+        if stored is None:
+            return None
+        return EmailDeliveryResult.model_validate_json(stored)
+
+    async def start_queue_workers(self, count: int | None = None) -> None:
+        """Start tasks consuming the Redis bulk send queue"""
+        if self._queue_workers:
+            return
+        count = count or settings.EMAIL_QUEUE_WORKERS
+        self._queue_workers = [
+            asyncio.create_task(self._drain_queue()) for _ in range(count)
+        ]
+        logger.info(f"Started {count} email queue workers")
+
+    async def stop_queue_workers(self) -> None:
+        """Cancel the queue workers and wait for them to exit"""
+        workers, self._queue_workers = self._queue_workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _drain_queue(self) -> None:
+        """Send queued emails until cancelled"""
+        while True:
+            try:
+                redis = await get_redis_client()
+                item = await redis.brpop(EMAIL_QUEUE_KEY, timeout=EMAIL_QUEUE_POLL_TIMEOUT)
+                if item is None:
+                    continue
+                try:
+                    await self._process_queued_email(redis, item[1])
+                except asyncio.CancelledError:
+                    # Cancelled mid-send or mid-backoff: return the message to
+                    # the consuming end so the next worker picks it up first
+                    await redis.rpush(EMAIL_QUEUE_KEY, item[1])
+                    raise
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email queue worker error: {str(e)}")
+                await asyncio.sleep(1)
+
+    async def _process_queued_email(self, redis: Any, payload: str) -> None:
+        """Send one queued email, requeueing or dead-lettering it on failure"""
+        message = None
+        try:
+            message = json.loads(payload)
+            request = EmailRequest.model_validate(message["request"])
+        except (json.JSONDecodeError, KeyError, TypeError, ValidationError) as e:
+            # A payload that can never be sent goes straight to the dead-letter
+            # queue as-is, with a failed status when its ID can be read
+            logger.error("Undecodable queued email dead-lettered: %s", e)
+            await redis.lpush(EMAIL_DEAD_LETTER_KEY, payload)
+            message_id = message.get("id") if isinstance(message, dict) else None
+            if message_id:
+                await redis.setex(
+                    f"{EMAIL_STATUS_KEY_PREFIX}{message_id}",
+                    EMAIL_STATUS_TTL,
+                    EmailDeliveryResult(
+                        success=False,
+                        status=EmailStatus.FAILED,
+                        error_message=f"Invalid queued email: {e}",
+                    ).model_dump_json(),
+                )
+            return
+
+        result = await self.send_email(request)
+
+        if not result.success:
+            message["attempts"] += 1
+            if message["attempts"] < settings.EMAIL_QUEUE_MAX_ATTEMPTS:
+                # Back off before retrying so a struggling provider can recover
+                await asyncio.sleep(2 ** message["attempts"])
+                await redis.lpush(EMAIL_QUEUE_KEY, json.dumps(message))
+                return
+            logger.error(
+                f"Email {message['id']} failed {message['attempts']} times, dead-lettered"
+            )
+            await redis.lpush(EMAIL_DEAD_LETTER_KEY, json.dumps(message))
+
+        await redis.setex(
+            f"{EMAIL_STATUS_KEY_PREFIX}{message['id']}",
+            EMAIL_STATUS_TTL,
+            result.model_dump_json(),
+        )
+
+    async def _prerender_templates(
+        self, requests: list[EmailRequest]
+    ) -> list[str | Exception | None]:
+        """
+        Compile each distinct (template, template data) pair once.
+
+        Returns a list aligned with requests holding the compiled HTML, the
+        compilation error, or None for requests without a template.
+        """
+        groups: dict[tuple[str, str], list[int]] = {}
+        for index, request in enumerate(requests):
+            if request.template_name and request.template_data:
+                data_key = json.dumps(request.template_data, sort_keys=True, default=str)
+                groups.setdefault((request.template_name, data_key), []).append(index)
+
+        pre_rendered: list[str | Exception | None] = [None] * len(requests)
+        if not groups:
+            return pre_rendered
+
+        compiled = await asyncio.gather(
+            *(
+                self.template_service.compile_template(
+                    template_name, requests[indices[0]].template_data
+                )
+                for (template_name, _), indices in groups.items()
+            ),
+            return_exceptions=True,
+        )
+        for indices, html_content in zip(groups.values(), compiled, strict=True):
+            for index in indices:
+                pre_rendered[index] = html_content
+
+        logger.info(
+            f"Compiled {len(groups)} unique templates for {len(requests)} bulk emails"
+        )
+        return pre_rendered
+
+    async def _send_prerendered(
+        self, request: EmailRequest, html_content: str | Exception | None
+    ) -> EmailDeliveryResult:
+        """Send a bulk request with its pre-compiled HTML, if any"""
+        if html_content is None:
+            return await self.send_email(request)
+        if isinstance(html_content, Exception):
+            logger.error(f"Email delivery failed: {str(html_content)}")
+            return EmailDeliveryResult(
+                success=False, status=EmailStatus.FAILED, error_message=str(html_content)
+            )
+        return await self.send_email(request, html_content)
+
 
 # Global service instance
 email_delivery_service = EmailDeliveryService()
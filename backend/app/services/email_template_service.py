@@ -10,18 +10,349 @@ Handles:
 - Integration with NotificationService
 """
 
+import asyncio
+import hashlib
+import json
 import logging
 import os
+import re
 import subprocess
 import tempfile
+from collections import deque
+from collections.abc import Iterable
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict
+from uuid import uuid4
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    Template,
+    TemplateError,
+    select_autoescape,
+)
 
 logger = logging.getLogger(__name__)
 
+# Compiled HTML kept in memory per (template, data digest)
+COMPILED_CACHE_MAX_ENTRIES = 256
+
+# Jinja2 tag openers; MJML sources without any are rendered as-is
+JINJA_TAG_RE = re.compile(r"\{[{%#]")
+
+# Compiled HTML files kept on disk, and how many writes between prunes
+COMPILED_FILES_MAX_ENTRIES = 1000
+COMPILED_FILES_PRUNE_INTERVAL = 100
+
+# Seconds to wait for the MJML worker to start or answer a request
+MJML_WORKER_TIMEOUT = 30
+
+# Largest line read back from the MJML worker (one compiled email)
+MJML_WORKER_LINE_LIMIT = 16 * 1024 * 1024
+
+# Rendered MJML buffered before each write to the worker
+MJML_WORKER_FLUSH_SIZE = 64 * 1024
+
+
+# Sample data for template previews, built once at import
+SAMPLE_BASE_DATA = {
+    "project_name": "Brain2Gain",
+    "customer_name": "Juan Pérez",
+    "order_id": "BG-2025-001234",
+    "order_date": "28 de Junio, 2025",
+    "total_amount": "89.99",
+    "currency": "USD"
+}
+
+SAMPLE_DATA = {
+    "order_confirmation": {
+        **SAMPLE_BASE_DATA,
+        "payment_method": "Tarjeta de Crédito ****1234",
+        "subtotal": "79.99",
+        "shipping_cost": "10.00",
+        "order_items": [
+            {
+                "product_name": "Proteína Whey Isolate 2kg",
+                "quantity": 1,
+                "unit_price": "49.99",
+                "total_price": "49.99"
+            },
+            {
+                "product_name": "Creatina Monohidrato 500g",
+                "quantity": 1,
+                "unit_price": "30.00",
+                "total_price": "30.00"
+            }
+        ],
+        "shipping_address": {
+            "full_name": "Juan Pérez",
+            "street": "Av. Revolución 123, Col. Centro",
+            "city": "Ciudad de México",
+            "state": "CDMX",
+            "zip_code": "06000",
+            "country": "México"
+        },
+        "track_order_url": "https://brain2gain.com/orders/BG-2025-001234"
+    },
+
+    "order_shipped": {
+        **SAMPLE_BASE_DATA,
+        "tracking_number": "1Z999AA1234567890",
+        "carrier_name": "FedEx",
+        "shipped_date": "29 de Junio, 2025",
+        "estimated_delivery": "1 de Julio, 2025",
+        "tracking_url": "https://fedex.com/track?number=1Z999AA1234567890",
+        "order_items": [
+            {
+                "product_name": "Proteína Whey Isolate 2kg",
+                "quantity": 1,
+                "total_price": "49.99"
+            },
+            {
+                "product_name": "Creatina Monohidrato 500g",
+                "quantity": 1,
+                "total_price": "30.00"
+            }
+        ],
+        "shipping_address": {
+            "full_name": "Juan Pérez",
+            "street": "Av. Revolución 123, Col. Centro",
+            "city": "Ciudad de México",
+            "state": "CDMX",
+            "zip_code": "06000",
+            "country": "México"
+        }
+    },
+
+    "order_delivered": {
+        **SAMPLE_BASE_DATA,
+        "delivered_date": "1 de Julio, 2025",
+        "delivered_time": "14:30",
+        "delivery_address": "Av. Revolución 123, Col. Centro, CDMX",
+        "delivery_notes": "Entregado en recepción",
+        "order_items": [
+            {
+                "product_name": "Proteína Whey Isolate 2kg",
+                "quantity": 1,
+                "total_price": "49.99"
+            },
+            {
+                "product_name": "Creatina Monohidrato 500g",
+                "quantity": 1,
+                "total_price": "30.00"
+            }
+        ],
+        "review_url": "https://brain2gain.com/review/BG-2025-001234",
+        "reorder_url": "https://brain2gain.com/reorder/BG-2025-001234"
+    },
+
+    "reset_password": {
+        "project_name": "Brain2Gain",
+        "username": "juan.perez@email.com",
+        "link": "https://brain2gain.com/reset-password?token=abc123def456",
+        "valid_hours": "24"
+    },
+
+    "new_account": {
+        "project_name": "Brain2Gain",
+        "username": "juan.perez@email.com",
+        "password": "TempPassword123!",
+        "link": "https://brain2gain.com/dashboard"
+    }
+}
+
+
+class MJMLWorker:
+    """
+    Persistent Node process that compiles MJML without a fork+exec per email.
+    
+    Requests are JSON lines over the process's stdin/stdout. Writes are
+    serialized by a lock, and replies are matched to requests in order
+    by a reader task, so the next request can be rendered and written
+    while mjml is still compiling the previous one. If node or the mjml
+    package is missing the worker marks itself unavailable and compile()
+    returns None so callers can fall back to the MJML CLI.
+    """
+
+    def __init__(self, script_path: Path):
+        self.script_path = script_path
+        self._process: asyncio.subprocess.Process | None = None
+        self._reader: asyncio.Task | None = None
+        # Futures awaiting replies from the current process, in request order
+        self._pending: deque[asyncio.Future] = deque()
+        self._lock = asyncio.Lock()
+        self._available = True
+
+    async def compile(self, mjml_content: str) -> str | None:
+        """
+        Compile MJML to HTML in the worker.
+        
+        Args:
+            mjml_content: MJML content string
+            
+        Returns:
+            Compiled HTML, or None if the worker could not compile it
+        """
+        return await self.compile_stream((mjml_content,))
+
+    async def compile_stream(self, chunks: Iterable[str]) -> str | None:
+        """
+        Compile MJML produced in chunks, writing each to the worker as it comes.
+        
+        Exceptions raised by chunks (e.g. Jinja2 render errors) propagate
+        after the request has been closed off, so the worker stays in step.
+        
+        Args:
+            chunks: MJML content pieces, such as Template.generate() output
+            
+        Returns:
+            Compiled HTML, or None if the worker could not compile it
+        """
+        if not self._available:
+            return None
+
+        async with self._lock:
+            try:
+                process = await self._ensure_started()
+                if process is None:
+                    return None
+            except (OSError, ValueError, asyncio.TimeoutError) as e:
+                logger.warning("MJML worker start failed: %s", e)
+                await self._stop()
+                return None
+
+            render_error = None
+            try:
+                process.stdin.write(b'{"mjml":"')
+                buffered: list[str] = []
+                size = 0
+                try:
+                    for chunk in chunks:
+                        buffered.append(chunk)
+                        size += len(chunk)
+                        if size >= MJML_WORKER_FLUSH_SIZE:
+                            # The JSON string body, without its quotes
+                            process.stdin.write(json.dumps("".join(buffered))[1:-1].encode())
+                            await process.stdin.drain()
+                            buffered.clear()
+                            size = 0
+                except Exception as e:
+                    render_error = e
+                process.stdin.write(json.dumps("".join(buffered))[1:-1].encode() + b'"}\n')
+                await process.stdin.drain()
+            except (OSError, ValueError) as e:
+                logger.warning("MJML worker request failed: %s", e)
+                await self._stop()
+                if render_error is not None:
+                    raise render_error
+                return None
+
+            reply = asyncio.get_running_loop().create_future()
+            self._pending.append(reply)
+
+        if render_error is not None:
+            # The partial request's reply is read and discarded
+            raise render_error
+
+        try:
+            return await asyncio.wait_for(reply, MJML_WORKER_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("MJML worker timed out")
+            async with self._lock:
+                await self._stop()
+            return None
+
+    async def _ensure_started(self) -> asyncio.subprocess.Process | None:
+        """Start the worker if needed. Must be called with the lock held."""
+        if self._process is not None:
+            # A finished reader means the process's stdout closed
+            if self._process.returncode is None and not self._reader.done():
+                return self._process
+            await self._stop()
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "node",
+                str(self.script_path),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                limit=MJML_WORKER_LINE_LIMIT,
+            )
+        except FileNotFoundError:
+            logger.info("Node.js not available, MJML worker disabled")
+            self._available = False
+            return None
+
+        self._process = process
+        try:
+            line = await asyncio.wait_for(
+                process.stdout.readline(), MJML_WORKER_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            line = b""
+
+        if line.strip() != b'{"ready":true}':
+            logger.info("mjml package not available, MJML worker disabled")
+            self._available = False
+            await self._stop()
+            return None
+
+        self._pending = deque()
+        self._reader = asyncio.create_task(self._read_replies(process, self._pending))
+        logger.info("MJML worker started")
+        return process
+
+    async def _read_replies(
+        self, process: asyncio.subprocess.Process, pending: deque[asyncio.Future]
+    ) -> None:
+        """Resolve pending requests with the process's replies, in order."""
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                if not pending:
+                    logger.warning("MJML worker sent an unexpected reply")
+                    continue
+                reply = pending.popleft()
+                message = json.loads(line)
+                if "error" in message:
+                    logger.warning("MJML worker compilation failed: %s", message["error"])
+                    html_content = None
+                else:
+                    html_content = message["html"]
+                if not reply.done():
+                    reply.set_result(html_content)
+        except (OSError, ValueError) as e:
+            logger.warning("MJML worker reply failed: %s", e)
+        finally:
+            if pending:
+                # The process exited; it is restarted on the next request
+                logger.warning("MJML worker exited with %d requests pending", len(pending))
+            while pending:
+                reply = pending.popleft()
+                if not reply.done():
+                    reply.set_result(None)
+
+    async def _stop(self) -> None:
+        """Terminate the worker process, if running."""
+        process, self._process = self._process, None
+        reader, self._reader = self._reader, None
+        if process is not None and process.returncode is None:
+            process.kill()
+            await process.wait()
+        if reader is not None:
+            # The reader sees EOF and fails any requests still pending
+            await asyncio.gather(reader, return_exceptions=True)
+
+    async def aclose(self) -> None:
+        """Shut the worker down."""
+        async with self._lock:
+            await self._stop()
+
 
 class EmailTemplateService:
     """Service for MJML email template compilation and management."""
@@ -30,14 +361,34 @@ class EmailTemplateService:
         self.template_dir = Path(__file__).parent.parent / "email-templates" / "src"
         self.cache_dir = Path(__file__).parent.parent / "email-templates" / "compiled"
         self.cache_dir.mkdir(exist_ok=True)
+        self.mjml_worker = MJMLWorker(
+            Path(__file__).parent.parent / "email-templates" / "mjml_worker.js"
+        )
+        
+        # Jinja2 bytecode is cached on local disk so warm starts skip parsing
+        bytecode_dir = self.cache_dir / "jinja_bc"
+        bytecode_dir.mkdir(exist_ok=True)
         
         # Setup Jinja2 environment for data population
         self.jinja_env = Environment(
             loader=FileSystemLoader(str(self.template_dir)),
             autoescape=select_autoescape(['html', 'xml', 'mjml']),
             trim_blocks=True,
-            lstrip_blocks=True
+            lstrip_blocks=True,
+            bytecode_cache=FileSystemBytecodeCache(directory=str(bytecode_dir)),
         )
+
+        # Compiled HTML by (template_name, cache key), in insertion order
+        self._compiled_cache: Dict[tuple[str, str], str] = {}
+        self._files_written = 0
+
+        # Loaded Jinja2 templates with the source mtime they were loaded at
+        # and whether the source has no Jinja2 tags
+        self._jinja_templates: Dict[str, tuple[int, Template, bool]] = {}
+
+        # Compiled HTML of templates without Jinja2 tags, with source mtime
+        self._static_html: Dict[str, tuple[int, str]] = {}
+        self._preload_templates()
         
         logger.info(f"EmailTemplateService initialized with template dir: {self.template_dir}")
 
@@ -58,39 +409,231 @@ class EmailTemplateService:
         Returns:
             Compiled HTML email content
         """
+        if not isinstance(data, dict):
+            raise ValueError("Template compilation failed: template data must be a dict")
+
         try:
             mjml_file = self.template_dir / f"{template_name}.mjml"
-            cache_file = self.cache_dir / f"{template_name}_{hash(str(data))}.html"
             
-            if not mjml_file.exists():
+            try:
+                mjml_stat = await asyncio.to_thread(mjml_file.stat)
+            except FileNotFoundError:
                 raise FileNotFoundError(f"Template not found: {template_name}.mjml")
+
+            mtime_ns = mjml_stat.st_mtime_ns
+            template, is_static = self._get_jinja_template(template_name, mtime_ns)
+
+            # Templates without Jinja2 tags compile the same for any data
+            if is_static:
+                static = self._static_html.get(template_name)
+                if static is not None and static[0] == mtime_ns and not force_recompile:
+                    return static[1]
+                html_content = await self._compile_mjml_to_html(template.render())
+                self._static_html[template_name] = (mtime_ns, html_content)
+                logger.info("Static template compiled: %s", template_name)
+                return html_content
+
+            # The key covers the template's mtime, so edits invalidate it
+            cache_key = self._cache_key(data, mtime_ns)
+            memory_key = (template_name, cache_key)
+            cache_file = self.cache_dir / f"{template_name}_{cache_key}.html"
             
             # Check if we have a cached version
-            if not force_recompile and cache_file.exists():
-                if cache_file.stat().st_mtime > mjml_file.stat().st_mtime:
-                    logger.debug(f"Using cached template: {template_name}")
-                    return cache_file.read_text(encoding='utf-8')
-            
-            # Load and populate MJML template with Jinja2
-            template = self.jinja_env.get_template(f"{template_name}.mjml")
-            populated_mjml = template.render(**data)
+            if not force_recompile:
+                html_content = self._compiled_cache.get(memory_key)
+                if html_content is not None:
+                    return html_content
+                try:
+                    html_content = await asyncio.to_thread(
+                        cache_file.read_text, encoding='utf-8'
+                    )
+                except FileNotFoundError:
+                    pass
+                else:
+                    logger.debug("Using cached template: %s", template_name)
+                    self._remember_compiled(memory_key, html_content)
+                    return html_content
             
-            # Compile MJML to HTML using MJML CLI
-            html_content = await self._compile_mjml_to_html(populated_mjml)
+            # Populate the MJML template with Jinja2 and compile it to HTML
+            html_content = await self._render_and_compile(template, data)
             
             # Cache the compiled result
-            cache_file.write_text(html_content, encoding='utf-8')
+            written = await asyncio.to_thread(
+                self._write_cache_file, cache_file, html_content
+            )
+            self._remember_compiled(memory_key, html_content)
+            if written:
+                self._files_written += 1
+                if self._files_written % COMPILED_FILES_PRUNE_INTERVAL == 0:
+                    await self._prune_cache()
             
-            logger.info(f"Template compiled successfully: {template_name}")
+            logger.info("Template compiled successfully: %s", template_name)
             return html_content
             
-        except Exception as e:
-            logger.error(f"Failed to compile template {template_name}: {e}")
-            raise ValueError(f"Template compilation failed: {str(e)}")
+        except (OSError, TemplateError) as e:
+            logger.error("Failed to compile template %s: %s", template_name, e)
+            raise ValueError(f"Template compilation failed: {str(e)}") from e
+
+    def _preload_templates(self) -> None:
+        """Load every MJML template up front, priming the bytecode cache."""
+        for mjml_file in self.template_dir.glob("*.mjml"):
+            try:
+                self._get_jinja_template(mjml_file.stem, mjml_file.stat().st_mtime_ns)
+            except Exception as e:
+                logger.warning(f"Failed to preload template {mjml_file.name}: {e}")
+
+    def _get_jinja_template(self, template_name: str, mtime_ns: int) -> tuple[Template, bool]:
+        """
+        Return the loaded Jinja2 template, reloading it if the source changed.
+        
+        Args:
+            template_name: Name of the MJML template (without .mjml extension)
+            mtime_ns: Current modification time of the MJML source
+            
+        Returns:
+            Loaded Jinja2 template and whether its source has no Jinja2 tags
+        """
+        loaded = self._jinja_templates.get(template_name)
+        if loaded is not None and loaded[0] == mtime_ns:
+            return loaded[1], loaded[2]
+        template_file = f"{template_name}.mjml"
+        template = self.jinja_env.get_template(template_file)
+        source, _, _ = self.jinja_env.loader.get_source(self.jinja_env, template_file)
+        is_static = JINJA_TAG_RE.search(source) is None
+        self._jinja_templates[template_name] = (mtime_ns, template, is_static)
+        return template, is_static
+
+    @staticmethod
+    def _cache_key(data: Dict[str, Any], template_mtime_ns: int) -> str:
+        """
+        Stable cache key for template data.
+        
+        Hashes canonical JSON rather than hash(str(data)), which is salted
+        per process and depends on dict insertion order, so compiled files
+        are reused across workers and restarts.
+        
+        Args:
+            data: Data used to populate the template
+            template_mtime_ns: Modification time of the MJML source
+            
+        Returns:
+            Hex digest identifying the data and template version
+        """
+        payload = json.dumps(data, sort_keys=True, default=str)
+        return hashlib.blake2b(
+            f"{template_mtime_ns}:{payload}".encode(), digest_size=16
+        ).hexdigest()
+
+    def _remember_compiled(self, key: tuple[str, str], html_content: str) -> None:
+        """Keep compiled HTML in memory, evicting the oldest entry when full."""
+        if len(self._compiled_cache) >= COMPILED_CACHE_MAX_ENTRIES:
+            self._compiled_cache.pop(next(iter(self._compiled_cache)))
+        self._compiled_cache[key] = html_content
+
+    @staticmethod
+    def _write_cache_file(cache_file: Path, html_content: str) -> bool:
+        """
+        Write compiled HTML unless another worker already has.
+        Blocking; run in a thread.
+        
+        The content is written to a unique temporary file and moved into
+        place with os.replace, so readers never see a partial file.
+        
+        Args:
+            cache_file: Target compiled HTML file
+            html_content: Compiled HTML content
+            
+        Returns:
+            True if the file was written
+        """
+        if cache_file.exists():
+            return False
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{uuid4().hex}.tmp")
+        try:
+            tmp_file.write_text(html_content, encoding='utf-8')
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            tmp_file.unlink(missing_ok=True)
+            raise
+        return True
+
+    async def _prune_cache(self, max_entries: int = COMPILED_FILES_MAX_ENTRIES) -> int:
+        """
+        Delete the least recently used compiled files beyond max_entries.
+        
+        Args:
+            max_entries: Number of compiled files to keep
+            
+        Returns:
+            Number of files removed
+        """
+        try:
+            removed = await asyncio.to_thread(self._prune_cache_files, max_entries)
+        except OSError as e:
+            logger.warning(f"Failed to prune template cache: {e}")
+            return 0
+        if removed:
+            logger.info(f"Pruned {removed} compiled templates from cache")
+        return removed
+
+    def _prune_cache_files(self, max_entries: int) -> int:
+        """Delete compiled files by oldest access time. Blocking; run in a thread."""
+        entries = []
+        for cache_file in self.cache_dir.glob("*.html"):
+            try:
+                entries.append((cache_file.stat().st_atime, cache_file))
+            except FileNotFoundError:
+                continue
+        if len(entries) <= max_entries:
+            return 0
+        entries.sort()
+        removed = 0
+        for _, cache_file in entries[:len(entries) - max_entries]:
+            cache_file.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    async def _render_and_compile(self, template: Template, data: Dict[str, Any]) -> str:
+        """
+        Render a Jinja2 template and compile the resulting MJML to HTML.
+        
+        The render is streamed into the MJML worker as it is generated.
+        If the worker can't compile it, the template is rendered in full
+        for the MJML CLI or the basic fallback conversion.
+        
+        Args:
+            template: Loaded Jinja2 MJML template
+            data: Data to populate the template
+            
+        Returns:
+            Compiled HTML content
+        """
+        html_content = await self.mjml_worker.compile_stream(template.generate(data))
+        if html_content is not None:
+            return html_content
+        return await self._compile_mjml_without_worker(template.render(data))
 
     async def _compile_mjml_to_html(self, mjml_content: str) -> str:
         """
-        Compile MJML content to HTML using MJML CLI.
+        Compile MJML content to HTML.
+        
+        Uses the persistent MJML worker when available, then the MJML CLI,
+        then the basic fallback conversion.
+        
+        Args:
+            mjml_content: MJML content string
+            
+        Returns:
+            Compiled HTML content
+        """
+        html_content = await self.mjml_worker.compile(mjml_content)
+        if html_content is not None:
+            return html_content
+        return await self._compile_mjml_without_worker(mjml_content)
+
+    async def _compile_mjml_without_worker(self, mjml_content: str) -> str:
+        """
+        Compile MJML content to HTML with the MJML CLI or the basic fallback.
         
         Args:
             mjml_content: MJML content string
@@ -99,39 +642,53 @@ class EmailTemplateService:
             Compiled HTML content
         """
         try:
-            # Create temporary file for MJML content
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.mjml', delete=False) as temp_file:
-                temp_file.write(mjml_content)
-                temp_file_path = temp_file.name
+            # The CLI blocks for a process start, so it runs in a worker thread
+            result = await asyncio.to_thread(self._run_mjml_cli, mjml_content)
             
-            try:
-                # Try to compile with MJML CLI (if available)
-                result = subprocess.run(
-                    ['mjml', temp_file_path, '--stdout'],
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                
-                if result.returncode == 0:
-                    return result.stdout
-                else:
-                    logger.warning(f"MJML CLI compilation failed: {result.stderr}")
-                    # Fall back to basic HTML conversion
-                    return await self._fallback_mjml_to_html(mjml_content)
-                    
-            except (subprocess.TimeoutExpired, FileNotFoundError):
-                logger.warning("MJML CLI not available, using fallback conversion")
+            if result.returncode == 0:
+                return result.stdout
+            else:
+                logger.warning("MJML CLI compilation failed: %s", result.stderr)
+                # Fall back to basic HTML conversion
                 return await self._fallback_mjml_to_html(mjml_content)
                 
-        except Exception as e:
-            logger.error(f"MJML compilation error: {e}")
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            logger.warning("MJML CLI not available, using fallback conversion")
+            return await self._fallback_mjml_to_html(mjml_content)
+            
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.error("MJML compilation error: %s", e)
             return await self._fallback_mjml_to_html(mjml_content)
+
+    @staticmethod
+    def _run_mjml_cli(mjml_content: str) -> subprocess.CompletedProcess:
+        """
+        Compile MJML with the MJML CLI through a temporary file.
+        Blocking; called from a worker thread.
+        
+        Args:
+            mjml_content: MJML content string
+            
+        Returns:
+            Completed CLI process with the HTML on stdout
+        """
+        # Create temporary file for MJML content
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.mjml', delete=False) as temp_file:
+            temp_file.write(mjml_content)
+            temp_file_path = temp_file.name
+        
+        try:
+            return subprocess.run(
+                ['mjml', temp_file_path, '--stdout'],
+                capture_output=True,
+                text=True,
+                timeout=30
+            )
         finally:
             # Clean up temporary file
             try:
                 os.unlink(temp_file_path)
-            except:
+            except OSError:
                 pass
 
     async def _fallback_mjml_to_html(self, mjml_content: str) -> str:
@@ -221,113 +778,8 @@ class EmailTemplateService:
         Returns:
             Sample data dictionary
         """
-        base_data = {
-            "project_name": "Brain2Gain",
-            "customer_name": "Juan Pérez",
-            "order_id": "BG-2025-001234",
-            "order_date": "28 de Junio, 2025",
-            "total_amount": "89.99",
-            "currency": "USD"
-        }
-        
-        template_specific_data = {
-            "order_confirmation": {
-                **base_data,
-                "payment_method": "Tarjeta de Crédito ****1234",
-                "subtotal": "79.99",
-                "shipping_cost": "10.00",
-                "order_items": [
-                    {
-                        "product_name": "Proteína Whey Isolate 2kg",
-                        "quantity": 1,
-                        "unit_price": "49.99",
-                        "total_price": "49.99"
-                    },
-                    {
-                        "product_name": "Creatina Monohidrato 500g",
-                        "quantity": 1,
-                        "unit_price": "30.00",
-                        "total_price": "30.00"
-                    }
-                ],
-                "shipping_address": {
-                    "full_name": "Juan Pérez",
-                    "street": "Av. Revolución 123, Col. Centro",
-                    "city": "Ciudad de México",
-                    "state": "CDMX",
-                    "zip_code": "06000",
-                    "country": "México"
-                },
-                "track_order_url": "https://brain2gain.com/orders/BG-2025-001234"
-            },
-            
-            "order_shipped": {
-                **base_data,
-                "tracking_number": "1Z999AA1234567890",
-                "carrier_name": "FedEx",
-                "shipped_date": "29 de Junio, 2025",
-                "estimated_delivery": "1 de Julio, 2025",
-                "tracking_url": "https://fedex.com/track?number=1Z999AA1234567890",
-                "order_items": [
-                    {
-                        "product_name": "Proteína Whey Isolate 2kg",
-                        "quantity": 1,
-                        "total_price": "49.99"
-                    },
-                    {
-                        "product_name": "Creatina Monohidrato 500g",
-                        "quantity": 1,
-                        "total_price": "30.00"
-                    }
-                ],
-                "shipping_address": {
-                    "full_name": "Juan Pérez",
-                    "street": "Av. Revolución 123, Col. Centro",
-                    "city": "Ciudad de México",
-                    "state": "CDMX",
-                    "zip_code": "06000",
-                    "country": "México"
-                }
-            },
-            
-            "order_delivered": {
-                **base_data,
-                "delivered_date": "1 de Julio, 2025",
-                "delivered_time": "14:30",
-                "delivery_address": "Av. Revolución 123, Col. Centro, CDMX",
-                "delivery_notes": "Entregado en recepción",
-                "order_items": [
-                    {
-                        "product_name": "Proteína Whey Isolate 2kg",
-                        "quantity": 1,
-                        "total_price": "49.99"
-                    },
-                    {
-                        "product_name": "Creatina Monohidrato 500g",
-                        "quantity": 1,
-                        "total_price": "30.00"
-                    }
-                ],
-                "review_url": "https://brain2gain.com/review/BG-2025-001234",
-                "reorder_url": "https://brain2gain.com/reorder/BG-2025-001234"
-            },
-            
-            "reset_password": {
-                "project_name": "Brain2Gain",
-                "username": "juan.perez@email.com",
-                "link": "https://brain2gain.com/reset-password?token=abc123def456",
-                "valid_hours": "24"
-            },
-            
-            "new_account": {
-                "project_name": "Brain2Gain",
-                "username": "juan.perez@email.com",
-                "password": "TempPassword123!",
-                "link": "https://brain2gain.com/dashboard"
-            }
-        }
-        
-        return template_specific_data.get(template_name, base_data)
+        # Copied so callers can't add or replace keys in the shared sample
+        return dict(SAMPLE_DATA.get(template_name, SAMPLE_BASE_DATA))
 
     async def list_available_templates(self) -> list[str]:
         """
@@ -337,12 +789,12 @@ class EmailTemplateService:
             List of available template names (without .mjml extension)
         """
         try:
-            templates = []
-            for file_path in self.template_dir.glob("*.mjml"):
-                templates.append(file_path.stem)
+            templates = await asyncio.to_thread(
+                lambda: sorted(file_path.stem for file_path in self.template_dir.glob("*.mjml"))
+            )
             
             logger.info(f"Found {len(templates)} templates: {templates}")
-            return sorted(templates)
+            return templates
             
         except Exception as e:
             logger.error(f"Failed to list templates: {e}")
@@ -361,7 +813,9 @@ class EmailTemplateService:
         try:
             mjml_file = self.template_dir / f"{template_name}.mjml"
             
-            if not mjml_file.exists():
+            try:
+                mjml_stat = await asyncio.to_thread(mjml_file.stat)
+            except FileNotFoundError:
                 return {
                     "valid": False,
                     "errors": [f"Template file not found: {template_name}.mjml"]
@@ -374,8 +828,8 @@ class EmailTemplateService:
             return {
                 "valid": True,
                 "template_name": template_name,
-                "file_size": mjml_file.stat().st_size,
-                "last_modified": datetime.fromtimestamp(mjml_file.stat().st_mtime).isoformat(),
+                "file_size": mjml_stat.st_size,
+                "last_modified": datetime.fromtimestamp(mjml_stat.st_mtime).isoformat(),
                 "errors": []
             }
             
@@ -399,13 +853,19 @@ class EmailTemplateService:
         try:
             if template_name:
                 # Clear specific template cache
-                for cache_file in self.cache_dir.glob(f"{template_name}_*.html"):
-                    cache_file.unlink()
+                await asyncio.to_thread(self._remove_cache_files, f"{template_name}_*.html")
+                self._compiled_cache = {
+                    key: html
+                    for key, html in self._compiled_cache.items()
+                    if key[0] != template_name
+                }
+                self._static_html.pop(template_name, None)
                 logger.info(f"Cleared cache for template: {template_name}")
             else:
                 # Clear all cache
-                for cache_file in self.cache_dir.glob("*.html"):
-                    cache_file.unlink()
+                await asyncio.to_thread(self._remove_cache_files, "*.html")
+                self._compiled_cache.clear()
+                self._static_html.clear()
                 logger.info("Cleared all template cache")
             
             return True
@@ -414,6 +874,15 @@ class EmailTemplateService:
             logger.error(f"Failed to clear cache: {e}")
             return False
 
+    async def aclose(self) -> None:
+        """Stop the MJML worker process."""
+        await self.mjml_worker.aclose()
+
+    def _remove_cache_files(self, pattern: str) -> None:
+        """Delete compiled files matching pattern. Blocking; run in a thread."""
+        for cache_file in self.cache_dir.glob(pattern):
+            cache_file.unlink()
+
 
 # Global email template service instance
 email_template_service = EmailTemplateService()
\ No newline at end of file
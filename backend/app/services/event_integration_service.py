@@ -1,33 +1,82 @@
 # Event Integration Service for Brain2Gain Microservices
 # Integrates event sourcing with existing services
 
-from datetime import datetime
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+from types import MappingProxyType
 from typing import Any
 from uuid import UUID, uuid4
 
+from app.core.cache import CacheService
 from app.core.event_sourcing import (
+    AGGREGATE_STATE_CACHE_TTL,
     DomainEvent,
     EventType,
+    aggregate_state_cache_key,
     get_aggregate_events,
+    get_latest_snapshot,
     publish_event,
+    publish_events,
+    save_snapshot,
+    stream_aggregate_events,
 )
 from app.schemas.cart import CartItemCreate
 from app.schemas.product import ProductCreate, ProductUpdate
 
+try:
+    # Python 3.14+
+    from uuid import uuid7 as _uuid7
+except ImportError:
+    try:
+        # Rust-backed generator returning stdlib UUID objects
+        from uuid_utils.compat import uuid7 as _uuid7
+    except ImportError:
+        _uuid7 = uuid4
+
+# Replayed events after which reconstructed state is snapshotted
+SNAPSHOT_INTERVAL = 50
+
+# Order statuses with a dedicated event type; others are ORDER_UPDATED
+_STATUS_EVENT = MappingProxyType(
+    {
+        "cancelled": EventType.ORDER_CANCELLED,
+        "shipped": EventType.ORDER_SHIPPED,
+        "delivered": EventType.ORDER_DELIVERED,
+    }
+)
+
+
+def _new_event_id() -> UUID:
+    """Time-ordered event ID (UUIDv7, or UUIDv4 when unavailable)"""
+    return _uuid7()
+
+
+def _new_event_ids_and_ts() -> tuple[UUID, datetime]:
+    """Event ID and naive UTC timestamp shared by one service call"""
+    # event_store.occurred_at is a naive DateTime column holding UTC
+    return _uuid7(), datetime.now(timezone.utc).replace(tzinfo=None)
+
 
 class ProductEventService:
     """Service to integrate product operations with event sourcing"""
 
+    # Constant event metadata, merged into each event's own metadata
+    _METADATA = MappingProxyType({"source": "product_service", "version": "1.0"})
+    _INVENTORY_METADATA = MappingProxyType(
+        {"source": "inventory_service", "version": "1.0"}
+    )
+
     @staticmethod
     async def create_product_with_events(
         product_data: ProductCreate, user_id: UUID
     ) -> dict[str, Any]:
         """Create product and publish domain event"""
+        event_id, now = _new_event_ids_and_ts()
         # Create the product event
         event = DomainEvent(
-            id=uuid4(),
+            id=event_id,
             event_type=EventType.PRODUCT_CREATED,
-            aggregate_id=uuid4(),  # This would be the actual product ID
+            aggregate_id=_new_event_id(),  # This would be the actual product ID
             aggregate_type="Product",
             data={
                 "name": product_data.name,
@@ -38,12 +87,8 @@ class ProductEventService:
                 "category": product_data.category,
                 "is_active": product_data.is_active,
             },
-            metadata={
-                "created_by": str(user_id),
-                "source": "product_service",
-                "version": "1.0",
-            },
-            occurred_at=datetime.utcnow(),
+            metadata={"created_by": user_id, **ProductEventService._METADATA},
+            occurred_at=now,
         )
 
         # Publish the event
@@ -61,18 +106,15 @@ class ProductEventService:
         product_id: UUID, product_data: ProductUpdate, user_id: UUID
     ) -> dict[str, Any]:
         """Update product and publish domain event"""
+        event_id, now = _new_event_ids_and_ts()
         event = DomainEvent(
-            id=uuid4(),
+            id=event_id,
             event_type=EventType.PRODUCT_UPDATED,
             aggregate_id=product_id,
             aggregate_type="Product",
             data=product_data.dict(exclude_unset=True),
-            metadata={
-                "updated_by": str(user_id),
-                "source": "product_service",
-                "version": "1.0",
-            },
-            occurred_at=datetime.utcnow(),
+            metadata={"updated_by": user_id, **ProductEventService._METADATA},
+            occurred_at=now,
         )
 
         await publish_event(event)
@@ -89,22 +131,22 @@ class ProductEventService:
         product_id: UUID, new_stock: int, reason: str, user_id: UUID
     ) -> dict[str, Any]:
         """Update product stock and publish domain event"""
+        event_id, now = _new_event_ids_and_ts()
         event = DomainEvent(
-            id=uuid4(),
+            id=event_id,
             event_type=EventType.PRODUCT_STOCK_UPDATED,
             aggregate_id=product_id,
             aggregate_type="Product",
             data={
                 "new_stock": new_stock,
                 "reason": reason,
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": now,
             },
             metadata={
-                "updated_by": str(user_id),
-                "source": "inventory_service",
-                "version": "1.0",
+                "updated_by": user_id,
+                **ProductEventService._INVENTORY_METADATA,
             },
-            occurred_at=datetime.utcnow(),
+            occurred_at=now,
         )
 
         await publish_event(event)
@@ -120,53 +162,54 @@ class ProductEventService:
 class OrderEventService:
     """Service to integrate order operations with event sourcing"""
 
+    _METADATA = MappingProxyType({"source": "order_service", "version": "1.0"})
+
     @staticmethod
     async def create_order_with_events(
         order_data: dict[str, Any], user_id: UUID
     ) -> dict[str, Any]:
         """Create order and publish domain events"""
-        order_id = uuid4()
+        event_id, now = _new_event_ids_and_ts()
+        order_id = _new_event_id()
 
         # Create order created event
         order_event = DomainEvent(
-            id=uuid4(),
+            id=event_id,
             event_type=EventType.ORDER_CREATED,
             aggregate_id=order_id,
             aggregate_type="Order",
             data=order_data,
-            metadata={
-                "created_by": str(user_id),
-                "source": "order_service",
-                "version": "1.0",
-            },
-            occurred_at=datetime.utcnow(),
+            metadata={"created_by": user_id, **OrderEventService._METADATA},
+            occurred_at=now,
         )
 
-        # Publish order event (this will trigger inventory updates)
-        await publish_event(order_event)
+        events = [order_event]
 
         # Create inventory events for each order item
         if "items" in order_data:
             for item in order_data["items"]:
-                inventory_event = DomainEvent(
-                    id=uuid4(),
-                    event_type=EventType.INVENTORY_STOCK_DECREASED,
-                    aggregate_id=UUID(item["product_id"]),
-                    aggregate_type="Product",
-                    data={
-                        "quantity_decreased": item["quantity"],
-                        "order_id": str(order_id),
-                        "reason": "order_created",
-                    },
-                    metadata={
-                        "triggered_by": str(order_event.id),
-                        "source": "order_service",
-                        "version": "1.0",
-                    },
-                    occurred_at=datetime.utcnow(),
+                events.append(
+                    DomainEvent(
+                        id=_new_event_id(),
+                        event_type=EventType.INVENTORY_STOCK_DECREASED,
+                        aggregate_id=UUID(item["product_id"]),
+                        aggregate_type="Product",
+                        data={
+                            "quantity_decreased": item["quantity"],
+                            "order_id": order_id,
+                            "reason": "order_created",
+                        },
+                        metadata={
+                            "triggered_by": order_event.id,
+                            **OrderEventService._METADATA,
+                        },
+                        occurred_at=now,
+                    )
                 )
 
-                await publish_event(inventory_event)
+        # Persist all events in one commit; the order and each product's
+        # inventory events are then dispatched concurrently
+        await publish_events(events)
 
         return {
             "event_id": str(order_event.id),
@@ -183,17 +226,14 @@ class OrderEventService:
         additional_data: dict[str, Any] = None,
     ) -> dict[str, Any]:
         """Update order status and publish domain event"""
-        # Determine event type based on status
-        event_type_mapping = {
-            "cancelled": EventType.ORDER_CANCELLED,
-            "shipped": EventType.ORDER_SHIPPED,
-            "delivered": EventType.ORDER_DELIVERED,
-        }
-
-        event_type = event_type_mapping.get(new_status.lower(), EventType.ORDER_UPDATED)
+        event_id, now = _new_event_ids_and_ts()
+        # Determine event type based on status; callers usually pass it lowercase
+        event_type = _STATUS_EVENT.get(new_status)
+        if event_type is None:
+            event_type = _STATUS_EVENT.get(new_status.lower(), EventType.ORDER_UPDATED)
 
         event = DomainEvent(
-            id=uuid4(),
+            id=event_id,
             event_type=event_type,
             aggregate_id=order_id,
             aggregate_type="Order",
@@ -202,15 +242,11 @@ class OrderEventService:
                 "previous_status": (
                     additional_data.get("previous_status") if additional_data else None
                 ),
-                "updated_at": datetime.utcnow().isoformat(),
+                "updated_at": now,
                 **(additional_data or {}),
             },
-            metadata={
-                "updated_by": str(user_id),
-                "source": "order_service",
-                "version": "1.0",
-            },
-            occurred_at=datetime.utcnow(),
+            metadata={"updated_by": user_id, **OrderEventService._METADATA},
+            occurred_at=now,
         )
 
         await publish_event(event)
@@ -226,29 +262,28 @@ class OrderEventService:
 class CartEventService:
     """Service to integrate cart operations with event sourcing"""
 
+    _METADATA = MappingProxyType({"source": "cart_service", "version": "1.0"})
+
     @staticmethod
     async def add_item_to_cart_with_events(
         cart_id: UUID, item_data: CartItemCreate, user_id: UUID
     ) -> dict[str, Any]:
         """Add item to cart and publish domain event"""
+        event_id, now = _new_event_ids_and_ts()
         event = DomainEvent(
-            id=uuid4(),
+            id=event_id,
             event_type=EventType.CART_ITEM_ADDED,
             aggregate_id=cart_id,
             aggregate_type="Cart",
             data={
-                "product_id": str(item_data.product_id),
+                "product_id": item_data.product_id,
                 "quantity": item_data.quantity,
                 "price": (
                     float(item_data.price) if hasattr(item_data, "price") else None
                 ),
             },
-            metadata={
-                "user_id": str(user_id),
-                "source": "cart_service",
-                "version": "1.0",
-            },
-            occurred_at=datetime.utcnow(),
+            metadata={"user_id": user_id, **CartEventService._METADATA},
+            occurred_at=now,
         )
 
         await publish_event(event)
@@ -265,21 +300,18 @@ class CartEventService:
         cart_id: UUID, product_id: UUID, user_id: UUID
     ) -> dict[str, Any]:
         """Remove item from cart and publish domain event"""
+        event_id, now = _new_event_ids_and_ts()
         event = DomainEvent(
-            id=uuid4(),
+            id=event_id,
             event_type=EventType.CART_ITEM_REMOVED,
             aggregate_id=cart_id,
             aggregate_type="Cart",
             data={
-                "product_id": str(product_id),
-                "removed_at": datetime.utcnow().isoformat(),
+                "product_id": product_id,
+                "removed_at": now,
             },
-            metadata={
-                "user_id": str(user_id),
-                "source": "cart_service",
-                "version": "1.0",
-            },
-            occurred_at=datetime.utcnow(),
+            metadata={"user_id": user_id, **CartEventService._METADATA},
+            occurred_at=now,
         )
 
         await publish_event(event)
@@ -295,13 +327,16 @@ class CartEventService:
 class UserEventService:
     """Service to integrate user operations with event sourcing"""
 
+    _METADATA = MappingProxyType({"source": "auth_service", "version": "1.0"})
+
     @staticmethod
     async def register_user_with_events(user_data: dict[str, Any]) -> dict[str, Any]:
         """Register user and publish domain event"""
-        user_id = uuid4()
+        event_id, now = _new_event_ids_and_ts()
+        user_id = _new_event_id()
 
         event = DomainEvent(
-            id=uuid4(),
+            id=event_id,
             event_type=EventType.USER_REGISTERED,
             aggregate_id=user_id,
             aggregate_type="User",
@@ -312,11 +347,10 @@ class UserEventService:
                 "role": user_data.get("role", "user"),
             },
             metadata={
-                "source": "auth_service",
+                **UserEventService._METADATA,
                 "registration_method": user_data.get("registration_method", "email"),
-                "version": "1.0",
             },
-            occurred_at=datetime.utcnow(),
+            occurred_at=now,
         )
 
         await publish_event(event)
@@ -332,31 +366,30 @@ class UserEventService:
 class PaymentEventService:
     """Service to integrate payment operations with event sourcing"""
 
+    _METADATA = MappingProxyType({"source": "payment_service", "version": "1.0"})
+
     @staticmethod
     async def initiate_payment_with_events(
         order_id: UUID, payment_data: dict[str, Any], user_id: UUID
     ) -> dict[str, Any]:
         """Initiate payment and publish domain event"""
-        payment_id = uuid4()
+        event_id, now = _new_event_ids_and_ts()
+        payment_id = _new_event_id()
 
         event = DomainEvent(
-            id=uuid4(),
+            id=event_id,
             event_type=EventType.PAYMENT_INITIATED,
             aggregate_id=payment_id,
             aggregate_type="Payment",
             data={
-                "order_id": str(order_id),
+                "order_id": order_id,
                 "amount": payment_data.get("amount"),
                 "currency": payment_data.get("currency", "USD"),
                 "payment_method": payment_data.get("payment_method"),
                 "gateway": payment_data.get("gateway", "stripe"),
             },
-            metadata={
-                "user_id": str(user_id),
-                "source": "payment_service",
-                "version": "1.0",
-            },
-            occurred_at=datetime.utcnow(),
+            metadata={"user_id": user_id, **PaymentEventService._METADATA},
+            occurred_at=now,
         )
 
         await publish_event(event)
@@ -373,8 +406,9 @@ class PaymentEventService:
         payment_id: UUID, transaction_data: dict[str, Any], user_id: UUID
     ) -> dict[str, Any]:
         """Complete payment and publish domain event"""
+        event_id, now = _new_event_ids_and_ts()
         event = DomainEvent(
-            id=uuid4(),
+            id=event_id,
             event_type=EventType.PAYMENT_COMPLETED,
             aggregate_id=payment_id,
             aggregate_type="Payment",
@@ -382,14 +416,10 @@ class PaymentEventService:
                 "transaction_id": transaction_data.get("transaction_id"),
                 "gateway_response": transaction_data.get("gateway_response"),
                 "amount_paid": transaction_data.get("amount_paid"),
-                "completed_at": datetime.utcnow().isoformat(),
-            },
-            metadata={
-                "user_id": str(user_id),
-                "source": "payment_service",
-                "version": "1.0",
+                "completed_at": now,
             },
-            occurred_at=datetime.utcnow(),
+            metadata={"user_id": user_id, **PaymentEventService._METADATA},
+            occurred_at=now,
         )
 
         await publish_event(event)
@@ -406,6 +436,14 @@ class PaymentEventService:
 class EventQueryService:
     """Service for querying event history"""
 
+    @staticmethod
+    async def stream_history(
+        aggregate_id: UUID, aggregate_type: str
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield the event history of an aggregate one event at a time"""
+        async for event in stream_aggregate_events(aggregate_id, aggregate_type):
+            yield event.to_dict()
+
     @staticmethod
     async def get_product_history(product_id: UUID) -> list[dict[str, Any]]:
         """Get complete event history for a product"""
@@ -432,80 +470,142 @@ class EventQueryService:
 
 
 # Event-driven aggregate reconstruction
+def _apply_product_created(state: dict[str, Any], event: DomainEvent) -> None:
+    state.update(event.data)
+    state["created_at"] = event.occurred_at.isoformat()
+
+
+def _apply_product_updated(state: dict[str, Any], event: DomainEvent) -> None:
+    state.update(event.data)
+    state["updated_at"] = event.occurred_at.isoformat()
+
+
+def _apply_product_stock_updated(state: dict[str, Any], event: DomainEvent) -> None:
+    state["stock"] = event.data.get("new_stock")
+    state["updated_at"] = event.occurred_at.isoformat()
+
+
+def _apply_order_created(state: dict[str, Any], event: DomainEvent) -> None:
+    state.update(event.data)
+    state["created_at"] = event.occurred_at.isoformat()
+    state["status_history"].append(
+        {"status": "created", "timestamp": state["created_at"]}
+    )
+
+
+def _apply_order_status_changed(state: dict[str, Any], event: DomainEvent) -> None:
+    occurred_at = event.occurred_at.isoformat()
+    if "new_status" in event.data:
+        state["status"] = event.data["new_status"]
+        state["status_history"].append(
+            {"status": event.data["new_status"], "timestamp": occurred_at}
+        )
+    state["updated_at"] = occurred_at
+
+
+# Replay handlers by event type; events of other types leave state unchanged
+_PRODUCT_HANDLERS = MappingProxyType(
+    {
+        EventType.PRODUCT_CREATED: _apply_product_created,
+        EventType.PRODUCT_UPDATED: _apply_product_updated,
+        EventType.PRODUCT_STOCK_UPDATED: _apply_product_stock_updated,
+    }
+)
+
+_ORDER_HANDLERS = MappingProxyType(
+    {
+        EventType.ORDER_CREATED: _apply_order_created,
+        EventType.ORDER_UPDATED: _apply_order_status_changed,
+        EventType.ORDER_CANCELLED: _apply_order_status_changed,
+        EventType.ORDER_SHIPPED: _apply_order_status_changed,
+        EventType.ORDER_DELIVERED: _apply_order_status_changed,
+    }
+)
+
+
 class AggregateReconstructionService:
     """Service for reconstructing aggregate state from events"""
 
     @staticmethod
-    async def reconstruct_product_state(product_id: UUID) -> dict[str, Any]:
-        """Reconstruct product state from events"""
-        events = await get_aggregate_events(product_id, "Product")
-
-        # Initialize state
-        state = {
-            "id": str(product_id),
-            "name": None,
-            "description": None,
-            "price": None,
-            "stock": None,
-            "sku": None,
-            "category": None,
-            "is_active": True,
-            "created_at": None,
-            "updated_at": None,
-            "events_count": len(events),
-        }
+    async def _reconstruct(
+        aggregate_id: UUID,
+        aggregate_type: str,
+        initial_state: dict[str, Any],
+        handlers: MappingProxyType,
+    ) -> dict[str, Any]:
+        """Apply events newer than the cached state or latest snapshot"""
+        cache_key = aggregate_state_cache_key(aggregate_type, aggregate_id)
+        cached = await CacheService.get(cache_key)
+        if cached:
+            state, sequence = cached["state"], cached["sequence"]
+        else:
+            snapshot = await get_latest_snapshot(aggregate_id, aggregate_type)
+            if snapshot:
+                state, sequence = snapshot.state, snapshot.sequence
+            else:
+                state, sequence = initial_state, 0
+
+        events = await get_aggregate_events(
+            aggregate_id, aggregate_type, after_sequence=sequence
+        )
+        if cached and not events:
+            return state
 
-        # Apply events in chronological order
+        # Apply events in the order they were stored
         for event in events:
-            if event.event_type == EventType.PRODUCT_CREATED:
-                state.update(event.data)
-                state["created_at"] = event.occurred_at.isoformat()
-            elif event.event_type == EventType.PRODUCT_UPDATED:
-                state.update(event.data)
-                state["updated_at"] = event.occurred_at.isoformat()
-            elif event.event_type == EventType.PRODUCT_STOCK_UPDATED:
-                state["stock"] = event.data.get("new_stock")
-                state["updated_at"] = event.occurred_at.isoformat()
+            apply = handlers.get(event.event_type)
+            if apply is not None:
+                apply(state, event)
+
+        state["events_count"] = state.get("events_count", 0) + len(events)
+        if events:
+            sequence = events[-1].sequence
+        if len(events) >= SNAPSHOT_INTERVAL:
+            await save_snapshot(aggregate_id, aggregate_type, sequence, state)
+
+        await CacheService.set(
+            cache_key,
+            {"sequence": sequence, "state": state},
+            ttl=AGGREGATE_STATE_CACHE_TTL,
+        )
 
         return state
 
     @staticmethod
-    async def reconstruct_order_state(order_id: UUID) -> dict[str, Any]:
-        """Reconstruct order state from events"""
-        events = await get_aggregate_events(order_id, "Order")
-
-        state = {
-            "id": str(order_id),
-            "status": "pending",
-            "items": [],
-            "total": 0.0,
-            "created_at": None,
-            "updated_at": None,
-            "status_history": [],
-            "events_count": len(events),
-        }
-
-        for event in events:
-            if event.event_type == EventType.ORDER_CREATED:
-                state.update(event.data)
-                state["created_at"] = event.occurred_at.isoformat()
-                state["status_history"].append(
-                    {"status": "created", "timestamp": event.occurred_at.isoformat()}
-                )
-            elif event.event_type in [
-                EventType.ORDER_UPDATED,
-                EventType.ORDER_CANCELLED,
-                EventType.ORDER_SHIPPED,
-                EventType.ORDER_DELIVERED,
-            ]:
-                if "new_status" in event.data:
-                    state["status"] = event.data["new_status"]
-                    state["status_history"].append(
-                        {
-                            "status": event.data["new_status"],
-                            "timestamp": event.occurred_at.isoformat(),
-                        }
-                    )
-                state["updated_at"] = event.occurred_at.isoformat()
+    async def reconstruct_product_state(product_id: UUID) -> dict[str, Any]:
+        """Reconstruct product state from cached state or a snapshot and later events"""
+        return await AggregateReconstructionService._reconstruct(
+            product_id,
+            "Product",
+            {
+                "id": str(product_id),
+                "name": None,
+                "description": None,
+                "price": None,
+                "stock": None,
+                "sku": None,
+                "category": None,
+                "is_active": True,
+                "created_at": None,
+                "updated_at": None,
+            },
+            _PRODUCT_HANDLERS,
+        )
 
-        return state
+    @staticmethod
+    async def reconstruct_order_state(order_id: UUID) -> dict[str, Any]:
+        """Reconstruct order state from cached state or a snapshot and later events"""
+        return await AggregateReconstructionService._reconstruct(
+            order_id,
+            "Order",
+            {
+                "id": str(order_id),
+                "status": "pending",
+                "items": [],
+                "total": 0.0,
+                "created_at": None,
+                "updated_at": None,
+                "status_history": [],
+            },
+            _ORDER_HANDLERS,
+        )
@@ -503,20 +503,20 @@ class NotificationService:
             # Send appropriate email based on notification type
             if notification_type == "created":
                 result = await email_delivery_service.send_order_confirmation(
-                    customer_email, order_data
+                    customer_email, order_data, trusted=True
                 )
             elif notification_type == "shipped":
                 result = await email_delivery_service.send_order_shipped(
-                    customer_email, order_data
+                    customer_email, order_data, trusted=True
                 )
             elif notification_type == "delivered":
                 result = await email_delivery_service.send_order_delivered(
-                    customer_email, order_data
+                    customer_email, order_data, trusted=True
                 )
             elif notification_type == "status_updated":
                 # For generic status updates, use order confirmation template
                 result = await email_delivery_service.send_order_confirmation(
-                    customer_email, order_data
+                    customer_email, order_data, trusted=True
                 )
             else:
                 logger.warning(f"Unknown notification type: {notification_type}")
@@ -0,0 +1,87 @@
+"""
+Unit tests for the synchronous Redis result cache.
+Tests key derivation, hit/miss behaviour and fallback without Redis.
+"""
+
+from datetime import datetime
+from unittest.mock import patch
+
+from app.core.cache import cached_result
+
+
+class FakeSyncRedis:
+    """In-memory stand-in for the synchronous Redis client."""
+
+    def __init__(self):
+        self._data = {}
+
+    def get(self, key):
+        return self._data.get(key)
+
+    def setex(self, key, ttl, value):
+        self._data[key] = value
+        return True
+
+
+class CohortLikeService:
+    def __init__(self):
+        self.calls = 0
+
+    @cached_result("test:cohorts", ttl=60)
+    def calculate(self, months_back: int = 12) -> dict:
+        self.calls += 1
+        return {"summary": {"avg_retention_by_period": {1: 42.0}}}
+
+
+class TestCachedResult:
+    """Test the cached_result decorator."""
+
+    def test_second_call_is_served_from_cache(self):
+        """Test identical calls hit Redis and return the same JSON form."""
+        fake = FakeSyncRedis()
+        service = CohortLikeService()
+
+        with patch("app.core.cache.get_sync_redis_client", return_value=fake):
+            first = service.calculate(months_back=6)
+            second = service.calculate(months_back=6)
+
+        assert service.calls == 1
+        assert second == first
+        assert second["summary"]["avg_retention_by_period"]["1"] == 42.0
+        assert isinstance(fake._data.popitem()[1], str)
+
+    def test_defaults_and_explicit_arguments_share_a_key(self):
+        """Test positional, keyword and default arguments map to one entry."""
+        fake = FakeSyncRedis()
+        service = CohortLikeService()
+
+        with patch("app.core.cache.get_sync_redis_client", return_value=fake):
+            service.calculate()
+            service.calculate(12)
+            service.calculate(months_back=12)
+
+        assert service.calls == 1
+        assert len(fake._data) == 1
+
+    def test_non_json_keys_are_stored_as_strings(self):
+        """Test date-keyed cohort grids are cached as JSON instead of failing."""
+        fake = FakeSyncRedis()
+
+        @cached_result("test:grid", ttl=60)
+        def grid():
+            return {0: {datetime(2025, 1, 1): 10.0}}
+
+        with patch("app.core.cache.get_sync_redis_client", return_value=fake):
+            assert grid() == {"0": {"2025-01-01 00:00:00": 10.0}}
+
+        assert len(fake._data) == 1
+
+    def test_falls_through_without_redis(self):
+        """Test the wrapped function still runs when Redis is unavailable."""
+        service = CohortLikeService()
+
+        with patch("app.core.cache.get_sync_redis_client", return_value=None):
+            service.calculate()
+            service.calculate()
+
+        assert service.calls == 2
@@ -0,0 +1,306 @@
+"""
+Unit tests for the event sourcing infrastructure.
+Tests event payload serialization and batch publishing.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.event_sourcing import (
+    DomainEvent,
+    EventProcessor,
+    EventRepository,
+    EventType,
+    dumps_event_payload,
+    loads_event_payload,
+    publish_events,
+)
+
+
+def make_event(aggregate_id, event_type=EventType.INVENTORY_STOCK_DECREASED):
+    return DomainEvent(
+        id=uuid4(),
+        event_type=event_type,
+        aggregate_id=aggregate_id,
+        aggregate_type="Product",
+        data={},
+        metadata={},
+        occurred_at=datetime(2025, 6, 30, 12, 0, 0),
+    )
+
+
+@asynccontextmanager
+async def fake_db():
+    yield MagicMock()
+
+
+class TestEventPayloadSerialization:
+    """Test event data/metadata encoding."""
+
+    def test_uuid_datetime_and_decimal_values_are_encoded(self):
+        """Test payloads may hold UUID, naive UTC datetime and Decimal values."""
+        user_id = uuid4()
+        payload = {
+            "updated_by": user_id,
+            "updated_at": datetime(2025, 6, 30, 12, 0, 0),
+            "unit_price": Decimal("19.90"),
+        }
+
+        decoded = loads_event_payload(dumps_event_payload(payload))
+
+        assert decoded == {
+            "updated_by": str(user_id),
+            "updated_at": "2025-06-30T12:00:00Z",
+            "unit_price": 19.9,
+        }
+
+
+class TestDomainEvent:
+    """Test the domain event value type."""
+
+    def test_events_use_slots_and_round_trip_through_dicts(self):
+        """Test events carry no per-instance __dict__ and survive to/from_dict."""
+        event = make_event(uuid4())
+
+        assert not hasattr(event, "__dict__")
+        assert DomainEvent.from_dict(event.to_dict()) == event
+
+
+class TestEventRepository:
+    """Test event store queries."""
+
+    @pytest.mark.asyncio
+    async def test_replay_resumes_after_sequence_not_offset(self):
+        """Test later-stored events are read by sequence whatever their timestamp."""
+        db = MagicMock()
+        db.scalars = AsyncMock(return_value=[])
+
+        await EventRepository(db).get_events_by_aggregate(
+            uuid4(), "Order", after_sequence=7
+        )
+
+        query = db.scalars.await_args.args[0]
+        compiled = query.compile()
+        assert "event_store.sequence >" in str(compiled)
+        assert "ORDER BY event_store.sequence" in str(compiled)
+        assert "OFFSET" not in str(compiled)
+        assert 7 in compiled.params.values()
+
+    @pytest.mark.asyncio
+    async def test_saving_locks_each_aggregate_before_inserting(self):
+        """Test writers of an aggregate are serialized so sequences commit in order."""
+        order_id, product_id = uuid4(), uuid4()
+        db = MagicMock()
+        db.execute = AsyncMock()
+        db.commit = AsyncMock()
+        db.add_all.side_effect = lambda rows: db.execute.assert_awaited()
+
+        await EventRepository(db).save_events(
+            [make_event(product_id), make_event(product_id)]
+            + [
+                DomainEvent(
+                    id=uuid4(),
+                    event_type=EventType.ORDER_CREATED,
+                    aggregate_id=order_id,
+                    aggregate_type="Order",
+                    data={},
+                    metadata={},
+                    occurred_at=datetime(2025, 6, 30, 12, 0, 0),
+                )
+            ]
+        )
+
+        locked = [
+            call.args[0].compile().params for call in db.execute.await_args_list
+        ]
+        assert [list(params.values())[0] for params in locked] == sorted(
+            [f"Order:{order_id}", f"Product:{product_id}"]
+        )
+        assert "pg_advisory_xact_lock" in str(db.execute.await_args_list[0].args[0])
+        db.add_all.assert_called_once()
+        db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_stream_uses_the_same_order_as_the_list(self):
+        """Test the NDJSON history streams events in stored sequence order."""
+        db = MagicMock()
+
+        async def no_rows():
+            return
+            yield
+
+        db.stream_scalars = AsyncMock(return_value=no_rows())
+
+        events = EventRepository(db).stream_events_by_aggregate(uuid4(), "Product")
+        assert [event async for event in events] == []
+
+        query = str(db.stream_scalars.await_args.args[0].compile())
+        assert query.endswith("ORDER BY event_store.sequence")
+
+    @pytest.mark.asyncio
+    async def test_latest_snapshot_is_none_without_snapshots(self):
+        """Test the snapshot lookup runs as a select on the async session."""
+        db = MagicMock()
+        db.scalar = AsyncMock(return_value=None)
+
+        assert await EventRepository(db).get_latest_snapshot(uuid4(), "Order") is None
+        db.scalar.assert_awaited_once()
+
+
+    def test_outbox_claims_events_in_stored_order(self):
+        """Test the drainer dispatches in sequence order, as replay reads them."""
+        compiled = str(
+            EventRepository._unprocessed_events_query(10)
+            .with_for_update(skip_locked=True)
+            .compile(dialect=postgresql.dialect())
+        )
+
+        assert "event_store.processed IS false" in compiled
+        assert "ORDER BY event_store.sequence" in compiled
+        assert "FOR UPDATE SKIP LOCKED" in compiled
+
+
+class TestPublishEvents:
+    """Test batch publishing."""
+
+    @pytest.mark.asyncio
+    async def test_batch_is_saved_once_and_cached_state_invalidated(self):
+        """Test one store write, one deduplicated cache delete, full dispatch."""
+        order_id, product_id = uuid4(), uuid4()
+        events = [
+            DomainEvent(
+                id=uuid4(),
+                event_type=event_type,
+                aggregate_id=aggregate_id,
+                aggregate_type=aggregate_type,
+                data={},
+                metadata={},
+                occurred_at=datetime(2025, 6, 30, 12, 0, 0),
+            )
+            for event_type, aggregate_id, aggregate_type in [
+                (EventType.ORDER_CREATED, order_id, "Order"),
+                (EventType.INVENTORY_STOCK_DECREASED, product_id, "Product"),
+                (EventType.INVENTORY_STOCK_DECREASED, product_id, "Product"),
+            ]
+        ]
+        repo = MagicMock()
+        repo.save_events = AsyncMock()
+
+        with (
+            patch("app.core.event_sourcing.AsyncSessionLocal", new=fake_db),
+            patch("app.core.event_sourcing.EventRepository", return_value=repo),
+            patch(
+                "app.core.event_sourcing.invalidate_cache_keys",
+                new_callable=AsyncMock,
+            ) as mock_invalidate,
+            patch("app.core.event_sourcing.event_bus") as mock_bus,
+        ):
+            mock_bus.publish = AsyncMock()
+            await publish_events(events)
+
+        repo.save_events.assert_awaited_once_with(events, processed=True)
+        assert sorted(mock_invalidate.await_args.args[0]) == sorted(
+            [
+                f"aggregate_state:order:{order_id}",
+                f"aggregate_state:product:{product_id}",
+            ]
+        )
+        dispatched = [call.args[0] for call in mock_bus.publish.await_args_list]
+        assert sorted(dispatched, key=events.index) == events
+        # Events of one aggregate keep their order
+        assert [e for e in dispatched if e.aggregate_id == product_id] == events[1:]
+
+    @pytest.mark.asyncio
+    async def test_aggregates_are_dispatched_concurrently(self):
+        """Test a slow handler for one aggregate does not hold up another."""
+        slow_id, fast_id = uuid4(), uuid4()
+        events = [make_event(slow_id), make_event(fast_id)]
+        dispatched = []
+
+        async def publish(event):
+            if event.aggregate_id == slow_id:
+                await asyncio.sleep(0.01)
+            dispatched.append(event.aggregate_id)
+
+        with patch("app.core.event_sourcing.event_bus") as mock_bus:
+            mock_bus.publish = publish
+            await publish_events(events, persist=False)
+
+        assert dispatched == [fast_id, slow_id]
+
+    @pytest.mark.asyncio
+    async def test_running_drainer_dispatches_stored_events(self):
+        """Test events go to the outbox and wake the drainer instead of dispatching."""
+        events = [make_event(uuid4())]
+        repo = MagicMock()
+        repo.save_events = AsyncMock()
+
+        with (
+            patch("app.core.event_sourcing.AsyncSessionLocal", new=fake_db),
+            patch("app.core.event_sourcing.EventRepository", return_value=repo),
+            patch(
+                "app.core.event_sourcing.invalidate_cache_keys",
+                new_callable=AsyncMock,
+            ),
+            patch("app.core.event_sourcing.event_bus") as mock_bus,
+            patch("app.core.event_sourcing.event_processor") as mock_processor,
+        ):
+            mock_bus.publish = AsyncMock()
+            mock_processor.running = True
+            await publish_events(events)
+
+        repo.save_events.assert_awaited_once_with(events, processed=False)
+        mock_processor.notify.assert_called_once()
+        mock_bus.publish.assert_not_awaited()
+
+
+class TestEventProcessor:
+    """Test the event outbox drainer."""
+
+    @pytest.mark.asyncio
+    async def test_drains_claimed_batches_until_outbox_is_empty(self):
+        """Test each claimed batch is dispatched and then marked processed."""
+        first = [make_event(uuid4()), make_event(uuid4())]
+        second = [make_event(uuid4())]
+        repo = MagicMock()
+        repo.claim_unprocessed_events = AsyncMock(side_effect=[first, second, []])
+        repo.mark_events_processed = AsyncMock()
+
+        with (
+            patch("app.core.event_sourcing.AsyncSessionLocal", new=fake_db),
+            patch("app.core.event_sourcing.EventRepository", return_value=repo),
+            patch("app.core.event_sourcing.event_bus") as mock_bus,
+        ):
+            mock_bus.publish = AsyncMock()
+            processed = await EventProcessor(batch_size=2).process_unprocessed_events()
+
+        assert processed == 3
+        repo.claim_unprocessed_events.assert_awaited_with(2)
+        assert [call.args[0] for call in repo.mark_events_processed.await_args_list] == [
+            [event.id for event in first],
+            [event.id for event in second],
+        ]
+        assert mock_bus.publish.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_start_and_stop_background_drainer(self):
+        """Test the drainer runs until stopped."""
+        processor = EventProcessor(poll_interval=0.01)
+
+        with patch.object(
+            processor, "process_unprocessed_events", new=AsyncMock(return_value=0)
+        ) as mock_process:
+            processor.start()
+            await asyncio.sleep(0.05)
+            assert processor.running
+            await processor.stop()
+
+        assert not processor.running
+        assert mock_process.await_count >= 2
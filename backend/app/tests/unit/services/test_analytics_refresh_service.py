@@ -0,0 +1,113 @@
+"""
+Unit tests for the analytics materialized view refresh scheduler
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.cache import MockRedisClient
+from app.services.analytics_refresh_service import (
+    AnalyticsRefreshScheduler,
+    RefreshJob,
+    default_refresh_jobs,
+)
+
+
+class TestAnalyticsRefreshScheduler:
+    """Test cases for AnalyticsRefreshScheduler"""
+
+    @pytest.fixture
+    def redis(self):
+        """In-memory Redis shared by every scheduler in a test"""
+        client = MockRedisClient()
+        with patch(
+            "app.services.analytics_refresh_service.get_redis_client",
+            new=AsyncMock(return_value=client),
+        ):
+            yield client
+
+    @pytest.fixture
+    def clock(self):
+        """Monotonic clock shared by the scheduler and the mock Redis TTLs"""
+        now = MagicMock(return_value=1000.0)
+        with (
+            patch("app.services.analytics_refresh_service.time.monotonic", new=now),
+            patch("app.core.cache.time.monotonic", new=now),
+        ):
+            yield now
+
+    @pytest.fixture
+    def sessions(self):
+        """Sync sessions handed to refresh callables"""
+        with patch("app.services.analytics_refresh_service.Session") as session_cls:
+            yield session_cls
+
+    @pytest.mark.asyncio
+    async def test_due_jobs_run_once_per_interval(self, redis, sessions):
+        """Test a job runs at start-up and not again before its interval"""
+        refresh = MagicMock()
+        scheduler = AnalyticsRefreshScheduler([RefreshJob("views", 3600, refresh)])
+
+        assert await scheduler.run_due_jobs() == ["views"]
+        assert await scheduler.run_due_jobs() == []
+        refresh.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_job_claimed_by_another_worker_is_skipped(self, redis, sessions):
+        """Test only one worker refreshes a view per interval"""
+        first, second = MagicMock(), MagicMock()
+        worker_a = AnalyticsRefreshScheduler([RefreshJob("views", 3600, first)])
+        worker_b = AnalyticsRefreshScheduler([RefreshJob("views", 3600, second)])
+
+        await worker_a.run_due_jobs()
+        assert await worker_b.run_due_jobs() == []
+
+        first.assert_called_once()
+        second.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_job_runs_again_once_its_claim_expires(self, redis, sessions, clock):
+        """Test the in-memory Redis fallback expires claims so jobs keep running"""
+        refresh = MagicMock()
+        worker_a = AnalyticsRefreshScheduler([RefreshJob("views", 3600, refresh)])
+        worker_b = AnalyticsRefreshScheduler([RefreshJob("views", 3600, refresh)])
+
+        assert await worker_a.run_due_jobs() == ["views"]
+        clock.return_value += 3599
+        assert await worker_a.run_due_jobs() == []
+        assert await worker_b.run_due_jobs() == []
+
+        clock.return_value += 1
+        assert await worker_a.run_due_jobs() == ["views"]
+        assert refresh.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_releases_its_claim(self, redis, sessions):
+        """Test a failure is retried on the next tick rather than a day later"""
+        refresh = MagicMock(side_effect=[RuntimeError("lock timeout"), None])
+        scheduler = AnalyticsRefreshScheduler(
+            [RefreshJob("cohort_first_purchases", 86400, refresh)]
+        )
+
+        assert await scheduler.run_due_jobs() == []
+        assert await redis.get("analytics:refresh:cohort_first_purchases") is None
+        assert await scheduler.run_due_jobs() == ["cohort_first_purchases"]
+        assert refresh.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failing_job_does_not_stop_others(self, redis, sessions):
+        """Test a refresh error is logged and the remaining jobs still run"""
+        broken = MagicMock(side_effect=RuntimeError("view missing"))
+        healthy = MagicMock()
+        scheduler = AnalyticsRefreshScheduler(
+            [RefreshJob("broken", 60, broken), RefreshJob("healthy", 60, healthy)]
+        )
+
+        assert await scheduler.run_due_jobs() == ["healthy"]
+        healthy.assert_called_once()
+
+    def test_default_jobs_cover_every_analytics_view(self):
+        """Test each materialized view read by the analytics API is scheduled"""
+        names = {job.name for job in default_refresh_jobs()}
+        assert {"cart_rollups", "cohort_first_purchases", "funnel_rollups"} <= names
@@ -10,6 +10,7 @@ from unittest.mock import Mock, patch, MagicMock
 import pytest
 from fastapi import HTTPException, status
 from jose import jwt
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session
 
 from app.core.config import settings
@@ -332,10 +333,8 @@ class TestUserAuthentication:
         
         service = AuthService()
         
-        # Mock the get_user_by_email call to return None (user doesn't exist)
-        with patch.object(service, 'get_user_by_email', return_value=None):
-            with patch('app.services.auth_service.User', return_value=created_user):
-                result = service.create_user(user_create)
+        with patch('app.services.auth_service.User', return_value=created_user):
+            result = service.create_user(user_create)
         
         assert result == created_user
         mock_session.add.assert_called_once()
@@ -343,11 +342,11 @@ class TestUserAuthentication:
         mock_session.refresh.assert_called_once()
 
     def test_create_user_email_already_exists(self):
-        """Test user creation with existing email"""
-        service = AuthService()
+        """Test duplicate email surfaces from the unique index as a 400"""
+        mock_session = Mock()
+        mock_session.commit.side_effect = IntegrityError("INSERT", {}, Exception("duplicate key"))
         
-        # Mock existing user
-        existing_user = User(id=uuid.uuid4(), email="existing@example.com")
+        service = AuthService(session=mock_session)
         
         user_create = UserCreate(
             email="existing@example.com",
@@ -355,12 +354,30 @@ class TestUserAuthentication:
             full_name="Test User"
         )
         
-        with patch.object(service, 'get_user_by_email', return_value=existing_user):
-            with pytest.raises(HTTPException) as exc_info:
-                service.create_user(user_create)
+        with pytest.raises(HTTPException) as exc_info:
+            service.create_user(user_create)
         
         assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
         assert "Email already registered" in exc_info.value.detail
+        mock_session.rollback.assert_called_once()
+        # No SELECT precheck before the INSERT
+        mock_session.exec.assert_not_called()
+
+    @patch('app.services.auth_service.Session')
+    def test_injected_session_is_reused(self, mock_session_class):
+        """Test lookups reuse the injected session instead of opening new ones"""
+        mock_session = Mock()
+        user_id = uuid.uuid4()
+        mock_user = User(id=user_id, email="test@example.com", is_active=True)
+        mock_session.exec.return_value.first.return_value = mock_user
+
+        service = AuthService(session=mock_session)
+        token = service.create_access_token(subject=str(user_id))
+
+        assert service.get_user_by_email("test@example.com") == mock_user
+        assert service.get_current_user(token) == mock_user
+        assert mock_session.exec.call_count == 2
+        mock_session_class.assert_not_called()
 
 
 class TestCurrentUserOperations:
@@ -6,6 +6,7 @@ Tests cover cart creation, item management, cart operations, and calculations
 import uuid
 from datetime import datetime
 from decimal import Decimal
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
@@ -20,6 +21,36 @@ from app.services.cart_service import CartService
 pytestmark = pytest.mark.asyncio
 
 
+def _cart_row(
+    cart_id,
+    user_id,
+    product_id=None,
+    quantity=None,
+    name=None,
+    sku=None,
+    unit_price=None,
+    total_amount=None,
+    item_count=None,
+):
+    """Build a row shaped like CartRepository.get_cart_with_totals output"""
+    now = datetime.utcnow()
+    return SimpleNamespace(
+        cart_id=cart_id,
+        user_id=user_id,
+        session_id=None,
+        created_at=now,
+        updated_at=now,
+        product_id=product_id,
+        quantity=quantity,
+        name=name,
+        sku=sku,
+        unit_price=unit_price,
+        line_total=unit_price * quantity if product_id is not None else None,
+        total_amount=total_amount,
+        item_count=item_count,
+    )
+
+
 class TestCartServiceInitialization:
     """Test CartService initialization and basic functionality"""
 
@@ -171,16 +202,18 @@ class TestAddToCart:
         # Mock repository methods
         service.product_repo.get_by_id = AsyncMock(return_value=product)
         service.cart_repo.get_cart_by_user = AsyncMock(return_value=cart)
-        service.cart_repo.get_cart_item = AsyncMock(return_value=None)  # No existing item
-        service.cart_repo.add_cart_item = AsyncMock()
+        service.cart_repo.upsert_cart_item = AsyncMock(
+            return_value=(ProductStatus.ACTIVE, quantity)
+        )
         
         with patch.object(service, 'get_cart_details', return_value=cart_read):
             result = await service.add_to_cart(request, user_id=user_id)
         
         assert result == cart_read
-        service.product_repo.get_by_id.assert_called_once_with(product_id)
-        service.cart_repo.get_cart_item.assert_called_once_with(cart.cart_id, product_id)
-        service.cart_repo.add_cart_item.assert_called_once()
+        service.product_repo.get_by_id.assert_not_called()
+        service.cart_repo.upsert_cart_item.assert_called_once_with(
+            cart.cart_id, product_id, quantity
+        )
 
     async def test_add_to_cart_existing_item_updates_quantity(self):
         """Test adding to existing cart item updates quantity"""
@@ -205,11 +238,6 @@ class TestAddToCart:
         )
         
         cart = Cart(cart_id=1, user_id=user_id)
-        existing_item = CartItem(
-            cart_id=cart.cart_id,
-            product_id=product_id,
-            quantity=existing_quantity
-        )
         
         cart_read = CartRead(
             cart_id=1,
@@ -227,15 +255,17 @@ class TestAddToCart:
         # Mock repository methods
         service.product_repo.get_by_id = AsyncMock(return_value=product)
         service.cart_repo.get_cart_by_user = AsyncMock(return_value=cart)
-        service.cart_repo.get_cart_item = AsyncMock(return_value=existing_item)
-        service.cart_repo.update_cart_item = AsyncMock()
+        service.cart_repo.upsert_cart_item = AsyncMock(
+            return_value=(ProductStatus.ACTIVE, existing_quantity + additional_quantity)
+        )
         
         with patch.object(service, 'get_cart_details', return_value=cart_read):
             result = await service.add_to_cart(request, user_id=user_id)
         
         assert result == cart_read
-        assert existing_item.quantity == existing_quantity + additional_quantity
-        service.cart_repo.update_cart_item.assert_called_once_with(existing_item)
+        service.cart_repo.upsert_cart_item.assert_called_once_with(
+            cart.cart_id, product_id, additional_quantity
+        )
 
     async def test_add_to_cart_product_not_found(self):
         """Test adding non-existent product to cart raises error"""
@@ -246,8 +276,9 @@ class TestAddToCart:
         product_id = 999  # Non-existent product
         request = AddToCartRequest(product_id=product_id, quantity=1)
         
-        # Mock repository method
-        service.product_repo.get_by_id = AsyncMock(return_value=None)
+        # Mock repository methods - no product row comes back
+        service.cart_repo.get_cart_by_user = AsyncMock(return_value=Cart(cart_id=1, user_id=user_id))
+        service.cart_repo.upsert_cart_item = AsyncMock(return_value=None)
         
         with pytest.raises(HTTPException) as exc_info:
             await service.add_to_cart(request, user_id=user_id)
@@ -263,18 +294,13 @@ class TestAddToCart:
         user_id = uuid.uuid4()
         product_id = 1
         
-        inactive_product = Product(
-            product_id=product_id,
-            name="Inactive Product",
-            sku="INACTIVE-001",
-            unit_price=Decimal("29.99"),
-            status=ProductStatus.DISCONTINUED
-        )
-        
         request = AddToCartRequest(product_id=product_id, quantity=1)
         
-        # Mock repository method
-        service.product_repo.get_by_id = AsyncMock(return_value=inactive_product)
+        # Mock repository methods - product exists but nothing was written
+        service.cart_repo.get_cart_by_user = AsyncMock(return_value=Cart(cart_id=1, user_id=user_id))
+        service.cart_repo.upsert_cart_item = AsyncMock(
+            return_value=(ProductStatus.DISCONTINUED, None)
+        )
         
         with pytest.raises(HTTPException) as exc_info:
             await service.add_to_cart(request, user_id=user_id)
@@ -282,6 +308,26 @@ class TestAddToCart:
         assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
         assert "Product is not available" in exc_info.value.detail
 
+    async def test_add_unknown_product_without_cart_creates_no_cart(self):
+        """Test a rejected product does not leave an empty cart behind"""
+        mock_session = Mock(spec=AsyncSession)
+        service = CartService(mock_session)
+
+        user_id = uuid.uuid4()
+        request = AddToCartRequest(product_id=999, quantity=1)
+
+        service.cart_repo.get_cart_by_user = AsyncMock(return_value=None)
+        service.product_repo.get_by_id = AsyncMock(return_value=None)
+        service.cart_repo.create_cart = AsyncMock()
+        service.cart_repo.upsert_cart_item = AsyncMock()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service.add_to_cart(request, user_id=user_id)
+
+        assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+        service.cart_repo.create_cart.assert_not_called()
+        service.cart_repo.upsert_cart_item.assert_not_called()
+
 
 class TestUpdateCartItem:
     """Test updating cart item functionality"""
@@ -325,6 +371,8 @@ class TestUpdateCartItem:
         assert result == cart_read
         assert cart_item.quantity == new_quantity
         service.cart_repo.update_cart_item.assert_called_once_with(cart_item)
+        # cart.updated_at is bumped by the database trigger, not a second commit
+        mock_session.commit.assert_not_called()
 
     async def test_update_cart_item_not_found(self):
         """Test updating non-existent cart item raises error"""
@@ -386,6 +434,7 @@ class TestRemoveFromCart:
         
         assert result == cart_read
         service.cart_repo.remove_cart_item.assert_called_once_with(cart_item)
+        mock_session.commit.assert_not_called()
 
     async def test_remove_from_cart_item_not_found(self):
         """Test removing non-existent cart item raises error"""
@@ -461,84 +510,61 @@ class TestCartDetails:
     async def test_get_cart_details_with_items(self):
         """Test getting detailed cart information with items"""
         mock_session = Mock(spec=AsyncSession)
-        mock_session.get = AsyncMock()
-        
         service = CartService(mock_session)
         
         cart_id = 1
-        cart = Cart(
-            cart_id=cart_id,
-            user_id=uuid.uuid4(),
-            session_id=None,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
-        )
-        
-        # Mock cart items with products
-        class MockCartItemWithProduct:
-            def __init__(self, product_id, quantity, product):
-                self.product_id = product_id
-                self.quantity = quantity
-                self.product = product
-        
-        product1 = Product(
-            product_id=1,
-            name="Product 1",
-            sku="PROD-001",
-            unit_price=Decimal("29.99")
-        )
-        product2 = Product(
-            product_id=2,
-            name="Product 2",
-            sku="PROD-002",
-            unit_price=Decimal("19.99")
-        )
-        
-        items = [
-            MockCartItemWithProduct(1, 2, product1),
-            MockCartItemWithProduct(2, 1, product2)
+        user_id = uuid.uuid4()
+        rows = [
+            _cart_row(cart_id, user_id, 1, 2, "Product 1", "PROD-001", Decimal("29.99"), Decimal("79.97"), 3),
+            _cart_row(cart_id, user_id, 2, 1, "Product 2", "PROD-002", Decimal("19.99"), Decimal("79.97"), 3),
         ]
         
-        # Mock repository method and session.get
-        service.cart_repo.get_cart_items_with_products = AsyncMock(return_value=items)
-        mock_session.get.return_value = cart
+        # Mock the single cart + items + totals query
+        service.cart_repo.get_cart_with_totals = AsyncMock(return_value=rows)
         
         result = await service.get_cart_details(cart_id)
         
         assert result.cart_id == cart_id
-        assert result.user_id == cart.user_id
+        assert result.user_id == user_id
         assert len(result.items) == 2
+        assert result.items[0].total_price == Decimal("59.98")
         assert result.total_amount == Decimal("79.97")  # (29.99 * 2) + (19.99 * 1)
         assert result.item_count == 3  # 2 + 1
+        service.cart_repo.get_cart_with_totals.assert_called_once_with(cart_id)
 
     async def test_get_cart_details_empty_cart(self):
         """Test getting details for empty cart"""
         mock_session = Mock(spec=AsyncSession)
-        mock_session.get = AsyncMock()
-        
         service = CartService(mock_session)
         
         cart_id = 1
-        cart = Cart(
-            cart_id=cart_id,
-            user_id=uuid.uuid4(),
-            session_id=None,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
-        )
+        user_id = uuid.uuid4()
         
-        # Mock repository method and session.get
-        service.cart_repo.get_cart_items_with_products = AsyncMock(return_value=[])
-        mock_session.get.return_value = cart
+        # An empty cart still yields one row with NULL item columns
+        service.cart_repo.get_cart_with_totals = AsyncMock(
+            return_value=[_cart_row(cart_id, user_id)]
+        )
         
         result = await service.get_cart_details(cart_id)
         
         assert result.cart_id == cart_id
-        assert result.user_id == cart.user_id
+        assert result.user_id == user_id
         assert len(result.items) == 0
         assert result.total_amount == Decimal("0.00")
         assert result.item_count == 0
 
+    async def test_get_cart_details_missing_cart(self):
+        """Test getting details for a cart that does not exist"""
+        mock_session = Mock(spec=AsyncSession)
+        service = CartService(mock_session)
+        
+        service.cart_repo.get_cart_with_totals = AsyncMock(return_value=[])
+        
+        with pytest.raises(HTTPException) as exc_info:
+            await service.get_cart_details(999)
+        
+        assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+
 
 class TestCartSessionHandling:
     """Test cart session handling functionality"""
@@ -603,8 +629,9 @@ class TestCartSessionHandling:
         # Mock repository methods
         service.product_repo.get_by_id = AsyncMock(return_value=product)
         service.cart_repo.get_cart_by_session = AsyncMock(return_value=cart)
-        service.cart_repo.get_cart_item = AsyncMock(return_value=None)
-        service.cart_repo.add_cart_item = AsyncMock()
+        service.cart_repo.upsert_cart_item = AsyncMock(
+            return_value=(ProductStatus.ACTIVE, 1)
+        )
         
         with patch.object(service, 'get_cart_details', return_value=cart_read):
             result = await service.add_to_cart(request, session_id=session_id)
@@ -631,36 +658,19 @@ class TestEdgeCases:
     async def test_get_cart_details_decimal_precision(self):
         """Test cart details calculation with high decimal precision"""
         mock_session = Mock(spec=AsyncSession)
-        mock_session.get = AsyncMock()
-        
         service = CartService(mock_session)
         
         cart_id = 1
-        cart = Cart(cart_id=cart_id, user_id=uuid.uuid4())
-        
-        # Mock cart item with high precision price
-        class MockCartItemWithProduct:
-            def __init__(self, product_id, quantity, product):
-                self.product_id = product_id
-                self.quantity = quantity
-                self.product = product
-        
-        product = Product(
-            product_id=1,
-            name="High Precision Product",
-            sku="PREC-001",
-            unit_price=Decimal("33.333")
-        )
-        
-        items = [MockCartItemWithProduct(1, 3, product)]
         
-        # Mock repository method and session.get
-        service.cart_repo.get_cart_items_with_products = AsyncMock(return_value=items)
-        mock_session.get.return_value = cart
+        # Totals are computed by the database; 33.333 * 3 = 99.999
+        rows = [
+            _cart_row(cart_id, uuid.uuid4(), 1, 3, "High Precision Product", "PREC-001", Decimal("33.333"), Decimal("99.999"), 3)
+        ]
+        service.cart_repo.get_cart_with_totals = AsyncMock(return_value=rows)
         
         result = await service.get_cart_details(cart_id)
         
-        # 33.333 * 3 = 99.999
+        assert result.items[0].total_price == Decimal("99.999")
         assert result.total_amount == Decimal("99.999")
         assert result.item_count == 3
 
@@ -714,8 +724,9 @@ class TestCartIntegrationScenarios:
         # Mock repository methods
         service.product_repo.get_by_id = AsyncMock(side_effect=lambda pid: product1 if pid == 1 else product2)
         service.cart_repo.get_cart_by_user = AsyncMock(return_value=cart)
-        service.cart_repo.get_cart_item = AsyncMock(return_value=None)  # No existing items initially
-        service.cart_repo.add_cart_item = AsyncMock()
+        service.cart_repo.upsert_cart_item = AsyncMock(
+            return_value=(ProductStatus.ACTIVE, 1)
+        )
         service.cart_repo.update_cart_item = AsyncMock()
         service.cart_repo.remove_cart_item = AsyncMock()
         
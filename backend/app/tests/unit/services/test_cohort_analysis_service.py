@@ -0,0 +1,82 @@
+"""
+Unit tests for the cohort analysis service
+Tests the cohort grid pivot and serialization helpers.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from app.services.cohort_analysis_service import CohortAnalysisService
+
+JAN, FEB, MAR = datetime(2025, 1, 1), datetime(2025, 2, 1), datetime(2025, 3, 1)
+
+
+class TestPivotPeriods:
+    """Test the bincount cohort x period pivot"""
+
+    def test_matches_pandas_pivot_table(self):
+        """Test duplicate cells are summed and missing cells are 0"""
+        cohort_months = [FEB, JAN, JAN, FEB, JAN, MAR, JAN]
+        period_numbers = [0, 0, 2, 1, 2, 0, 1]
+        values = [4.0, 10.0, 1.5, 2.0, 2.5, 7.0, 6.0]
+
+        grid = CohortAnalysisService._pivot_periods(
+            cohort_months, period_numbers, values, n_periods=12
+        )
+
+        expected = pd.DataFrame(
+            {
+                "cohort_month": pd.to_datetime(cohort_months),
+                "period_number": period_numbers,
+                "value": values,
+            }
+        ).pivot_table(
+            index="cohort_month",
+            columns="period_number",
+            values="value",
+            aggfunc="sum",
+            fill_value=0.0,
+        )
+        pd.testing.assert_frame_equal(
+            grid, expected, check_dtype=False, check_column_type=False
+        )
+
+    def test_only_in_window_observed_periods_become_columns(self):
+        """Test periods outside the window are dropped and gaps are not filled"""
+        grid = CohortAnalysisService._pivot_periods(
+            [JAN, JAN, JAN, FEB], [0, 3, 12, -1], [5, 2, 9, 1], n_periods=12
+        )
+
+        assert grid.columns.tolist() == [0, 3]
+        # The February row had no in-window periods but its cohort is kept
+        assert grid.index.tolist() == [pd.Timestamp(JAN), pd.Timestamp(FEB)]
+        assert grid.to_numpy().tolist() == [[5.0, 2.0], [0.0, 0.0]]
+
+
+class TestGridToDict:
+    """Test cohort grid serialization"""
+
+    def test_matches_dataframe_to_dict(self):
+        """Test the output equals to_dict() with NaN as 0 and the same rounding"""
+        table = pd.DataFrame(
+            [[100.0, 41.666667, np.nan], [80.0, np.nan, 12.345]],
+            index=pd.Index(pd.to_datetime([JAN, FEB]), name="cohort_month"),
+            columns=pd.Index([0, 1, 3], name="period_number"),
+        )
+
+        assert (
+            CohortAnalysisService._grid_to_dict(table, 1)
+            == table.fillna(0).round(1).to_dict()
+        )
+        assert CohortAnalysisService._grid_to_dict(table) == table.fillna(0).to_dict()
+
+    def test_values_are_plain_floats(self):
+        """Test cells are Python floats so the payload serializes as JSON"""
+        table = pd.DataFrame([[3, 1]], index=[pd.Timestamp(JAN)], columns=[0, 1])
+
+        grid = CohortAnalysisService._grid_to_dict(table)
+
+        assert grid == {0: {pd.Timestamp(JAN): 3.0}, 1: {pd.Timestamp(JAN): 1.0}}
+        assert all(type(value) is float for value in grid[0].values())
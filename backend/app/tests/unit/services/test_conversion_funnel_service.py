@@ -0,0 +1,137 @@
+"""
+Unit tests for the conversion funnel service
+Tests step metrics and batched product funnels.
+"""
+
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from sqlmodel import Session
+
+from app.services.conversion_funnel_service import (
+    ConversionFunnelService,
+    FunnelStepData,
+)
+
+
+def make_funnel(counts):
+    return {
+        step: FunnelStepData(count, 0.0, f"{step} description")
+        for step, count in zip(
+            ConversionFunnelService.FUNNEL_STEP_VALUES, counts, strict=True
+        )
+    }
+
+
+def make_product_row(product_id, cart_adds, checkout_starts, purchases):
+    return SimpleNamespace(
+        product_id=product_id,
+        name=f"Product {product_id}",
+        category="protein",
+        price=Decimal("29.99"),
+        cart_adds=cart_adds,
+        checkout_starts=checkout_starts,
+        purchases=purchases,
+        revenue=Decimal("59.98"),
+    )
+
+
+class TestStepMetrics:
+    """Test the vectorized conversion and drop-off calculation"""
+
+    @pytest.fixture
+    def service(self):
+        return ConversionFunnelService(Mock(spec=Session))
+
+    @pytest.mark.parametrize(
+        "counts",
+        [
+            (1000, 300, 120, 45, 30),
+            (100, 0, 0, 0, 0),
+            (150, 57, 0, 3, 1),
+        ],
+    )
+    def test_matches_per_step_arithmetic(self, service, counts):
+        """Test rates match step-by-step division, with 0 when a step is empty"""
+        funnel = make_funnel(counts)
+        steps = ConversionFunnelService.FUNNEL_STEP_VALUES
+
+        conversions, dropoffs = service._calculate_step_metrics(funnel)
+
+        assert len(conversions) == len(dropoffs) == len(steps) - 1
+        for i, (current, following) in enumerate(zip(counts, counts[1:])):
+            rate = following / current * 100 if current else 0.0
+            dropped = current - following
+            conversion = conversions[f"{steps[i]}_to_{steps[i + 1]}"]
+            dropoff = dropoffs[steps[i]]
+
+            assert conversion["from_count"] == current
+            assert conversion["to_count"] == following
+            assert conversion["conversion_rate"] == round(rate, 2)
+            assert conversion["drop_off_count"] == dropped
+            assert conversion["drop_off_rate"] == round(100 - rate, 2)
+            assert dropoff["users_dropped"] == dropped
+            assert dropoff["drop_off_rate"] == round(
+                dropped / current * 100 if current else 0.0, 2
+            )
+            assert dropoff["percentage_of_total"] == round(dropped / counts[0] * 100, 2)
+            assert dropoff["step_description"] == f"{steps[i]} description"
+
+    def test_step_conversions_are_the_metric_conversions(self, service):
+        """Test the conversions-only helper reuses the combined calculation"""
+        funnel = make_funnel((500, 120, 40, 12, 9))
+
+        assert (
+            service._calculate_step_conversions(funnel)
+            == service._calculate_step_metrics(funnel)[0]
+        )
+
+
+class TestProductFunnels:
+    """Test batched product funnel calculation"""
+
+    def test_several_products_use_one_query(self):
+        """Test every requested product comes from a single round trip"""
+        db = Mock(spec=Session)
+        db.execute.return_value.fetchall.return_value = [
+            make_product_row(1, cart_adds=10, checkout_starts=4, purchases=2),
+            make_product_row(2, cart_adds=0, checkout_starts=0, purchases=0),
+        ]
+        service = ConversionFunnelService(db)
+
+        funnels = service.calculate_product_funnels([1, 2, 3], days=7)
+
+        db.execute.assert_called_once()
+        assert db.execute.call_args.args[1]["product_ids"] == [1, 2, 3]
+        # Unknown products are omitted
+        assert set(funnels) == {1, 2}
+
+        first = funnels[1]["funnel"]
+        assert first["product_views"]["count"] == 50
+        assert first["add_to_cart"]["percentage"] == 20.0
+        assert first["checkout_start"]["percentage"] == 8.0
+        assert first["purchase"]["percentage"] == 4.0
+        assert funnels[1]["conversion_rate"] == 4.0
+        assert funnels[1]["period"]["days"] == 7
+
+        # Views never drop below 10, so products without activity still divide
+        assert funnels[2]["funnel"]["product_views"]["count"] == 10
+        assert funnels[2]["conversion_rate"] == 0.0
+
+    def test_single_product_funnel_is_empty_when_unknown(self):
+        """Test the single-product wrapper returns {} for a missing product"""
+        db = Mock(spec=Session)
+        db.execute.return_value.fetchall.return_value = []
+        service = ConversionFunnelService(db)
+
+        assert service.calculate_product_funnel(999) == {}
+
+    def test_no_products_skips_the_query(self):
+        """Test an empty request does not touch the database"""
+        db = Mock(spec=Session)
+        service = ConversionFunnelService(db)
+
+        assert service.calculate_product_funnels([]) == {}
+        db.execute.assert_not_called()
@@ -0,0 +1,127 @@
+"""
+Unit tests for the customer segmentation service
+Tests the SQL quintile scoring and the per-segment aggregation.
+"""
+
+import sqlite3
+from unittest.mock import Mock, patch
+
+import pandas as pd
+import pytest
+from sqlmodel import Session
+
+from app.services.customer_segmentation_service import (
+    CustomerSegmentationService,
+    RFMScores,
+    RFMSegment,
+    _quintile_sql,
+)
+
+
+def quintiles_in_sql(n: int) -> list[int]:
+    """Evaluate _quintile_sql for ranks 1..n with SQL integer division"""
+    with sqlite3.connect(":memory:") as conn:
+        return [
+            conn.execute(
+                f"SELECT {_quintile_sql('r')} FROM (SELECT ? AS r, ? AS n)", (rank, n)
+            ).fetchone()[0]
+            for rank in range(1, n + 1)
+        ]
+
+
+def make_score(customer_id, segment, recency_days, frequency, monetary_value):
+    return RFMScores(
+        customer_id=customer_id,
+        recency_days=recency_days,
+        frequency=frequency,
+        monetary_value=monetary_value,
+        recency_score=3,
+        frequency_score=3,
+        monetary_score=3,
+        rfm_score="333",
+        segment=segment,
+    )
+
+
+class TestQuintileSql:
+    """Test the SQL quintile expression used for R, F and M scores"""
+
+    @pytest.mark.parametrize("n", [2, 3, 4, 5, 6, 7, 9, 10, 11, 23])
+    def test_matches_pandas_qcut_of_first_rank(self, n):
+        """Test small and uneven populations bin like qcut(rank(method="first"))"""
+        # Tied values force rank(method="first") to break ties by position
+        values = pd.Series([i // 2 for i in range(n)])
+        expected = pd.qcut(
+            values.rank(method="first"), 5, labels=[1, 2, 3, 4, 5]
+        ).astype(int)
+
+        assert quintiles_in_sql(n) == expected.tolist()
+
+    def test_single_customer_scores_one(self):
+        """Test a single customer gets the lowest quintile instead of dividing by zero"""
+        assert quintiles_in_sql(1) == [1]
+
+
+class TestSegmentAnalysis:
+    """Test get_segment_analysis aggregation"""
+
+    @pytest.fixture
+    def service(self):
+        return CustomerSegmentationService(Mock(spec=Session))
+
+    def test_segment_totals_match_per_customer_sums(self, service):
+        """Test the bincount aggregation against a plain per-segment loop"""
+        scores = [
+            make_score(1, RFMSegment.AT_RISK, 120, 2, 80.5),
+            make_score(2, RFMSegment.CHAMPIONS, 3, 12, 1500.25),
+            make_score(3, RFMSegment.AT_RISK, 95, 3, 110.0),
+            make_score(4, RFMSegment.HIBERNATING, 400, 1, 19.99),
+            make_score(5, RFMSegment.CHAMPIONS, 7, 9, 999.1),
+            make_score(6, RFMSegment.AT_RISK, 150, 1, 0.01),
+        ]
+
+        with patch.object(service, "calculate_rfm_scores", return_value=scores):
+            analysis = service.get_segment_analysis()
+
+        assert analysis["total_customers"] == len(scores)
+        for segment in {score.segment for score in scores}:
+            members = [score for score in scores if score.segment == segment]
+            monetary = sum(score.monetary_value for score in members)
+            data = analysis["segments"][segment.value]
+
+            assert data["count"] == len(members)
+            assert data["percentage"] == round(len(members) / len(scores) * 100, 1)
+            assert data["avg_recency"] == round(
+                sum(score.recency_days for score in members) / len(members), 1
+            )
+            assert data["avg_frequency"] == round(
+                sum(score.frequency for score in members) / len(members), 1
+            )
+            assert data["avg_monetary"] == round(monetary / len(members), 2)
+            assert data["total_monetary"] == round(monetary, 2)
+
+    def test_segments_are_listed_in_first_seen_order(self, service):
+        """Test segments follow their first customer, not the enum order"""
+        scores = [
+            make_score(1, RFMSegment.HIBERNATING, 400, 1, 10.0),
+            make_score(2, RFMSegment.AT_RISK, 120, 2, 50.0),
+            make_score(3, RFMSegment.HIBERNATING, 380, 1, 12.0),
+            make_score(4, RFMSegment.CHAMPIONS, 2, 15, 2000.0),
+        ]
+
+        with patch.object(service, "calculate_rfm_scores", return_value=scores):
+            analysis = service.get_segment_analysis()
+
+        expected = ["Hibernating", "At_Risk", "Champions"]
+        assert list(analysis["segments"]) == expected
+        assert [
+            entry["segment"] for entry in analysis["segment_distribution"]
+        ] == expected
+
+    def test_no_customers_returns_empty_analysis(self, service):
+        """Test an empty customer base short-circuits the aggregation"""
+        with patch.object(service, "calculate_rfm_scores", return_value=[]):
+            analysis = service.get_segment_analysis()
+
+        assert analysis["total_customers"] == 0
+        assert analysis["segments"] == {}
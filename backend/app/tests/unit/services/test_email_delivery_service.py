@@ -4,17 +4,28 @@ Testing the production-ready email delivery infrastructure
 """
 
 import asyncio
+import email
+import email.policy
+import json
+import aiosmtplib
+import httpx
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from pydantic import EmailStr
 
+from app.core.cache import MockRedisClient
+from app.core.config import settings
 from app.services.email_delivery_service import (
+    EMAIL_DEAD_LETTER_KEY,
+    EMAIL_QUEUE_KEY,
+    EMAIL_STATUS_KEY_PREFIX,
     EmailDeliveryResult,
     EmailDeliveryService,
     EmailPriority,
     EmailRequest,
     EmailStatus,
     DeliveryProvider,
+    _TokenBucket,
 )
 
 
@@ -144,6 +155,28 @@ class TestEmailDeliveryService:
             assert call_args.template_name == "order_confirmation.mjml"
             assert call_args.priority == EmailPriority.HIGH
 
+    @pytest.mark.asyncio
+    async def test_send_order_confirmation_trusted_skips_validation(self, email_service, sample_order_data):
+        """Test that trusted callers build the request without validation"""
+        with patch.object(email_service, 'send_email') as mock_send, \
+                patch.object(EmailRequest, 'model_construct', wraps=EmailRequest.model_construct) as mock_construct:
+            mock_send.return_value = EmailDeliveryResult(
+                success=True,
+                status=EmailStatus.SENT
+            )
+
+            await email_service.send_order_confirmation(
+                "customer@example.com",
+                sample_order_data,
+                trusted=True
+            )
+
+            mock_construct.assert_called_once()
+            call_args = mock_send.call_args[0][0]
+            assert call_args.to == "customer@example.com"
+            assert call_args.template_data is sample_order_data
+            assert call_args.priority == EmailPriority.HIGH
+
     @pytest.mark.asyncio
     async def test_send_order_shipped(self, email_service, sample_order_data):
         """Test sending order shipped notification"""
@@ -259,8 +292,7 @@ class TestEmailDeliveryService:
             
             results = await email_service.send_bulk_emails(
                 requests,
-                batch_size=2,
-                delay_between_batches=0.1
+                batch_size=2
             )
             
             assert len(results) == 5
@@ -294,12 +326,122 @@ class TestEmailDeliveryService:
             assert "SMTP connection failed" in results[1].error_message
             assert results[2].success is True
 
+    @pytest.mark.asyncio
+    async def test_send_bulk_emails_bounds_concurrency(self, email_service):
+        """Test that bulk sends keep at most batch_size emails in flight"""
+        requests = [
+            EmailRequest(
+                to=f"user{i}@example.com",
+                subject=f"Bulk Email {i}",
+                html_content=f"<h1>Bulk Email {i}</h1>"
+            )
+            for i in range(6)
+        ]
+        in_flight = 0
+        max_in_flight = 0
+        finished = []
+
+        async def slow_send(request):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            # The first email is slow; the rest must not wait for it
+            await asyncio.sleep(0.05 if "user0" in str(request.to) else 0.001)
+            in_flight -= 1
+            finished.append(str(request.to))
+            return EmailDeliveryResult(success=True, status=EmailStatus.SENT)
+
+        with patch.object(email_service, 'send_email', side_effect=slow_send):
+            results = await email_service.send_bulk_emails(requests, batch_size=2)
+
+        assert all(result.success for result in results)
+        assert max_in_flight == 2
+        assert finished[-1] == "user0@example.com"
+
+    @pytest.mark.asyncio
+    async def test_send_bulk_emails_compiles_shared_template_once(self, email_service):
+        """Test that bulk requests with identical template data share one compile"""
+        requests = [
+            EmailRequest(
+                to=f"user{i}@example.com",
+                subject="Newsletter",
+                template_name="newsletter",
+                template_data={"headline": "Summer sale", "discount": 20}
+            )
+            for i in range(4)
+        ]
+        requests.append(
+            EmailRequest(
+                to="other@example.com",
+                subject="Newsletter",
+                template_name="newsletter",
+                template_data={"headline": "Winter sale", "discount": 10}
+            )
+        )
+        email_service.template_service.compile_template = AsyncMock(
+            side_effect=lambda name, data: f"<h1>{data['headline']}</h1>"
+        )
+
+        with patch.object(email_service, '_send_via_smtp') as mock_smtp, patch.object(
+            email_service, '_send_via_smtp_bulk'
+        ) as mock_smtp_bulk:
+            mock_smtp.return_value = EmailDeliveryResult(success=True, status=EmailStatus.SENT)
+            mock_smtp_bulk.side_effect = lambda group, html: [
+                EmailDeliveryResult(success=True, status=EmailStatus.SENT) for _ in group
+            ]
+
+            results = await email_service.send_bulk_emails(
+                requests, batch_size=10
+            )
+
+            assert len(results) == 5
+            assert all(result.success for result in results)
+            assert email_service.template_service.compile_template.call_count == 2
+            group, html = mock_smtp_bulk.call_args.args
+            assert html == "<h1>Summer sale</h1>"
+            assert len(group) == 4
+            assert mock_smtp.call_args.args[1] == "<h1>Winter sale</h1>"
+
+    @pytest.mark.asyncio
+    async def test_send_bulk_emails_template_failure(self, email_service):
+        """Test that a failed shared compile fails every request in its group"""
+        requests = [
+            EmailRequest(
+                to=f"user{i}@example.com",
+                subject="Newsletter",
+                template_name="missing",
+                template_data={"headline": "Summer sale"}
+            )
+            for i in range(2)
+        ]
+        email_service.template_service.compile_template = AsyncMock(
+            side_effect=ValueError("Template compilation failed")
+        )
+
+        results = await email_service.send_bulk_emails(requests)
+
+        assert [result.success for result in results] == [False, False]
+        assert "Template compilation failed" in results[0].error_message
+        email_service.template_service.compile_template.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_waits_when_burst_is_spent(self):
+        """Test that sends beyond the burst wait for tokens to refill"""
+        bucket = _TokenBucket(rate=50, capacity=2)
+
+        assert await bucket.acquire() == 0
+        assert await bucket.acquire() == 0
+        waited = await bucket.acquire()
+
+        assert waited > 0
+        assert waited <= 1 / 50 + 0.01
+
     @pytest.mark.asyncio
     async def test_smtp_delivery_success(self, email_service, sample_email_request):
         """Test successful SMTP delivery"""
         with patch('app.services.email_delivery_service.aiosmtplib.SMTP') as mock_smtp_class:
             mock_smtp = AsyncMock()
-            mock_smtp_class.return_value.__aenter__.return_value = mock_smtp
+            mock_smtp_class.return_value = mock_smtp
             
             result = await email_service._send_via_smtp(
                 sample_email_request,
@@ -308,13 +450,65 @@ class TestEmailDeliveryService:
             
             assert result.success is True
             assert result.status == EmailStatus.SENT
+            mock_smtp.connect.assert_called_once()
             mock_smtp.send_message.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_smtp_connection_reused(self, email_service, sample_email_request):
+        """Test that consecutive SMTP sends share one connection"""
+        with patch('app.services.email_delivery_service.aiosmtplib.SMTP') as mock_smtp_class:
+            mock_smtp = AsyncMock()
+            mock_smtp.is_connected = True
+            mock_smtp_class.return_value = mock_smtp
+            
+            for _ in range(3):
+                result = await email_service._send_via_smtp(
+                    sample_email_request,
+                    "<h1>Test Content</h1>"
+                )
+                assert result.success is True
+            
+            mock_smtp_class.assert_called_once()
+            mock_smtp.connect.assert_called_once()
+            assert mock_smtp.noop.call_count == 2
+            assert mock_smtp.send_message.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_smtp_concurrent_sends_use_separate_connections(self, email_service, sample_email_request):
+        """Test that concurrent SMTP sends are spread across pooled connections"""
+        with patch('app.services.email_delivery_service.aiosmtplib.SMTP') as mock_smtp_class:
+            in_flight = 0
+            max_in_flight = 0
+
+            async def slow_send(*args, **kwargs):
+                nonlocal in_flight, max_in_flight
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+
+            def new_connection(**kwargs):
+                smtp = AsyncMock()
+                smtp.is_connected = True
+                smtp.send_message.side_effect = slow_send
+                return smtp
+
+            mock_smtp_class.side_effect = new_connection
+            
+            results = await asyncio.gather(*[
+                email_service._send_via_smtp(sample_email_request, "<h1>Test Content</h1>")
+                for _ in range(3)
+            ])
+            
+            assert all(result.success for result in results)
+            assert mock_smtp_class.call_count == 3
+            assert max_in_flight == 3
+
     @pytest.mark.asyncio
     async def test_smtp_delivery_failure(self, email_service, sample_email_request):
         """Test SMTP delivery failure handling"""
         with patch('app.services.email_delivery_service.aiosmtplib.SMTP') as mock_smtp_class:
-            mock_smtp_class.side_effect = Exception("SMTP connection failed")
+            mock_smtp_class.side_effect = aiosmtplib.SMTPConnectError("SMTP connection failed")
             
             result = await email_service._send_via_smtp(
                 sample_email_request,
@@ -323,4 +517,283 @@ class TestEmailDeliveryService:
             
             assert result.success is False
             assert result.status == EmailStatus.FAILED
-            assert "SMTP connection failed" in result.error_message
\ No newline at end of file
+            assert "SMTP connection failed" in result.error_message
+
+    @pytest.mark.asyncio
+    async def test_aws_ses_delivery_success(self, email_service, sample_email_request):
+        """Test sending a single email through the SES v2 client"""
+        email_service._ses_client = AsyncMock()
+        email_service._ses_client.send_email.return_value = {"MessageId": "ses-123"}
+
+        result = await email_service._send_via_aws_ses(
+            sample_email_request, "<h1>Test Content</h1>"
+        )
+
+        assert result.success is True
+        assert result.message_id == "ses-123"
+        kwargs = email_service._ses_client.send_email.call_args.kwargs
+        assert kwargs["Destination"]["ToAddresses"] == ["test@example.com"]
+        assert kwargs["Content"]["Simple"]["Body"]["Html"]["Data"] == "<h1>Test Content</h1>"
+
+    @pytest.mark.asyncio
+    async def test_aws_ses_provider_error_is_a_failed_result(self, email_service, sample_email_request):
+        """Test that an SES transport error is reported as a failed delivery"""
+        email_service._ses_client = AsyncMock()
+        email_service._ses_client.send_email.side_effect = OSError("connection reset")
+
+        result = await email_service._send_via_aws_ses(
+            sample_email_request, "<h1>Test Content</h1>"
+        )
+
+        assert result.success is False
+        assert result.error_message == "AWS SES error: connection reset"
+
+    @pytest.mark.asyncio
+    async def test_unexpected_provider_error_reaches_send_email(self, email_service, sample_email_request):
+        """Test that non-provider errors are not swallowed by the SendGrid path"""
+        email_service.provider = DeliveryProvider.SENDGRID
+        email_service._send_method_name = "_send_via_sendgrid"
+
+        with patch.object(
+            email_service, '_post_to_sendgrid', side_effect=KeyError("personalizations")
+        ), pytest.raises(KeyError):
+            await email_service._send_via_sendgrid(sample_email_request, "<h1>Hi</h1>")
+
+        with patch.object(
+            email_service, '_post_to_sendgrid', side_effect=httpx.ConnectError("refused")
+        ):
+            result = await email_service.send_email(sample_email_request, "<h1>Hi</h1>")
+
+        assert result.success is False
+        assert result.error_message == "SendGrid error: refused"
+
+    @pytest.mark.asyncio
+    async def test_send_bulk_emails_aws_ses_batches_destinations(self, email_service):
+        """Test that SES bulk sends share one SendBulkEmail call per 50 recipients"""
+        requests = [
+            EmailRequest(
+                to=f"user{i}@example.com",
+                subject="Newsletter",
+                html_content="<h1>Newsletter</h1>"
+            )
+            for i in range(60)
+        ]
+        email_service.provider = DeliveryProvider.AWS_SES
+        email_service._bucket = _TokenBucket(rate=1000, capacity=100)
+        email_service._ses_client = AsyncMock()
+        email_service._ses_client.send_bulk_email.side_effect = lambda **kwargs: {
+            "BulkEmailEntryResults": [
+                {"Status": "SUCCESS", "MessageId": f"ses-{i}"}
+                for i in range(len(kwargs["BulkEmailEntries"]))
+            ]
+        }
+
+        results = await email_service.send_bulk_emails(requests)
+
+        assert len(results) == 60
+        assert all(result.success for result in results)
+        calls = email_service._ses_client.send_bulk_email.call_args_list
+        assert [len(call.kwargs["BulkEmailEntries"]) for call in calls] == [50, 10]
+        email_service._ses_client.send_email.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_send_bulk_emails_aws_ses_fallback_bounds_concurrency(self, email_service):
+        """Test that groups SES cannot bulk-send still keep batch_size in flight"""
+        requests = [
+            EmailRequest(
+                to=f"user{i}@example.com",
+                subject="Newsletter",
+                html_content="<h1>Hola {{ name }}</h1>"
+            )
+            for i in range(6)
+        ]
+        email_service.provider = DeliveryProvider.AWS_SES
+        email_service._ses_client = AsyncMock()
+        in_flight = 0
+        max_in_flight = 0
+
+        async def slow_send(request, html_content=None):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return EmailDeliveryResult(success=True, status=EmailStatus.SENT)
+
+        with patch.object(email_service, 'send_email', side_effect=slow_send) as mock_send:
+            results = await email_service.send_bulk_emails(requests, batch_size=2)
+
+        assert all(result.success for result in results)
+        assert mock_send.call_count == 6
+        assert max_in_flight == 2
+        email_service._ses_client.send_bulk_email.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_send_bulk_emails_sendgrid_uses_personalizations(self, email_service):
+        """Test that SendGrid bulk sends put up to 1000 recipients in one request"""
+        requests = [
+            EmailRequest(
+                to=f"user{i}@example.com",
+                subject="Newsletter",
+                html_content="<h1>Newsletter</h1>"
+            )
+            for i in range(1200)
+        ]
+        email_service.provider = DeliveryProvider.SENDGRID
+        email_service._bucket = _TokenBucket(rate=100000, capacity=2000)
+        email_service._sendgrid_client = AsyncMock()
+        email_service._sendgrid_client.post.return_value = httpx.Response(
+            202,
+            headers={"X-Message-Id": "sg-123"},
+            request=httpx.Request("POST", "https://api.sendgrid.com/v3/mail/send"),
+        )
+
+        results = await email_service.send_bulk_emails(requests)
+
+        assert len(results) == 1200
+        assert all(result.success for result in results)
+        assert results[0].message_id == "sg-123"
+        calls = email_service._sendgrid_client.post.call_args_list
+        assert [len(call.kwargs["json"]["personalizations"]) for call in calls] == [1000, 200]
+        assert calls[0].kwargs["json"]["content"] == [
+            {"type": "text/html", "value": "<h1>Newsletter</h1>"}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_enqueue_bulk_emails_and_process(self, email_service):
+        """Test that queued emails are sent by a worker and leave a receipt"""
+        redis = MockRedisClient()
+        requests = [
+            EmailRequest(
+                to=f"user{i}@example.com",
+                subject="Queued",
+                html_content="<h1>Queued</h1>"
+            )
+            for i in range(2)
+        ]
+
+        with patch(
+            'app.services.email_delivery_service.get_redis_client',
+            AsyncMock(return_value=redis),
+        ), patch.object(email_service, 'send_email') as mock_send:
+            mock_send.return_value = EmailDeliveryResult(success=True, status=EmailStatus.SENT)
+
+            message_ids = await email_service.enqueue_bulk_emails(requests)
+            assert len(message_ids) == 2
+            mock_send.assert_not_called()
+
+            for _ in message_ids:
+                _, payload = await redis.brpop(EMAIL_QUEUE_KEY)
+                await email_service._process_queued_email(redis, payload)
+
+            assert mock_send.call_count == 2
+            assert str(mock_send.call_args_list[0].args[0].to) == "user0@example.com"
+            status = await email_service.get_queued_email_status(message_ids[0])
+            assert status.success is True
+
+    @pytest.mark.asyncio
+    async def test_queued_email_dead_lettered_after_max_attempts(self, email_service):
+        """Test that an email failing every attempt moves to the dead-letter queue"""
+        redis = MockRedisClient()
+        message = {
+            "id": "msg-1",
+            "attempts": 0,
+            "request": EmailRequest(
+                to="user@example.com", subject="Queued", html_content="<h1>Queued</h1>"
+            ).model_dump(mode="json"),
+        }
+
+        with patch.object(email_service, 'send_email') as mock_send, patch(
+            'app.services.email_delivery_service.asyncio.sleep', AsyncMock()
+        ):
+            mock_send.return_value = EmailDeliveryResult(
+                success=False, status=EmailStatus.FAILED, error_message="SMTP error"
+            )
+
+            await email_service._process_queued_email(redis, json.dumps(message))
+            while (item := await redis.brpop(EMAIL_QUEUE_KEY, timeout=1)) is not None:
+                await email_service._process_queued_email(redis, item[1])
+
+            assert mock_send.call_count == settings.EMAIL_QUEUE_MAX_ATTEMPTS
+            _, dead = await redis.brpop(EMAIL_DEAD_LETTER_KEY)
+            assert json.loads(dead)["id"] == "msg-1"
+            assert await redis.get(f"{EMAIL_STATUS_KEY_PREFIX}msg-1") is not None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            "not json",
+            json.dumps({"id": "msg-2", "attempts": 0}),
+            json.dumps({"id": "msg-2", "attempts": 0, "request": {"subject": "No recipient"}}),
+        ],
+    )
+    async def test_undecodable_queued_email_is_dead_lettered(self, email_service, payload):
+        """Test that a poison message is dead-lettered unchanged instead of dropped"""
+        redis = MockRedisClient()
+
+        with patch.object(email_service, 'send_email') as mock_send:
+            await email_service._process_queued_email(redis, payload)
+
+        mock_send.assert_not_called()
+        assert await redis.brpop(EMAIL_DEAD_LETTER_KEY) == (EMAIL_DEAD_LETTER_KEY, payload)
+        if payload != "not json":
+            status = await redis.get(f"{EMAIL_STATUS_KEY_PREFIX}msg-2")
+            assert EmailDeliveryResult.model_validate_json(status).status == EmailStatus.FAILED
+
+    @pytest.mark.asyncio
+    async def test_cancelled_worker_requeues_in_flight_email(self, email_service):
+        """Test that stopping a worker mid-send puts the email back on the queue"""
+        redis = MockRedisClient()
+        sending = asyncio.Event()
+
+        async def slow_send(request):
+            sending.set()
+            await asyncio.sleep(3600)
+
+        with patch(
+            'app.services.email_delivery_service.get_redis_client',
+            AsyncMock(return_value=redis),
+        ), patch.object(email_service, 'send_email', side_effect=slow_send):
+            [message_id] = await email_service.enqueue_bulk_emails(
+                [EmailRequest(to="user@example.com", subject="Queued", html_content="<h1>Queued</h1>")]
+            )
+            await email_service.start_queue_workers(count=1)
+            await asyncio.wait_for(sending.wait(), timeout=5)
+            await email_service.stop_queue_workers()
+
+        _, payload = await redis.brpop(EMAIL_QUEUE_KEY, timeout=1)
+        assert json.loads(payload)["id"] == message_id
+
+    @pytest.mark.asyncio
+    async def test_smtp_bulk_reuses_encoded_body(self, email_service):
+        """Test that SMTP bulk sends share one encoded body across recipients"""
+        requests = [
+            EmailRequest(
+                to=f"user{i}@example.com",
+                subject="Confirmación de Pedido",
+                html_content="<h1>Newsletter</h1>"
+            )
+            for i in range(3)
+        ]
+
+        with patch('app.services.email_delivery_service.aiosmtplib.SMTP') as mock_smtp_class, \
+                patch.object(email_service, '_build_cached_body', wraps=email_service._build_cached_body) as mock_body:
+            mock_smtp = AsyncMock()
+            mock_smtp.is_connected = True
+            mock_smtp_class.return_value = mock_smtp
+
+            results = await email_service.send_bulk_emails(requests)
+
+            assert all(result.success for result in results)
+            mock_body.assert_called_once()
+            assert mock_smtp.sendmail.call_count == 3
+            messages = [
+                email.message_from_bytes(call.args[2], policy=email.policy.default)
+                for call in mock_smtp.sendmail.call_args_list
+            ]
+            assert [message["To"] for message in messages] == [
+                "user0@example.com", "user1@example.com", "user2@example.com"
+            ]
+            assert messages[0]["Subject"] == "Confirmación de Pedido"
+            assert messages[0].get_body(("html",)).get_content() == "<h1>Newsletter</h1>"
@@ -3,13 +3,17 @@ Tests for EmailTemplateService
 Tests the MJML email template compilation and management functionality
 """
 
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
+import shutil
 import tempfile
 import os
 from pathlib import Path
 
-from app.services.email_template_service import EmailTemplateService
+from jinja2 import FileSystemLoader
+
+from app.services.email_template_service import EmailTemplateService, MJMLWorker
 
 
 class TestEmailTemplateService:
@@ -155,9 +159,56 @@ class TestEmailTemplateService:
     async def test_clear_cache_specific_template(self, email_service):
         """Test clearing cache for specific template"""
         result = await email_service.clear_cache("order_confirmation")
-        
+
         assert result is True
 
+    @pytest.mark.asyncio
+    async def test_static_template_compiled_once(self, email_service, tmp_path):
+        """Test that a template without Jinja2 tags is compiled once for any data"""
+        (tmp_path / "static_footer.mjml").write_text(
+            "<mjml><mj-body><mj-text>Legal footer</mj-text></mj-body></mjml>",
+            encoding='utf-8'
+        )
+        email_service.template_dir = tmp_path
+        email_service.jinja_env.loader = FileSystemLoader(str(tmp_path))
+        email_service.mjml_worker.compile = AsyncMock(
+            return_value="<html><body>Legal footer</body></html>"
+        )
+
+        first = await email_service.compile_template("static_footer", {"customer_name": "A"})
+        second = await email_service.compile_template("static_footer", {"customer_name": "B"})
+
+        assert first == second == "<html><body>Legal footer</body></html>"
+        email_service.mjml_worker.compile.assert_called_once()
+        assert list(email_service.cache_dir.glob("static_footer_*.html")) == []
+
+    def test_write_cache_file_skips_existing(self, email_service, tmp_path):
+        """Test that an existing compiled file is not rewritten"""
+        cache_file = tmp_path / "order_confirmation_abc.html"
+
+        assert email_service._write_cache_file(cache_file, "<html>first</html>") is True
+        assert email_service._write_cache_file(cache_file, "<html>second</html>") is False
+
+        assert cache_file.read_text(encoding='utf-8') == "<html>first</html>"
+        assert list(tmp_path.iterdir()) == [cache_file]
+
+    @pytest.mark.asyncio
+    async def test_prune_cache_removes_least_recently_used(self, email_service, tmp_path):
+        """Test that pruning keeps the most recently accessed compiled files"""
+        email_service.cache_dir = tmp_path
+        for i in range(5):
+            cache_file = tmp_path / f"order_confirmation_{i}.html"
+            cache_file.write_text("<html></html>", encoding='utf-8')
+            os.utime(cache_file, (1000 + i, 1000 + i))
+
+        removed = await email_service._prune_cache(max_entries=2)
+
+        assert removed == 3
+        assert sorted(p.name for p in tmp_path.glob("*.html")) == [
+            "order_confirmation_3.html",
+            "order_confirmation_4.html",
+        ]
+
     def test_get_sample_data_order_confirmation(self, email_service):
         """Test sample data generation for order confirmation"""
         data = email_service._get_sample_data("order_confirmation")
@@ -203,6 +254,7 @@ class TestEmailTemplateService:
         # Mock successful MJML CLI execution
         mock_subprocess.return_value.returncode = 0
         mock_subprocess.return_value.stdout = "<html><body>Compiled HTML</body></html>"
+        email_service.mjml_worker.compile = AsyncMock(return_value=None)
         
         html = await email_service._compile_mjml_to_html("<mjml><mj-body>Test</mj-body></mjml>")
         
@@ -216,6 +268,7 @@ class TestEmailTemplateService:
         # Mock failed MJML CLI execution
         mock_subprocess.return_value.returncode = 1
         mock_subprocess.return_value.stderr = "MJML Error"
+        email_service.mjml_worker.compile = AsyncMock(return_value=None)
         
         html = await email_service._compile_mjml_to_html("<mjml><mj-body>Test</mj-body></mjml>")
         
@@ -223,6 +276,60 @@ class TestEmailTemplateService:
         assert isinstance(html, str)
         assert "Test" in html
 
+    @pytest.mark.asyncio
+    @patch('subprocess.run')
+    async def test_mjml_worker_compilation_skips_cli(self, mock_subprocess, email_service):
+        """Test that the persistent MJML worker is used before the CLI"""
+        email_service.mjml_worker.compile = AsyncMock(
+            return_value="<html><body>Worker HTML</body></html>"
+        )
+        
+        html = await email_service._compile_mjml_to_html("<mjml><mj-body>Test</mj-body></mjml>")
+        
+        assert html == "<html><body>Worker HTML</body></html>"
+        mock_subprocess.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_mjml_worker_unavailable_without_node(self, email_service):
+        """Test that the MJML worker disables itself when node is missing"""
+        with patch('asyncio.create_subprocess_exec', side_effect=FileNotFoundError) as mock_exec:
+            assert await email_service.mjml_worker.compile("<mjml></mjml>") is None
+            assert await email_service.mjml_worker.compile("<mjml></mjml>") is None
+            
+            mock_exec.assert_called_once()
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(shutil.which("node") is None, reason="Node.js not installed")
+    async def test_mjml_worker_streams_and_pipelines_requests(self, tmp_path):
+        """Test that streamed requests are answered in order by the worker"""
+        script = tmp_path / "echo_worker.js"
+        script.write_text(
+            'const readline = require("readline");\n'
+            'const write = (r) => process.stdout.write(JSON.stringify(r) + "\\n");\n'
+            'write({ ready: true });\n'
+            'readline.createInterface({ input: process.stdin }).on("line", (line) => {\n'
+            '  write({ html: "<html>" + JSON.parse(line).mjml + "</html>" });\n'
+            '});\n',
+            encoding='utf-8'
+        )
+        worker = MJMLWorker(script)
+        try:
+            streamed = await worker.compile_stream(iter(["<mj-text>", "Pérez", "</mj-text>"]))
+            assert streamed == "<html><mj-text>Pérez</mj-text></html>"
+
+            results = await asyncio.gather(*(worker.compile(f"email {i}") for i in range(5)))
+            assert results == [f"<html>email {i}</html>" for i in range(5)]
+
+            def failing_render():
+                yield "<mjml>"
+                raise ValueError("render failed")
+
+            with pytest.raises(ValueError, match="render failed"):
+                await worker.compile_stream(failing_render())
+            assert await worker.compile("after error") == "<html>after error</html>"
+        finally:
+            await worker.aclose()
+
     @pytest.mark.asyncio
     async def test_fallback_mjml_to_html(self, email_service):
         """Test fallback MJML to HTML conversion"""
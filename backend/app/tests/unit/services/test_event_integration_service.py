@@ -0,0 +1,287 @@
+"""
+Unit tests for the event integration services
+"""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.core.event_sourcing import AggregateSnapshotState, DomainEvent, EventType
+from app.services.event_integration_service import (
+    SNAPSHOT_INTERVAL,
+    AggregateReconstructionService,
+    EventQueryService,
+    OrderEventService,
+    ProductEventService,
+)
+
+
+def make_event(event_type, aggregate_id, data, sequence=1):
+    return DomainEvent(
+        id=uuid4(),
+        event_type=event_type,
+        aggregate_id=aggregate_id,
+        aggregate_type="Order",
+        data=data,
+        metadata={},
+        occurred_at=datetime(2025, 6, 30, 12, 0, 0),
+        sequence=sequence,
+    )
+
+
+class TestOrderEventService:
+    """Test cases for OrderEventService"""
+
+    @pytest.mark.asyncio
+    async def test_create_order_publishes_all_events_in_one_batch(self):
+        """Test the order and its inventory events go out in a single publish"""
+        items = [
+            {"product_id": str(uuid4()), "quantity": 2},
+            {"product_id": str(uuid4()), "quantity": 1},
+        ]
+
+        with patch(
+            "app.services.event_integration_service.publish_events",
+            new_callable=AsyncMock,
+        ) as mock_publish:
+            result = await OrderEventService.create_order_with_events(
+                {"items": items, "total": 30.0}, uuid4()
+            )
+
+        mock_publish.assert_awaited_once()
+        events = mock_publish.await_args.args[0]
+        assert [event.event_type for event in events] == [
+            EventType.ORDER_CREATED,
+            EventType.INVENTORY_STOCK_DECREASED,
+            EventType.INVENTORY_STOCK_DECREASED,
+        ]
+        assert result["event_id"] == str(events[0].id)
+        assert len({event.id for event in events}) == len(events)
+        assert all(
+            event.metadata["triggered_by"] == events[0].id
+            for event in events[1:]
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "new_status, expected",
+        [
+            ("shipped", EventType.ORDER_SHIPPED),
+            ("Cancelled", EventType.ORDER_CANCELLED),
+            ("processing", EventType.ORDER_UPDATED),
+        ],
+    )
+    async def test_update_status_maps_status_to_event_type(self, new_status, expected):
+        """Test known statuses map case-insensitively and others are updates"""
+        with patch(
+            "app.services.event_integration_service.publish_event",
+            new_callable=AsyncMock,
+        ) as mock_publish:
+            result = await OrderEventService.update_order_status_with_events(
+                uuid4(), new_status, uuid4()
+            )
+
+        assert mock_publish.await_args.args[0].event_type == expected
+        assert result["event_type"] == expected.value
+
+
+class TestProductEventService:
+    """Test cases for ProductEventService"""
+
+    @pytest.mark.asyncio
+    async def test_update_stock_reuses_one_timestamp(self):
+        """Test occurred_at and the payload timestamp are the same value"""
+        with patch(
+            "app.services.event_integration_service.publish_event",
+            new_callable=AsyncMock,
+        ) as mock_publish:
+            await ProductEventService.update_stock_with_events(
+                uuid4(), 5, "restock", uuid4()
+            )
+
+        event = mock_publish.await_args.args[0]
+        assert event.occurred_at.tzinfo is None
+        assert event.data["timestamp"] is event.occurred_at
+
+
+class TestAggregateReconstructionService:
+    """Test cases for AggregateReconstructionService"""
+
+    @pytest.fixture(autouse=True)
+    def state_cache(self):
+        """Empty reconstructed-state cache"""
+        with patch("app.services.event_integration_service.CacheService") as cache:
+            cache.get = AsyncMock(return_value=None)
+            cache.set = AsyncMock(return_value=True)
+            yield cache
+
+    @pytest.mark.asyncio
+    async def test_cached_state_is_returned_without_new_events(self, state_cache):
+        """Test a cache hit with no newer events skips snapshots and replay"""
+        order_id = uuid4()
+        cached_state = {"id": str(order_id), "status": "shipped", "events_count": 3}
+        state_cache.get.return_value = {"sequence": 3, "state": cached_state}
+
+        with (
+            patch(
+                "app.services.event_integration_service.get_latest_snapshot",
+                new_callable=AsyncMock,
+            ) as mock_snapshot,
+            patch(
+                "app.services.event_integration_service.get_aggregate_events",
+                new=AsyncMock(return_value=[]),
+            ) as mock_events,
+        ):
+            state = await AggregateReconstructionService.reconstruct_order_state(
+                order_id
+            )
+
+        assert state == cached_state
+        mock_events.assert_awaited_once_with(order_id, "Order", after_sequence=3)
+        mock_snapshot.assert_not_awaited()
+        state_cache.set.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_order_state_replays_only_events_after_snapshot(self, state_cache):
+        """Test reconstruction starts from the snapshot and skips covered events"""
+        order_id = uuid4()
+        snapshot = AggregateSnapshotState(
+            aggregate_id=order_id,
+            aggregate_type="Order",
+            sequence=120,
+            state={
+                "id": str(order_id),
+                "status": "pending",
+                "status_history": [{"status": "created", "timestamp": "x"}],
+                "events_count": SNAPSHOT_INTERVAL,
+            },
+        )
+        shipped = make_event(
+            EventType.ORDER_SHIPPED, order_id, {"new_status": "shipped"}, sequence=135
+        )
+
+        with (
+            patch(
+                "app.services.event_integration_service.get_latest_snapshot",
+                new=AsyncMock(return_value=snapshot),
+            ),
+            patch(
+                "app.services.event_integration_service.get_aggregate_events",
+                new=AsyncMock(return_value=[shipped]),
+            ) as mock_events,
+            patch(
+                "app.services.event_integration_service.save_snapshot",
+                new_callable=AsyncMock,
+            ) as mock_save,
+        ):
+            state = await AggregateReconstructionService.reconstruct_order_state(
+                order_id
+            )
+
+        mock_events.assert_awaited_once_with(order_id, "Order", after_sequence=120)
+        mock_save.assert_not_awaited()
+        state_cache.set.assert_awaited_once_with(
+            f"aggregate_state:order:{order_id}",
+            {"sequence": 135, "state": state},
+            ttl=3600,
+        )
+        assert state["status"] == "shipped"
+        assert len(state["status_history"]) == 2
+        assert state["events_count"] == SNAPSHOT_INTERVAL + 1
+
+    @pytest.mark.asyncio
+    async def test_order_state_is_snapshotted_after_interval(self):
+        """Test a long replay snapshots state at the last applied sequence"""
+        order_id = uuid4()
+        events = [
+            make_event(
+                EventType.ORDER_UPDATED,
+                order_id,
+                {"new_status": "processing"},
+                sequence=2 * i + 1,
+            )
+            for i in range(SNAPSHOT_INTERVAL)
+        ]
+
+        with (
+            patch(
+                "app.services.event_integration_service.get_latest_snapshot",
+                new=AsyncMock(return_value=None),
+            ),
+            patch(
+                "app.services.event_integration_service.get_aggregate_events",
+                new=AsyncMock(return_value=events),
+            ),
+            patch(
+                "app.services.event_integration_service.save_snapshot",
+                new_callable=AsyncMock,
+            ) as mock_save,
+        ):
+            state = await AggregateReconstructionService.reconstruct_order_state(
+                order_id
+            )
+
+        mock_save.assert_awaited_once_with(
+            order_id, "Order", events[-1].sequence, state
+        )
+        assert state["events_count"] == SNAPSHOT_INTERVAL
+
+    @pytest.mark.asyncio
+    async def test_product_state_applies_handlers_by_event_type(self):
+        """Test product events are applied by type and others are ignored"""
+        product_id = uuid4()
+        events = [
+            make_event(EventType.PRODUCT_CREATED, product_id, {"name": "Whey", "stock": 10}),
+            make_event(EventType.CART_UPDATED, product_id, {"stock": 999}),
+            make_event(EventType.PRODUCT_STOCK_UPDATED, product_id, {"new_stock": 7}),
+        ]
+
+        with (
+            patch(
+                "app.services.event_integration_service.get_latest_snapshot",
+                new=AsyncMock(return_value=None),
+            ),
+            patch(
+                "app.services.event_integration_service.get_aggregate_events",
+                new=AsyncMock(return_value=events),
+            ),
+        ):
+            state = await AggregateReconstructionService.reconstruct_product_state(
+                product_id
+            )
+
+        assert state["name"] == "Whey"
+        assert state["stock"] == 7
+        assert state["created_at"] == state["updated_at"]
+        assert state["events_count"] == 3
+
+
+class TestEventQueryService:
+    """Test cases for EventQueryService"""
+
+    @pytest.mark.asyncio
+    async def test_stream_history_yields_event_dicts_in_order(self):
+        """Test history is produced event by event from the store stream"""
+        user_id = uuid4()
+        events = [
+            make_event(EventType.USER_REGISTERED, user_id, {"email": "a@b.c"}),
+            make_event(EventType.USER_UPDATED, user_id, {"full_name": "A"}),
+        ]
+
+        async def fake_stream(aggregate_id, aggregate_type):
+            assert (aggregate_id, aggregate_type) == (user_id, "User")
+            for event in events:
+                yield event
+
+        with patch(
+            "app.services.event_integration_service.stream_aggregate_events",
+            new=fake_stream,
+        ):
+            history = [
+                record
+                async for record in EventQueryService.stream_history(user_id, "User")
+            ]
+
+        assert history == [event.to_dict() for event in events]
@@ -78,6 +78,8 @@ print(workers)
         --host 0.0.0.0 \
         --port 8000 \
         --workers ${WORKERS} \
+        --loop uvloop \
+        --http httptools \
         --access-log \
         --log-level info \
         --timeout-keep-alive 65 \